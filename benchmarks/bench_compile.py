@@ -0,0 +1,249 @@
+"""Benchmarks for the prettybird compile pipeline
+
+Synthetic .pbd sources vary one parameter at a time from a baseline font, and
+every stage of the pipeline is timed separately. Results are written as JSON so
+that runs can be compared across commits:
+
+    python benchmarks/bench_compile.py --output before.json
+    python benchmarks/bench_compile.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import pathlib
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+from lark import Lark
+
+from prettybird import PrettyBirdInterpreter
+from prettybird.formats import Atlas, BDF, GlyphStore, SVG
+
+BASELINE = {"glyphs": 16, "size": 16,
+            "filled": False, "depth": 0, "fanout": 1}
+
+SWEEPS = {
+    "glyphs": [16, 64, 256],
+    "size": [16, 32, 64],
+    "filled": [False, True],
+    "depth": [0, 4, 8],
+    "fanout": [1, 2, 3],
+}
+
+# Recursion only fans out when there is some depth to recurse into
+SWEEP_OVERRIDES = {"fanout": {"depth": 4}}
+
+
+def generate_source(glyphs, size, filled, depth, fanout):
+    """Generate a synthetic .pbd source
+
+    Args:
+        glyphs (int): Number of characters to declare
+        size (int): Width and height of every character's canvas
+        filled (bool): Whether primitives are filled or only outlined
+        depth (int): Recursion depth of the helper function each glyph calls, 0 to not call it
+        fanout (int): Number of recursive calls the helper function makes per level
+
+    Returns:
+        str: .pbd source
+    """
+    fill = "filled " if filled else ""
+    half, quarter = size // 2, max(size // 4, 1)
+
+    source = ""
+    if depth:
+        calls = "\n".join(
+            f"    branch(p + ({i % 2}, 1), depth - 1)" for i in range(fanout)
+        )
+        source += f"""
+define branch(p, depth) {{
+    stop if depth <= 0
+    draw vector(p, p + (1, 0))
+{calls}
+}}
+"""
+
+    for i in range(glyphs):
+        offset = i % quarter
+        source += f"""
+char g{i} encoding={0xE000 + i} {{
+    base {{
+        blank({size}, {size})
+    }}
+
+    steps {{
+        draw {fill}circle(({half}, {half}), {quarter + offset % 2})
+        draw {fill}square(({offset}, {offset}), {quarter})
+        draw {fill}ellipse(({quarter}, {quarter}), ({size - quarter}, {half}))
+        draw vector((0, {size - 1}), ({size - 1}, {offset}))
+        erase {fill}circle(({half}, {half}), {max(quarter // 2, 1)})
+"""
+        if depth:
+            source += f"        branch((0, 0), {depth})\n"
+        source += """    }
+}
+"""
+    return source
+
+
+def _time(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def run_once(parser, source, work_dir):
+    """Run every stage of the pipeline once
+
+    Returns:
+        dict[str, float]: Seconds spent in each stage
+    """
+    timings = {}
+
+    timings["parse"], parse_tree = _time(lambda: parser.parse(source))
+
+    interpreter = PrettyBirdInterpreter()
+    timings["interpret"], _ = _time(lambda: interpreter.visit(parse_tree))
+
+    symbols = list(interpreter.symbols.values())
+
+    def compile_symbols():
+        for symbol in symbols:
+            symbol.compile()
+
+    timings["compile"], _ = _time(compile_symbols)
+
+    format_classes = [BDF, Atlas, GlyphStore]
+    if shutil.which("fontforge"):
+        format_classes.append(SVG)
+
+    for format_class in format_classes:
+        font = format_class("bench", "0.1")
+        font.filename = str(work_dir / pathlib.Path(font.filename).name)
+        font.add_symbols(symbols)
+        timings[f"format_{format_class.__name__.lower()}"], _ = _time(
+            lambda: font.compile(bitmap=True)
+        )
+
+    return timings
+
+
+def run_case(parser, params, repeat, work_dir):
+    source = generate_source(**params)
+    runs = [run_once(parser, source, work_dir) for _ in range(repeat)]
+    return {
+        "params": params,
+        "stages": {
+            stage: {
+                "min": min(run[stage] for run in runs),
+                "median": statistics.median(run[stage] for run in runs),
+            }
+            for stage in runs[0]
+        },
+    }
+
+
+def cases(only=None):
+    """Yield the name and parameters of every benchmark case"""
+    for parameter, values in SWEEPS.items():
+        if only and parameter not in only:
+            continue
+        for value in values:
+            params = dict(BASELINE)
+            params.update(SWEEP_OVERRIDES.get(parameter, {}))
+            params[parameter] = value
+            yield f"{parameter}={value}", params
+
+
+def git_revision():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL)
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_results):
+    """Print the ratio of every stage's median time against a previous run"""
+    print(f"{'case':<16}{'stage':<20}{'before':>12}{'after':>12}{'ratio':>8}")
+    for name, case in results["cases"].items():
+        if name not in baseline_results["cases"]:
+            continue
+        before_case = baseline_results["cases"][name]
+        for stage, timing in case["stages"].items():
+            if stage not in before_case["stages"]:
+                continue
+            before = before_case["stages"][stage]["median"]
+            after = timing["median"]
+            ratio = after / before if before else float("inf")
+            print(
+                f"{name:<16}{stage:<20}{before * 1000:>10.2f}ms{after * 1000:>10.2f}ms{ratio:>8.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--output", "-o", default="bench_output.json", help="JSON file to write results to"
+    )
+    parser.add_argument(
+        "--repeat", "-r", default=3, type=int, help="Runs per benchmark case"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="*",
+        choices=list(SWEEPS),
+        help="Only sweep these parameters",
+    )
+    parser.add_argument(
+        "--compare", default=None, help="Previous results to compare against"
+    )
+    args = parser.parse_args()
+
+    lark_parser = Lark(
+        open(
+            pathlib.Path(__file__).parents[1] / "prettybird" / "grammar.lark",
+            encoding="utf-8",
+        )
+    )
+
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "repeat": args.repeat,
+        "cases": {},
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, params in cases(args.only):
+            results["cases"][name] = run_case(
+                lark_parser, params, args.repeat, pathlib.Path(work_dir)
+            )
+            stages = results["cases"][name]["stages"]
+            print(
+                f"{name:<16}"
+                + " ".join(
+                    f"{stage}={timing['median'] * 1000:.2f}ms"
+                    for stage, timing in stages.items()
+                )
+            )
+
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(results, json.load(baseline_file))
+
+
+if __name__ == "__main__":
+    main()
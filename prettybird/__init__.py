@@ -1,5 +1,8 @@
+from . import hooks
 from .interpreter import PrettyBirdInterpreter
 from .symbol import Symbol
 from .function import Function
+from .font import Font
+from .api import compile_source
 
-__all__ = ["PrettyBirdInterpreter", "Symbol", "Function"]
+__all__ = ["PrettyBirdInterpreter", "Symbol", "Function", "Font", "compile_source", "hooks"]
@@ -0,0 +1,34 @@
+import pathlib
+from functools import lru_cache
+
+from lark import Lark
+
+from .font import Font
+from .interpreter import PrettyBirdInterpreter
+
+
+@lru_cache(maxsize=None)
+def get_parser() -> Lark:
+    """Get the parser for the prettybird grammar. It is built once and shared, as building it is slow
+
+    Returns:
+        Lark: Parser built from the prettybird grammar
+    """
+    with open(pathlib.Path(__file__).parent / "grammar.lark") as grammar_file:
+        return Lark(grammar_file)
+
+
+def compile_source(source: str, path=None, allow_imports=True) -> Font:
+    """Parse and interpret prettybird source code. Only imported files and images are read from the filesystem
+
+    Args:
+        source (str): Source code to compile
+        path (str, optional): Path the source was read from. Imports and images resolve relative to it. Defaults to None, resolving them relative to the working directory.
+        allow_imports (bool, optional): If False, import statements and image bases raise an ImportError. Defaults to True.
+
+    Returns:
+        Font: Parsed font. Glyphs are compiled on demand by Font.glyph, Font.to_bdf_bytes and Font.to_svg_strings
+    """
+    interpreter = PrettyBirdInterpreter(path, allow_imports=allow_imports)
+    interpreter.interpret(get_parser(), source)
+    return interpreter.get_font()
@@ -0,0 +1,104 @@
+"""Partial evaluation of instruction arguments
+
+Names in instruction arguments are left as strings by the interpreter, and
+expressions involving them as [operator, left, right] lists. Reducing an
+argument substitutes bound names and computes every expression whose operands
+are known. Names that are declared free, such as the variable of a repeat loop
+that has not run yet, are left in place to be bound later.
+"""
+
+from types import FunctionType
+from typing import Collection, Mapping
+
+from lark import Token, Tree
+
+from .utils import Array
+
+
+def is_resolved(argument) -> bool:
+    """Determine whether or not an argument has been reduced to a value
+
+    Args:
+        argument: Instruction argument
+
+    Returns:
+        bool: False if the argument still contains names or expressions
+    """
+    if isinstance(argument, str):
+        return False
+    if isinstance(argument, (list, tuple)):
+        if len(argument) and isinstance(argument[0], FunctionType):
+            return False
+        return all(is_resolved(element) for element in argument)
+    return True
+
+
+def reduce_argument(argument, bindings: Mapping, free: Collection[str] = ()):
+    """Substitute bound names into an argument and compute the expressions that can be computed
+
+    Args:
+        argument: Instruction argument
+        bindings (Mapping[str, Any]): Values of names
+        free (Collection[str], optional): Names to leave in place. Defaults to ().
+
+    Raises:
+        NameError: If a name is neither bound nor free
+
+    Returns:
+        Any: The reduced argument
+    """
+    if isinstance(argument, Tree) and len(argument.children) == 1 and isinstance(argument.children[0], Token):
+        argument = argument.children[0].value
+
+    if isinstance(argument, str):
+        name, negative = (argument[1:], True) if argument.startswith("-") else (argument, False)
+        if name in bindings:
+            return -1 * Array(bindings[name]) if negative else bindings[name]
+        if name in free:
+            return argument
+        raise NameError(f'Name "{name}" is not defined')
+    elif isinstance(argument, (list, tuple)):
+        if len(argument) and isinstance(argument[0], FunctionType):
+            # Expression
+            left = reduce_argument(argument[1], bindings, free)
+            right = reduce_argument(argument[2], bindings, free)
+            if is_resolved(left) and is_resolved(right):
+                return argument[0](Array(left), Array(right))
+            return [argument[0], left, right]
+        return [reduce_argument(element, bindings, free) for element in argument]
+
+    return argument
+
+
+def reduce_instruction(instruction, bindings: Mapping, free: Collection[str] = ()):
+    """Reduce every argument of an instruction. The bodies of repeat loops are reduced with their loop variable free
+
+    Args:
+        instruction (tuple): Instruction as (name, draw mode, fill mode, arguments)
+        bindings (Mapping[str, Any]): Values of names
+        free (Collection[str], optional): Names to leave in place. Defaults to ().
+
+    Raises:
+        NameError: If a name is neither bound nor free
+
+    Returns:
+        tuple: The reduced instruction
+    """
+    instruction_name, draw_mode, fill_mode, inputs = instruction
+    if instruction_name == "repeat":
+        variable, start, stop, step, body = inputs
+        # The loop variable shadows any binding of the same name
+        body_bindings = {name: value for name, value in bindings.items() if name != variable}
+        body_free = set(free) | {variable}
+        reduced_inputs = [
+            variable,
+            *(reduce_argument(bound, bindings, free) for bound in (start, stop, step)),
+            [reduce_instruction(body_instruction, body_bindings, body_free) for body_instruction in body],
+        ]
+    elif instruction_name == "morphology":
+        # The operation is a keyword, not a name
+        operation, amount = inputs
+        reduced_inputs = [operation, reduce_argument(amount, bindings, free)]
+    else:
+        reduced_inputs = [reduce_argument(argument, bindings, free) for argument in inputs]
+    return (instruction_name, draw_mode, fill_mode, reduced_inputs)
@@ -0,0 +1,182 @@
+import io
+from types import MappingProxyType
+from typing import Dict, List
+
+from .formats import BDF, SVG
+from .function import Function
+from .symbol import Symbol, sharing_components
+
+
+class Font:
+    """A parsed font, shareable between threads
+
+    The symbol and function tables are read-only, and glyphs are rendered onto
+    copies of their definitions, so any number of threads or asyncio tasks can
+    render glyphs from one Font without re-parsing or locking. Resource limits,
+    profilers and memory trackers are per-context, so each thread enforces or
+    collects its own.
+    """
+
+    def __init__(self, symbols: Dict[str, Symbol], functions: Dict[str, Function]):
+        """Initialize new Font
+
+        Args:
+            symbols (dict[str, Symbol]): Symbol definitions, keyed by identifier
+            functions (dict[str, Function]): Function definitions, keyed by name
+        """
+        self._symbols = MappingProxyType(dict(symbols))
+        self._functions = MappingProxyType(dict(functions))
+        self._by_encoding = {
+            int(symbol.encoding): symbol for symbol in self._symbols.values()
+        }
+        # Compiled glyphs, keyed by identifier. Threads racing to fill an entry
+        # compile equal glyphs, so the loser's work is wasted but never wrong
+        self._glyphs: Dict[str, Symbol] = {}
+
+    @property
+    def symbols(self):
+        """Get the Symbol definitions
+
+        Returns:
+            Mapping[str, Symbol]: Read-only mapping of identifiers to Symbols
+        """
+        return self._symbols
+
+    @property
+    def functions(self):
+        """Get the Function definitions
+
+        Returns:
+            Mapping[str, Function]: Read-only mapping of names to Functions
+        """
+        return self._functions
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __iter__(self):
+        return iter(self._symbols.values())
+
+    def __contains__(self, identifier):
+        return identifier in self._symbols
+
+    def __getitem__(self, identifier):
+        return self._symbols[identifier]
+
+    def render(self, identifier) -> Symbol:
+        """Compile a glyph without modifying its definition
+
+        Args:
+            identifier (str): Identifier of the glyph
+
+        Raises:
+            KeyError: If the glyph is not in the Font
+
+        Returns:
+            Symbol: Compiled copy of the glyph
+        """
+        return self._symbols[identifier].render()
+
+    def render_all(self) -> List[Symbol]:
+        """Compile every glyph without modifying their definitions
+
+        Returns:
+            list[Symbol]: Compiled copies of the glyphs, in declaration order
+        """
+        with sharing_components():
+            return [symbol.render() for symbol in self._symbols.values()]
+
+    @property
+    def design_size(self) -> int:
+        """Get the pixel size the glyphs are designed at: the height of the tallest base
+
+        Returns:
+            int: Height of the tallest base, in pixels
+        """
+        return max((symbol.base_size[1] for symbol in self._symbols.values()), default=0)
+
+    def strike(self, size, design_size=None) -> List[Symbol]:
+        """Render every glyph scaled to another pixel size, without modifying their definitions
+
+        Args:
+            size (int): Pixel size to render at
+            design_size (int, optional): Pixel size the glyphs are designed at. Defaults to design_size.
+
+        Raises:
+            ValueError: If no design size is given and no glyph has a base to measure it from
+
+        Returns:
+            list[Symbol]: Compiled copies of the glyphs, in declaration order
+        """
+        design_size = design_size or self.design_size
+        if not design_size:
+            raise ValueError(
+                "Can't scale glyphs without a design size, as none of them have a base")
+        scale = size / design_size
+        with sharing_components():
+            return [symbol.render(scale) for symbol in self._symbols.values()]
+
+    def _glyph(self, symbol):
+        glyph = self._glyphs.get(symbol.identifier)
+        if glyph is None:
+            glyph = symbol.render()
+            self._glyphs[symbol.identifier] = glyph
+        return glyph
+
+    def glyph(self, encoding) -> Symbol:
+        """Get a compiled glyph by encoding. Glyphs are compiled once and cached, so the result must not be modified
+
+        Args:
+            encoding (int): Encoding of the glyph
+
+        Raises:
+            KeyError: If no glyph has the encoding
+
+        Returns:
+            Symbol: Compiled glyph
+        """
+        return self._glyph(self._by_encoding[int(encoding)])
+
+    def glyphs(self) -> List[Symbol]:
+        """Get every compiled glyph, in declaration order. Glyphs are compiled once and cached, so they must not be modified
+
+        Returns:
+            list[Symbol]: Compiled glyphs
+        """
+        with sharing_components():
+            return [self._glyph(symbol) for symbol in self._symbols.values()]
+
+    def to_bdf_bytes(self, font_name: str = "prettybird", version: str = "0.1", **options) -> bytes:
+        """Write the compiled glyphs as a BDF font in memory
+
+        Args:
+            font_name (str, optional): Name to give to the font. Defaults to "prettybird".
+            version (str, optional): Version of the font. Defaults to "0.1".
+            options: Extra keyword arguments passed on to BDF
+
+        Returns:
+            bytes: Contents of the BDF file
+        """
+        bdf = BDF(font_name, version, **options)
+        bdf.add_symbols(self.glyphs())
+        stream = io.StringIO()
+        bdf.write(stream)
+        return stream.getvalue().encode()
+
+    def to_svg_strings(self, bitmap: bool = True) -> Dict[str, str]:
+        """Draw every glyph as an SVG document in memory
+
+        Args:
+            bitmap (bool, optional): If True, draw the compiled grids, otherwise draw outlines from the glyphs' instructions. Defaults to True.
+
+        Returns:
+            dict[str, str]: SVG documents keyed by glyph identifier
+        """
+        svg = SVG("prettybird", "0.1")
+        svg.add_symbols(self.glyphs() if bitmap else list(self._symbols.values()))
+        svg_strings = {}
+        for group, svg_drawing in svg.drawings(bitmap):
+            svg_string = svg_drawing.tostring()
+            for symbol in group:
+                svg_strings[symbol.identifier] = svg_string
+        return svg_strings
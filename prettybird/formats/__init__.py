@@ -1,5 +1,7 @@
 from .format import Format
 from .bdf import BDF
 from .svg import SVG
+from .atlas import Atlas
+from .store import GlyphStore, GlyphStoreReader
 
-__all__ = ["Format", "BDF", "SVG"]
+__all__ = ["Format", "BDF", "SVG", "Atlas", "GlyphStore", "GlyphStoreReader"]
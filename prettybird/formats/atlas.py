@@ -0,0 +1,260 @@
+# http://netpbm.sourceforge.net/doc/pbm.html
+# http://netpbm.sourceforge.net/doc/pgm.html
+
+import json
+import math
+import struct
+
+from . import Format
+from ..utils import signed_distance_field
+
+from pathlib import Path
+
+
+class Atlas(Format):
+    """Packs every compiled glyph raster into a single PBM (1-bit) or PGM (8-bit) texture
+
+    Alongside the image, a metrics index mapping each encoding to its position in
+    the texture is written both as JSON and as a fixed-width binary table:
+
+        header: magic (4s) | version (H) | bit depth (H) | glyph count (I) | atlas width (H) | atlas height (H) | sdf spread (H) | sdf scale (H)
+        record: encoding (I) | x (H) | y (H) | width (H) | height (H) | advance (h)
+
+    All values are little-endian and records are sorted by encoding, so the table
+    can be memory-mapped and binary-searched directly.
+
+    8-bit atlases can store signed distance fields instead of coverage. Each glyph
+    is then upscaled by sdf_scale and padded by sdf_spread pixels on every side,
+    and its advance is measured in upscaled pixels.
+
+    Glyphs with identical rasters share a single region of the texture.
+    """
+
+    bitmap_only = True
+
+    INDEX_MAGIC = b"PBAT"
+    INDEX_VERSION = 2
+    INDEX_HEADER = struct.Struct("<4sHHIHHHH")
+    INDEX_RECORD = struct.Struct("<IHHHHh")
+
+    def __init__(
+        self,
+        font_name: str,
+        version: str,
+        bit_depth: int = 1,
+        padding: int = 1,
+        max_width: int = 0,
+        sdf_spread: int = 0,
+        sdf_scale: int = 1,
+        filename: str = "",
+    ):
+        if bit_depth not in (1, 8):
+            raise ValueError(
+                f"Atlas bit depth must be either 1 or 8, not {bit_depth}")
+        if sdf_spread and bit_depth != 8:
+            raise ValueError("Distance field atlases must have a bit depth of 8")
+        self.bit_depth = bit_depth
+        self.sdf_spread = sdf_spread
+        self.sdf_scale = sdf_scale
+
+        super().__init__(filename, font_name, version)
+
+        self.padding = padding
+        self.max_width = max_width
+
+        self.width = 0
+        self.height = 0
+        self.groups: list[list] = []
+        self.glyph_pixels: list[tuple[int, int, bytes]] = []
+        self.placements: list[tuple[int, int]] = []
+
+    @property
+    def file_suffix(self) -> str:
+        return ".pbm" if self.bit_depth == 1 else ".pgm"
+
+    @property
+    def json_filename(self) -> str:
+        return str(Path(self.filename).with_suffix(".json"))
+
+    @property
+    def index_filename(self) -> str:
+        return str(Path(self.filename).with_suffix(".idx"))
+
+    @staticmethod
+    def _shelf_pack(sizes, max_width, padding):
+        """Place rectangles on horizontal shelves, tallest first
+
+        Args:
+            sizes (list[tuple[int, int]]): Width and height of each rectangle
+            max_width (int): Width of the atlas
+            padding (int): Empty pixels to leave between rectangles
+
+        Returns:
+            tuple[list[tuple[int, int]], int]: Top left corner of each rectangle in input order, and the total atlas height
+        """
+        order = sorted(range(len(sizes)),
+                       key=lambda i: (-sizes[i][1], -sizes[i][0]))
+        placements = [(0, 0)] * len(sizes)
+
+        shelf_y, shelf_height, cursor_x = 0, 0, 0
+        for i in order:
+            width, height = sizes[i]
+            if cursor_x and cursor_x + width > max_width:
+                shelf_y += shelf_height + padding
+                shelf_height, cursor_x = 0, 0
+            placements[i] = (cursor_x, shelf_y)
+            cursor_x += width + padding
+            shelf_height = max(shelf_height, height)
+
+        return placements, shelf_y + shelf_height
+
+    def _pixels(self, symbol):
+        """Get the pixels that represent a symbol in the atlas
+
+        Args:
+            symbol (Symbol): Compiled Symbol
+
+        Returns:
+            tuple[int, int, bytes]: Width, height and row-major pixel values of the glyph
+        """
+        if self.sdf_spread:
+            return signed_distance_field(
+                symbol.grid.splitlines(), self.sdf_spread, self.sdf_scale
+            )
+
+        ink = 1 if self.bit_depth == 1 else 255
+        grid_to_pixels = bytes.maketrans(b"0.", bytes([ink, 0]))
+        return (
+            symbol.width,
+            symbol.height,
+            symbol.grid.replace("\n", "").encode().translate(grid_to_pixels),
+        )
+
+    def pack(self):
+        """Compute the pixels and position of every distinct glyph in the atlas"""
+        self.groups = self.group_symbols()
+        self.glyph_pixels = [self._pixels(group[0]) for group in self.groups]
+        sizes = [(w, h) for w, h, _ in self.glyph_pixels]
+
+        self.width = self.max_width
+        if not self.width:
+            area = sum((w + self.padding) * (h + self.padding)
+                       for w, h in sizes)
+            self.width = math.ceil(math.sqrt(area))
+        self.width = max([self.width] + [w for w, _ in sizes])
+
+        self.placements, self.height = Atlas._shelf_pack(
+            sizes, self.width, self.padding)
+        self.height = max(self.height, 1)
+
+    def render(self):
+        """Blit every packed glyph into one image buffer
+
+        Returns:
+            bytearray: One byte per pixel, row-major. 1 (or 255 for 8-bit atlases) where there is ink, or distance field values
+        """
+        pixels = bytearray(self.width * self.height)
+        for (w, h, glyph), (x, y) in zip(self.glyph_pixels, self.placements):
+            for row in range(h):
+                start = (y + row) * self.width + x
+                pixels[start: start + w] = glyph[row * w: (row + 1) * w]
+        return pixels
+
+    def _image_bytes(self, pixels):
+        if self.bit_depth == 8:
+            return f"P5\n{self.width} {self.height}\n255\n".encode() + bytes(pixels)
+
+        # PBM rows are packed 8 pixels to a byte, padded to a byte boundary
+        pixels_to_bits = bytes.maketrans(b"\x00\x01", b"01")
+        row_bytes = (self.width + 7) // 8
+        out = bytearray(f"P4\n{self.width} {self.height}\n".encode())
+        for y in range(self.height):
+            row = pixels[y * self.width: (y + 1) * self.width]
+            bits = row.translate(pixels_to_bits).ljust(row_bytes * 8, b"0")
+            out += int(bits, 2).to_bytes(row_bytes, "big")
+        return bytes(out)
+
+    def metrics(self):
+        """Get the position and advance of every glyph in the atlas, sorted by encoding
+
+        Returns:
+            list[dict]: Glyph metrics
+        """
+        glyphs = [
+            {
+                "encoding": int(symbol.encoding),
+                "identifier": symbol.identifier,
+                "x": x,
+                "y": y,
+                "w": w,
+                "h": h,
+                "advance": symbol.width * (self.sdf_scale if self.sdf_spread else 1),
+            }
+            for group, (w, h, _), (x, y) in zip(
+                self.groups, self.glyph_pixels, self.placements
+            )
+            for symbol in group
+        ]
+        return sorted(glyphs, key=lambda glyph: glyph["encoding"])
+
+    def _index_bytes(self, glyphs):
+        out = bytearray(
+            Atlas.INDEX_HEADER.pack(
+                Atlas.INDEX_MAGIC,
+                Atlas.INDEX_VERSION,
+                self.bit_depth,
+                len(glyphs),
+                self.width,
+                self.height,
+                self.sdf_spread,
+                self.sdf_scale if self.sdf_spread else 1,
+            )
+        )
+        for glyph in glyphs:
+            out += Atlas.INDEX_RECORD.pack(
+                glyph["encoding"],
+                glyph["x"],
+                glyph["y"],
+                glyph["w"],
+                glyph["h"],
+                glyph["advance"],
+            )
+        return bytes(out)
+
+    def compile(self, to_ttf=False, bitmap=False):
+        if to_ttf:
+            raise NotImplementedError("Atlas -> TTF conversion not supported")
+
+        if not bitmap:
+            raise RuntimeError(
+                "Atlas files can not be generated without the '--bitmap' option"
+            )
+
+        self.pack()
+        glyphs = self.metrics()
+
+        with self._open_output(self.filename, "wb") as image_file:
+            image_file.write(self._image_bytes(self.render()))
+
+        with self._open_output(self.json_filename, "w") as json_file:
+            json.dump(
+                {
+                    "font": self.font_name,
+                    "version": self.version,
+                    "image": Path(self.filename).name,
+                    "bit_depth": self.bit_depth,
+                    "width": self.width,
+                    "height": self.height,
+                    "sdf_spread": self.sdf_spread,
+                    "sdf_scale": self.sdf_scale if self.sdf_spread else 1,
+                    "glyphs": glyphs,
+                },
+                json_file,
+                indent=2,
+            )
+
+        with self._open_output(self.index_filename, "wb") as index_file:
+            index_file.write(self._index_bytes(glyphs))
+
+        for filename in (self.filename, self.json_filename, self.index_filename):
+            self._written(filename)
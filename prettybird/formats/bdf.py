@@ -1,22 +1,44 @@
 # https://adobe-type-tools.github.io/font-tech-notes/pdfs/5005.BDF_Spec.pdf
 # https://en.wikipedia.org/wiki/Glyph_Bitmap_Distribution_Format
 
+from typing import Optional
+
 from . import Format
 
+# Resolution the font is written for, in dots per inch
+RESOLUTION = 75
+
 
 class BDF(Format):
+    """Writes compiled glyphs as a BDF bitmap font
+
+    Each glyph's bitmap is trimmed to the box around its ink, which its BBX
+    places relative to its origin. The origin of a glyph is the bottom left
+    pixel of its grid, and its advance is the width of its grid. Unless given,
+    FONTBOUNDINGBOX, FONT_ASCENT and FONT_DESCENT are fitted to every glyph's ink.
+    """
+
+    bitmap_only = True
+
     def __init__(
         self,
         font_name: str,
         version: str,
         point_size: int = 16,
-        bounding_box: tuple[int, int] = (6, 8),
+        bounding_box: Optional[tuple[int, ...]] = None,
         properties: list[tuple] = [],
         filename: str = "",
     ):
         super().__init__(filename, font_name, version)
 
-        self.file = None
+        if bounding_box is not None:
+            if len(bounding_box) == 2:
+                # Older fonts only gave the box's width and height
+                bounding_box = (*bounding_box, 0, 0)
+            elif len(bounding_box) != 4:
+                raise ValueError(
+                    "bounding_box must be (width, height) or (width, height, x offset, y offset)")
+
         self.point_size = point_size
         self.bounding_box = bounding_box
         self.properties = properties
@@ -34,42 +56,107 @@ class BDF(Format):
                 "BDF files can not be generated without the '--bitmap' option"
             )
 
-        self.file = open(self.filename, "w")
+        with self._open_output(self.filename, "w") as bdf_file:
+            self.write(bdf_file)
+        self._written(self.filename)
 
-        self.file.write(f"STARTFONT {str(self.version)}\n")
-        self.file.write(f"FONT {self.font_name}\n")
-        self.file.write(f"SIZE {self.point_size} 75 75\n")
-        self.file.write(
-            f"FONTBOUNDINGBOX {self.bounding_box[0]} {self.bounding_box[1]} 0 -1\n"
+        self.compiled = True
+
+    @staticmethod
+    def glyph_metrics(symbol):
+        """Find a glyph's bounding box and trim its bitmap to it
+
+        Args:
+            symbol (Symbol): Compiled Symbol
+
+        Returns:
+            tuple[tuple[int, int, int, int], list[str]]: BBX width, height and offsets from the origin, and the
+                trimmed bitmap as rows of hex digits, each padded on the right to a whole number of bytes
+        """
+        bounds = symbol.ink_bounds()
+        if bounds is None:
+            return (0, 0, 0, 0), []
+
+        left, top, width, height = bounds
+        shift = symbol.width - left - width
+        mask = (1 << width) - 1
+        padding = -width % 8
+        digits = (width + padding) // 4
+        bitmap = [
+            f"{(row >> shift & mask) << padding:0{digits}X}"
+            for row in symbol.packed_rows()[top: top + height]
+        ]
+        return (width, height, left, symbol.height - top - height), bitmap
+
+    @staticmethod
+    def font_bounding_box(boxes):
+        """Find the box around every glyph's bounding box
+
+        Args:
+            boxes (list[tuple[int, int, int, int]]): BBX width, height and offsets of each glyph
+
+        Returns:
+            tuple[int, int, int, int]: FONTBOUNDINGBOX width, height and offsets
+        """
+        boxes = [box for box in boxes if box[0]]
+        if not boxes:
+            return (0, 0, 0, 0)
+        left = min(x for _, _, x, _ in boxes)
+        bottom = min(y for _, _, _, y in boxes)
+        right = max(x + w for w, _, x, _ in boxes)
+        top = max(y + h for _, h, _, y in boxes)
+        return (right - left, top - bottom, left, bottom)
+
+    def write(self, stream):
+        """Write the font to a text stream
+
+        Args:
+            stream (TextIO): Stream to write to, such as an open file or io.StringIO
+        """
+        metrics = [self.glyph_metrics(symbol) for symbol in self.symbols]
+        bounding_box = self.bounding_box or self.font_bounding_box(
+            [box for box, _ in metrics])
+
+        properties = list(self.properties)
+        names = {property[0] for property in properties}
+        if "FONT_ASCENT" not in names:
+            properties.append(
+                ("FONT_ASCENT", max(bounding_box[1] + bounding_box[3], 0)))
+        if "FONT_DESCENT" not in names:
+            properties.append(("FONT_DESCENT", max(-bounding_box[3], 0)))
+
+        stream.write(f"STARTFONT {str(self.version)}\n")
+        stream.write(f"FONT {self.font_name}\n")
+        stream.write(f"SIZE {self.point_size} {RESOLUTION} {RESOLUTION}\n")
+        stream.write(
+            "FONTBOUNDINGBOX " + " ".join(str(value) for value in bounding_box) + "\n"
         )
-        self.file.write(
+        stream.write(
             "COMMENT Compiled with prettybird, https://github.com/CharlesAverill/prettybird\n"
         )
 
-        if self.properties and len(self.properties):
-            self.file.write(f"STARTPROPERTIES {len(self.properties)}\n")
-            for property in self.properties:
-                self.file.write(" ".join([str(p) for p in property]) + "\n")
-            self.file.write("ENDPROPERTIES\n")
+        stream.write(f"STARTPROPERTIES {len(properties)}\n")
+        for property in properties:
+            stream.write(" ".join([str(p) for p in property]) + "\n")
+        stream.write("ENDPROPERTIES\n")
 
         if self.symbols and len(self.symbols):
-            self.file.write(f"CHARS {len(self.symbols)}\n")
-
-            for symbol in self.symbols:
-                self.file.write(f"STARTCHAR {symbol.identifier}\n")
-                self.file.write(f"ENCODING {symbol.encoding}\n")
-                self.file.write("SWIDTH 500 0\n")
-                self.file.write(f"DWIDTH {symbol.width} 0\n")
-                self.file.write(f"BBX {symbol.width} {symbol.height} 0 0\n")
-                self.file.write("BITMAP\n")
-                self.file.write(symbol.grid_hex_repr())
-                self.file.write("ENDCHAR\n")
-
-        self.file.write("ENDFONT\n")
-
-        self.file.close()
-
-        self.compiled = True
+            stream.write(f"CHARS {len(self.symbols)}\n")
+
+            for symbol, (box, bitmap) in zip(self.symbols, metrics):
+                # Scalable width is in thousandths of the point size
+                swidth = round(symbol.width * 1000 * 72 / (self.point_size * RESOLUTION))
+                stream.write(f"STARTCHAR {symbol.identifier}\n")
+                stream.write(f"ENCODING {symbol.encoding}\n")
+                stream.write(f"SWIDTH {swidth} 0\n")
+                stream.write(f"DWIDTH {symbol.width} 0\n")
+                stream.write("BBX " + " ".join(str(value) for value in box) + "\n")
+                stream.write("BITMAP\n")
+                for row in bitmap:
+                    stream.write(row + "\n")
+                stream.write("ENDCHAR\n")
+
+        stream.write("ENDFONT\n")
 
     """
     def convert_to_ttf(self):
@@ -1,13 +1,25 @@
+import os
+import tempfile
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
 
+from .. import hooks
 from ..symbol import Symbol
 
-from typing import List
+from typing import Dict, List
+
+# Temporary files are created private, so outputs are given the usual permissions before replacing
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
 
 class Format(ABC):
+    # Formats that can only be generated from compiled glyph rasters
+    bitmap_only = False
+
     def __init__(self, filename: str, font_name: str, version: str):
-        file_suffix = "." + type(self).__name__.lower()
+        file_suffix = self.file_suffix
         if not filename:
             filename = font_name + file_suffix
         elif not filename.lower().endswith(file_suffix):
@@ -20,9 +32,67 @@ class Format(ABC):
         self.version = version
         self.symbols: List[Symbol] = []
 
+    @property
+    def file_suffix(self) -> str:
+        """Get the suffix that files of this format end with
+
+        Returns:
+            str: File suffix, including the leading "."
+        """
+        return "." + type(self).__name__.lower()
+
     def add_symbols(self, symbols: list[Symbol]):
         self.symbols = symbols
 
+    def group_symbols(self, bitmap=True) -> List[List[Symbol]]:
+        """Group symbols that produce identical glyphs, so each distinct glyph is only stored once
+
+        Args:
+            bitmap (bool, optional): If True, group compiled symbols by their grid, otherwise group symbols that copy another symbol's outline. Defaults to True.
+
+        Returns:
+            list[list[Symbol]]: Groups of symbols in order of first appearance
+        """
+        groups: Dict[str, List[Symbol]] = {}
+        for symbol in self.symbols:
+            key = (
+                symbol.raster_key() if bitmap else symbol.outline_source().identifier
+            )
+            groups.setdefault(key, []).append(symbol)
+        return list(groups.values())
+
+    @staticmethod
+    @contextmanager
+    def _open_output(filename: str, mode: str = "w"):
+        """Open an output file to be replaced atomically. Readers see the old file until the new one has been written in full
+
+        Args:
+            filename (str): Path of the output file
+            mode (str, optional): Mode to open the file with, "w" or "wb". Defaults to "w".
+
+        Yields:
+            IO: Temporary file next to the output file, moved over it when the context exits cleanly
+        """
+        directory = Path(filename).resolve().parent
+        handle, temp_name = tempfile.mkstemp(
+            dir=directory, prefix=f".{Path(filename).name}.", suffix=".tmp")
+        try:
+            with os.fdopen(handle, mode) as temp_file:
+                yield temp_file
+            os.chmod(temp_name, 0o666 & ~_UMASK)
+            os.replace(temp_name, filename)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+
+    def _written(self, filename: str):
+        """Announce that a file has been written
+
+        Args:
+            filename (str): Path of the written file
+        """
+        hooks.emit("format_write", format=self, filename=filename)
+
     @abstractmethod
     def compile(self, to_ttf=False, bitmap=False):
         pass
@@ -0,0 +1,211 @@
+import mmap
+import struct
+
+from . import Format
+
+
+class GlyphStore(Format):
+    """Binary store of compiled glyph bitmaps, designed to be memory-mapped by GlyphStoreReader
+
+    Layout (all values little-endian):
+
+        header: magic (4s) | version (H) | reserved (H) | glyph count (I) | index offset (I) | arena offset (I)
+        index:  encoding (I) | width (H) | height (H) | arena offset (I) | length (I), one record per glyph, sorted by encoding
+        arena:  glyph bitmaps, one row after another, each row packed MSB-first and padded to a whole byte
+
+    Glyphs with identical bitmaps point at the same arena entry.
+    """
+
+    bitmap_only = True
+
+    MAGIC = b"PBGS"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHIII")
+    RECORD = struct.Struct("<IHHII")
+
+    def __init__(self, font_name: str, version: str, filename: str = ""):
+        super().__init__(filename, font_name, version)
+
+    @property
+    def file_suffix(self) -> str:
+        return ".pbgs"
+
+    @staticmethod
+    def pack_bitmap(symbol):
+        """Pack a compiled Symbol's grid into bytes
+
+        Args:
+            symbol (Symbol): Compiled Symbol
+
+        Returns:
+            bytes: Rows of the grid, packed MSB-first and padded to a whole byte
+        """
+        row_bytes = (symbol.width + 7) // 8
+        padding = row_bytes * 8 - symbol.width
+        return b"".join(
+            (row << padding).to_bytes(row_bytes, "big") for row in symbol.packed_rows()
+        )
+
+    def compile(self, to_ttf=False, bitmap=False):
+        if to_ttf:
+            raise NotImplementedError(
+                "GlyphStore -> TTF conversion not supported")
+
+        if not bitmap:
+            raise RuntimeError(
+                "GlyphStore files can not be generated without the '--bitmap' option"
+            )
+
+        symbols = sorted(self.symbols, key=lambda symbol: int(symbol.encoding))
+        for previous, symbol in zip(symbols, symbols[1:]):
+            if int(previous.encoding) == int(symbol.encoding):
+                raise ValueError(
+                    f'Symbols "{previous.identifier}" and "{symbol.identifier}" share encoding {symbol.encoding}'
+                )
+
+        arena = bytearray()
+        arena_entries = {}
+        for group in self.group_symbols():
+            bitmap_bytes = GlyphStore.pack_bitmap(group[0])
+            for symbol in group:
+                arena_entries[symbol.identifier] = (
+                    len(arena), len(bitmap_bytes))
+            arena += bitmap_bytes
+
+        index = bytearray()
+        for symbol in symbols:
+            index += GlyphStore.RECORD.pack(
+                int(symbol.encoding),
+                symbol.width,
+                symbol.height,
+                *arena_entries[symbol.identifier],
+            )
+
+        index_offset = GlyphStore.HEADER.size
+        arena_offset = index_offset + len(index)
+
+        with self._open_output(self.filename, "wb") as store_file:
+            store_file.write(
+                GlyphStore.HEADER.pack(
+                    GlyphStore.MAGIC,
+                    GlyphStore.VERSION,
+                    0,
+                    len(symbols),
+                    index_offset,
+                    arena_offset,
+                )
+            )
+            store_file.write(index)
+            store_file.write(arena)
+        self._written(self.filename)
+
+
+class GlyphStoreReader:
+    """Memory-mapped, read-only view of a GlyphStore file
+
+    Bitmaps are returned as zero-copy memoryview slices of the mapping, and glyphs
+    are looked up with a binary search over the encoding index. Release any
+    bitmaps taken from the reader before closing it.
+    """
+
+    def __init__(self, filename: str):
+        self._file = open(filename, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0,
+                               access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        (
+            magic,
+            version,
+            _,
+            self._count,
+            self._index_offset,
+            self._arena_offset,
+        ) = GlyphStore.HEADER.unpack_from(self._view)
+        if magic != GlyphStore.MAGIC:
+            self.close()
+            raise ValueError(f'"{filename}" is not a glyph store')
+        if version != GlyphStore.VERSION:
+            self.close()
+            raise ValueError(
+                f'"{filename}" has unsupported glyph store version {version}')
+
+    def _record(self, i):
+        return GlyphStore.RECORD.unpack_from(
+            self._view, self._index_offset + i * GlyphStore.RECORD.size
+        )
+
+    def _find(self, encoding):
+        """Binary search the index for an encoding
+
+        Args:
+            encoding (int): Encoding to search for
+
+        Raises:
+            KeyError: If the encoding is not in the store
+
+        Returns:
+            tuple: The encoding's index record
+        """
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            record = self._record(middle)
+            if record[0] < encoding:
+                low = middle + 1
+            elif record[0] > encoding:
+                high = middle
+            else:
+                return record
+        raise KeyError(encoding)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, encoding):
+        try:
+            self._find(encoding)
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, encoding):
+        """Get a glyph's packed bitmap
+
+        Args:
+            encoding (int): Encoding of the glyph
+
+        Returns:
+            memoryview: Bitmap rows, packed MSB-first and padded to a whole byte
+        """
+        _, _, _, offset, length = self._find(encoding)
+        start = self._arena_offset + offset
+        return self._view[start: start + length]
+
+    def encodings(self):
+        """Iterate over every encoding in the store, in ascending order"""
+        for i in range(self._count):
+            yield self._record(i)[0]
+
+    def dimensions(self, encoding):
+        """Get the width and height of a glyph
+
+        Args:
+            encoding (int): Encoding of the glyph
+
+        Returns:
+            tuple[int, int]: Width and height of the glyph
+        """
+        _, width, height, _, _ = self._find(encoding)
+        return (width, height)
+
+    def close(self):
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -6,6 +6,7 @@ import json
 import warnings
 
 from . import Format
+from ..utils.bezier import TOLERANCE, flatten
 
 from pathlib import Path
 
@@ -20,49 +21,73 @@ class SVG(Format):
             if not os.path.exists(temp_dir):
                 os.mkdir(temp_dir)
 
+            output = str(
+                (
+                    Path.cwd() / (Path(self.filename).stem if to_ttf else self.filename)
+                ).resolve()
+            ) + (".ttf" if to_ttf else "")
+            # fontforge writes next to the output, which is then replaced atomically.
+            # The temporary name keeps the suffix fontforge picks the format from
+            temp_output = Path(output).with_name(
+                f".{Path(output).stem}.tmp{Path(output).suffix}")
+
             json_data = {
                 "props": {},
                 "input": str(temp_dir.resolve()),
-                "output": [
-                    str(
-                        (
-                            Path.cwd()
-                            / (Path(self.filename).stem if to_ttf else self.filename)
-                        ).resolve()
-                    )
-                    + (".ttf" if to_ttf else "")
-                ],
+                "output": [str(temp_output)],
                 "glyphs": {},
             }
 
-            for symbol in self.symbols:
-                svg_drawing = svgwrite.Drawing(
-                    temp_dir / f"{symbol.identifier}.svg",
-                    size=(f"{symbol.width * 16}px", f"{symbol.height * 16}px"),
-                )
-
-                if bitmap:
-                    self.draw_bitmap_on_svg(symbol, svg_drawing)
-                else:
-                    self.draw_outline_on_svg(symbol, svg_drawing)
-
-                json_data["glyphs"][hex(ord(symbol.identifier[0]))] = Path(
-                    str(svg_drawing.filename)
-                ).name
+            # Glyphs that look the same share one SVG file
+            for group, svg_drawing in self.drawings(bitmap, temp_dir):
+                for grouped_symbol in group:
+                    json_data["glyphs"][hex(ord(grouped_symbol.identifier[0]))] = Path(
+                        str(svg_drawing.filename)
+                    ).name
                 svg_drawing.save()
 
             temp_json = tempfile.NamedTemporaryFile(mode="w")
             json.dump(json_data, temp_json)
             temp_json.flush()
 
-            subprocess.check_output(
-                f"fontforge -lang=py -script {Path(__file__).parents[1] / 'fontforge_scripts' / 'svgs2ttf' / 'svgs2ttf'} {temp_json.name}",
-                shell=True,
-                stderr=subprocess.STDOUT,
-            )
+            try:
+                subprocess.check_output(
+                    f"fontforge -lang=py -script {Path(__file__).parents[1] / 'fontforge_scripts' / 'svgs2ttf' / 'svgs2ttf'} {temp_json.name}",
+                    shell=True,
+                    stderr=subprocess.STDOUT,
+                )
+                os.replace(temp_output, output)
+            finally:
+                temp_output.unlink(missing_ok=True)
 
             temp_json.close()
 
+            self._written(output)
+
+    def drawings(self, bitmap=False, directory=Path()):
+        """Build one SVG drawing per group of identical glyphs, without saving them
+
+        Args:
+            bitmap (bool, optional): If True, draw compiled grids, otherwise draw outlines from the glyphs' instructions. Defaults to False.
+            directory (Path, optional): Directory the drawings' filenames point into. Defaults to the working directory.
+
+        Yields:
+            tuple[list[Symbol], svgwrite.Drawing]: Group of symbols and the drawing they share
+        """
+        for group in self.group_symbols(bitmap):
+            symbol = group[0] if bitmap else group[0].outline_source()
+            svg_drawing = svgwrite.Drawing(
+                Path(directory) / f"{symbol.identifier}.svg",
+                size=(f"{symbol.width * 16}px", f"{symbol.height * 16}px"),
+            )
+
+            if bitmap:
+                self.draw_bitmap_on_svg(symbol, svg_drawing)
+            else:
+                self.draw_outline_on_svg(symbol, svg_drawing)
+
+            yield group, svg_drawing
+
     @staticmethod
     def draw_bitmap_on_svg(symbol, svg_drawing):
         for x in range(symbol.width):
@@ -77,108 +102,181 @@ class SVG(Format):
     def _mul_tup(tup, multiplier):
         return tuple(map(lambda x: x * multiplier, tup))
 
+    @staticmethod
+    def _outline_shape(svg_drawing, instruction_name, filled, inputs):
+        """Create the SVG element that outlines an instruction
+
+        Args:
+            svg_drawing (svgwrite.Drawing): Drawing the element will be added to
+            instruction_name (str): Name of instruction type
+            filled (bool): True if the instruction is filled, false if it is only an outline
+            inputs (list): List of input data to instruction
+
+        Returns:
+            svgwrite.base.BaseElement: The element, or None if the instruction has no outline
+        """
+        stroke = "black"
+        stroke_width = "1px" if filled else "16px"
+        fill = stroke if filled else "none"
+
+        if instruction_name == "vector":
+            return svg_drawing.line(
+                start=SVG._mul_tup(inputs[0], 16),
+                end=SVG._mul_tup(inputs[1], 16),
+                stroke="black",
+                stroke_width="16px",
+            )
+        elif instruction_name == "ellipse":
+            p1, p2 = SVG._mul_tup(inputs[0], 16), SVG._mul_tup(inputs[1], 16)
+            a = abs(p2[1] - p1[1]) / 2
+            b = abs(p2[0] - p1[0]) / 2
+            c = (p1[0] + b, p1[1] + a)
+
+            return svg_drawing.ellipse(
+                center=c,
+                r=(b, a),
+                stroke=stroke,
+                stroke_width=stroke_width,
+                fill=fill,
+            )
+        elif instruction_name == "rectangle":
+            p1, p2 = inputs[0], inputs[1]
+            w = abs(p2[0] - p1[0])
+            h = abs(p2[1] - p1[1])
+            return svg_drawing.rect(
+                insert=SVG._mul_tup(p1, 16),
+                size=(w * 16, h * 16),
+                stroke=stroke,
+                stroke_width=stroke_width,
+                fill=fill,
+            )
+        elif instruction_name == "point":
+            return svg_drawing.circle(
+                center=SVG._mul_tup(inputs[0], 16),
+                r=16,
+                stroke=stroke,
+                stroke_width="1px",
+                fill="black",
+            )
+        elif instruction_name == "circle":
+            return svg_drawing.circle(
+                center=SVG._mul_tup(inputs[0], 16),
+                r=inputs[1] * 16,
+                stroke=stroke,
+                stroke_width=stroke_width,
+                fill=fill,
+            )
+        elif instruction_name == "square":
+            return svg_drawing.rect(
+                insert=SVG._mul_tup(inputs[0], 16),
+                size=(inputs[1] * 16, inputs[1] * 16),
+                stroke=stroke,
+                stroke_width=stroke_width,
+                fill=fill,
+            )
+        elif instruction_name == "bezier":
+            start, end, *controls = inputs
+            if len(controls) <= 2:
+                command = "Q" if len(controls) == 1 else "C"
+                segments = [command, *controls, end]
+            else:
+                # SVG paths stop at cubic curves, so higher degrees are flattened finely enough to look smooth
+                segments = [
+                    "L",
+                    *(
+                        (round(x, 3), round(y, 3))
+                        for x, y in flatten([start, *controls, end], TOLERANCE / 16)[1:]
+                    ),
+                ]
+            d = " ".join(
+                segment if isinstance(segment, str) else f"{segment[0] * 16} {segment[1] * 16}"
+                for segment in ["M", start, *segments]
+            )
+            return svg_drawing.path(
+                d=d,
+                stroke=stroke,
+                stroke_width="16px",
+                fill="none",
+            )
+        elif instruction_name in ("polygon", "polyline"):
+            points, nonzero = inputs
+            commands = [
+                f"{'M' if i == 0 else 'L'} {x * 16} {y * 16}"
+                for i, (x, y) in enumerate(points)
+            ]
+            if instruction_name == "polygon":
+                commands.append("Z")
+            return svg_drawing.path(
+                d=" ".join(commands),
+                stroke=stroke,
+                stroke_width=stroke_width,
+                fill=fill,
+                fill_rule="nonzero" if nonzero else "evenodd",
+            )
+        return None
+
     @staticmethod
     def draw_outline_on_svg(symbol, svg_drawing):
+        svg_drawing.add(SVG._outline_layer(symbol, svg_drawing))
+
+    @staticmethod
+    def _outline_layer(symbol, svg_drawing, prefix=""):
+        """Create a group outlining every instruction of a Symbol
+
+        Args:
+            symbol (Symbol): Symbol to outline
+            svg_drawing (svgwrite.Drawing): Drawing the group will be added to
+            prefix (str, optional): Prefix of the ids of the group's masks, unique within the drawing. Defaults to "".
+
+        Returns:
+            svgwrite.container.Group: The outline
+        """
+        # Drawn shapes accumulate in a layer. Every run of consecutive erase
+        # instructions becomes one mask over everything drawn before it, so each
+        # element is added exactly once. The masked group then starts the next
+        # layer, so the groups nest one level deeper for every erase run, with
+        # the first run's mask innermost
+        layer = svg_drawing.g()
+        mask = None
+        warned = False
+
         for i, instruction in enumerate(symbol._instructions):
             instruction_name, draw_mode, filled, inputs = instruction
 
-            if draw_mode == "draw":
-                to_draw = svg_drawing
-            else:
-                clip_path = svg_drawing.defs.add(
-                    svg_drawing.mask(id=f"{i}_{instruction_name}")
-                )
-                to_draw = clip_path
-                to_draw.add(
-                    svg_drawing.rect(insert=(0, 0), size=(
-                        "100%", "100%"), fill="white")
-                )
-
             if draw_mode == "erase":
-                warnings.warn(
-                    "The erase keyword is not stable with outline fonts, but may work as expected in some cases. Please check back later!",
-                    UserWarning,
-                )
-
-            stroke = "black"
-            stroke_width = "1px" if filled else "16px"
-            fill = stroke if filled else "none"
-
-            if instruction_name == "vector":
-                to_draw.add(
-                    svg_drawing.line(
-                        start=SVG._mul_tup(inputs[0], 16),
-                        end=SVG._mul_tup(inputs[1], 16),
-                        stroke="black",
-                        stroke_width="16px",
-                    )
-                )
-            elif instruction_name == "ellipse":
-                p1, p2 = SVG._mul_tup(
-                    inputs[0], 16), SVG._mul_tup(inputs[1], 16)
-                a = abs(p2[1] - p1[1]) / 2
-                b = abs(p2[0] - p1[0]) / 2
-                c = (p1[0] + b, p1[1] + a)
-
-                to_draw.add(
-                    svg_drawing.ellipse(
-                        center=c,
-                        r=(b, a),
-                        stroke=stroke,
-                        stroke_width=stroke_width,
-                        fill=fill,
-                    )
-                )
-            elif instruction_name == "rectangle":
-                p1, p2 = inputs[0], inputs[1]
-                w = abs(p2[0] - p1[0])
-                h = abs(p2[1] - p1[1])
-                to_draw.add(
-                    svg_drawing.rect(
-                        insert=SVG._mul_tup(p1, 16),
-                        size=(w * 16, h * 16),
-                        stroke=stroke,
-                        stroke_width=stroke_width,
-                        fill=fill,
-                    )
-                )
-            elif instruction_name == "point":
-                to_draw.add(
-                    svg_drawing.circle(
-                        center=SVG._mul_tup(inputs[0], 16),
-                        r=16,
-                        stroke=stroke,
-                        stroke_width="1px",
-                        fill="black",
-                    )
-                )
-            elif instruction_name == "circle":
-                to_draw.add(
-                    svg_drawing.circle(
-                        center=SVG._mul_tup(inputs[0], 16),
-                        r=inputs[1] * 16,
-                        stroke=stroke,
-                        stroke_width=stroke_width,
-                        fill=fill,
+                if not warned:
+                    warnings.warn(
+                        "The erase keyword is not stable with outline fonts, but may work as expected in some cases. Please check back later!",
+                        UserWarning,
                     )
-                )
-            elif instruction_name == "square":
-                to_draw.add(
-                    svg_drawing.rect(
-                        insert=SVG._mul_tup(inputs[0], 16),
-                        size=(inputs[1] * 16, inputs[1] * 16),
-                        stroke=stroke,
-                        stroke_width=stroke_width,
-                        fill=fill,
+                    warned = True
+
+                if mask is None:
+                    mask = svg_drawing.defs.add(
+                        svg_drawing.mask(id=f"{prefix}{i}_erase"))
+                    mask.add(
+                        svg_drawing.rect(insert=(0, 0), size=(
+                            "100%", "100%"), fill="white")
                     )
-                )
+                    masked_layer = svg_drawing.g(mask=mask.get_funciri())
+                    masked_layer.add(layer)
+                    layer = svg_drawing.g()
+                    layer.add(masked_layer)
+                to_draw = mask
+            else:
+                mask = None
+                to_draw = layer
 
-            if draw_mode == "erase":
-                for elem in svg_drawing.elements:
-                    if type(elem) in (
-                        svgwrite.shapes.Line,
-                        svgwrite.shapes.Ellipse,
-                        svgwrite.shapes.Rect,
-                        svgwrite.shapes.Circle,
-                    ):
-                        elem["mask"] = f"url(#{i}_{instruction_name})"
+            if instruction_name == "compose":
+                # The composed glyph's own outline, moved into place
+                composed, dx, dy = inputs
+                shape = svg_drawing.g(transform=f"translate({dx * 16} {dy * 16})")
+                shape.add(SVG._outline_layer(
+                    composed.outline_source(), svg_drawing, f"{prefix}{i}_"))
+            else:
+                shape = SVG._outline_shape(
+                    svg_drawing, instruction_name, filled, inputs)
+            if shape is not None:
+                to_draw.add(shape)
+
+        return layer
@@ -1,7 +1,10 @@
-from copy import deepcopy
-from lark import Tree
+from contextlib import ExitStack
 
-from .utils import Array
+from . import hooks
+from .evaluate import reduce_instruction
+from .limits import get_budget
+from .memory import get_memory_tracker
+from .profiling import get_profiler
 
 
 class Function:
@@ -39,42 +42,37 @@ class Function:
             (instruction_name, *self.instruction_buffer, inputs))
         self.instruction_buffer = ()
 
-    def _reduce_argument(self, instruction_arg, function_arguments, is_function_call):
-        if type(instruction_arg) == Tree and len(instruction_arg.children) == 1:
-            instruction_arg = instruction_arg.children[0].value
-
-        if type(instruction_arg) == str:
-            return function_arguments[self.parameter_names.index(instruction_arg)]
-        elif type(instruction_arg) in (list, tuple):
-            # Expression
-            if (
-                len(instruction_arg)
-                and repr(type(instruction_arg[0])) == "<class 'function'>"
-            ):
-                x = instruction_arg[0](
-                    Array(
-                        self._reduce_argument(
-                            instruction_arg[1], function_arguments, is_function_call
-                        )
-                    ),
-                    Array(
-                        self._reduce_argument(
-                            instruction_arg[2], function_arguments, is_function_call
-                        )
-                    ),
-                )
-                return x
-            return [
-                self._reduce_argument(
-                    arg, function_arguments, is_function_call)
-                for arg in instruction_arg
-            ]
-        elif type(instruction_arg) == Function:
-            return deepcopy(instruction_arg)
-
-        return instruction_arg
-
-    def compile(self, width, height, arguments):
+    def compile(self, width, height, arguments, scale=1.0, axis_scale=(1.0, 1.0), boundary=None):
+        hooks.emit("function_enter", function=self, arguments=arguments)
+
+        profiler = get_profiler()
+        memory = get_memory_tracker()
+        budget = get_budget()
+        with ExitStack() as stack:
+            if profiler is not None:
+                stack.enter_context(profiler.function(self.function_name))
+            if memory is not None:
+                stack.enter_context(memory.function(self.function_name))
+            if budget is not None:
+                stack.enter_context(budget.function(self.function_name))
+            grid = self._compile(
+                width, height, arguments, profiler, memory, budget, scale, axis_scale, boundary)
+
+        hooks.emit("function_exit", function=self, arguments=arguments)
+        return grid
+
+    def _compile(
+        self,
+        width,
+        height,
+        arguments,
+        profiler=None,
+        memory=None,
+        budget=None,
+        scale=1.0,
+        axis_scale=(1.0, 1.0),
+        boundary=None,
+    ):
         # Local imports because Symbol needs to import Function
         from .symbol import Symbol
         from .utils import get_empty_grid
@@ -82,24 +80,26 @@ class Function:
         # Setup function subspace
         subspace = Symbol(f"{self.function_name}_subspace", 0)
         subspace.grid = get_empty_grid(int(width), int(height))
+        # Fills stop at what the calling glyph has drawn so far, without copying it into the subspace
+        subspace._fill_boundary = boundary
+        # The subspace draws in the calling glyph's scaled coordinates
+        subspace._scale = scale
+        subspace._axis_scale = axis_scale
 
         if len(arguments) != len(self.parameter_names):
             raise TypeError(
                 f"{self.function_name} missing arguments {self.parameter_names[len(arguments):]}"
             )
 
-        for orig_instruction in self.instructions:
-            # Don't overwrite the original instruction
-            instruction = deepcopy(orig_instruction)
-            instruction_args = instruction[3]
+        bindings = dict(zip(self.parameter_names, arguments))
+        for instruction in self.instructions:
+            # Reducing builds new arguments, so the definition is shared safely between calls and threads
+            instruction_name, draw_mode, fill_mode, instruction_args = reduce_instruction(
+                instruction, bindings)
+            subspace.prepare_instruction(draw_mode, fill_mode)
+            subspace.add_instruction(instruction_name, instruction_args)
 
-            for i, arg in enumerate(instruction_args):
-                instruction_args[i] = self._reduce_argument(
-                    arg, arguments, instruction[0] == "function_call"
-                )
-            subspace.prepare_instruction(instruction[1], instruction[2])
-            subspace.add_instruction(instruction[0], instruction[3])
-
-        subspace.compile()
+        # The subspace is part of the calling glyph, not a glyph of its own
+        subspace._apply_instructions(profiler, memory, budget)
 
         return subspace.grid
@@ -0,0 +1,102 @@
+"""Event hooks for instrumenting the interpreter, rasterizer and formats
+
+Callbacks are called with the event name followed by the event's payload as
+keyword arguments:
+
+    from prettybird import hooks
+
+    def on_glyph(event, symbol, **_):
+        print(event, symbol.identifier)
+
+    hooks.subscribe("glyph_compile_end", on_glyph)
+
+Events and their payloads:
+    parse_start:         interpreter, source
+    parse_end:           interpreter, parse_tree
+    glyph_compile_start: symbol
+    glyph_compile_end:   symbol
+    function_enter:      function, arguments
+    function_exit:       function, arguments
+    cache_hit:           cache, key
+    cache_miss:          cache, key
+    format_write:        format, filename
+"""
+
+from typing import Callable, Dict, Tuple
+
+EVENTS = (
+    "parse_start",
+    "parse_end",
+    "glyph_compile_start",
+    "glyph_compile_end",
+    "function_enter",
+    "function_exit",
+    "cache_hit",
+    "cache_miss",
+    "format_write",
+)
+
+# Subscriber tuples are replaced rather than mutated, so emitting never races with (un)subscribing
+_subscribers: Dict[str, Tuple[Callable, ...]] = {event: () for event in EVENTS}
+
+
+def _check_event(event):
+    if event not in _subscribers:
+        raise ValueError(
+            f'Unknown event "{event}", expected one of {", ".join(EVENTS)}')
+
+
+def subscribe(event, callback):
+    """Call a callback whenever an event is emitted
+
+    Args:
+        event (str): Name of the event, one of EVENTS
+        callback (Callable): Called with the event name and the event's payload as keyword arguments
+
+    Raises:
+        ValueError: If the event does not exist
+
+    Returns:
+        Callable: The callback, so subscribe can be used as a decorator through functools.partial
+    """
+    _check_event(event)
+    _subscribers[event] = _subscribers[event] + (callback,)
+    return callback
+
+
+def unsubscribe(event, callback):
+    """Stop calling a callback when an event is emitted
+
+    Args:
+        event (str): Name of the event, one of EVENTS
+        callback (Callable): Previously subscribed callback
+
+    Raises:
+        ValueError: If the event does not exist
+    """
+    _check_event(event)
+    _subscribers[event] = tuple(
+        subscriber for subscriber in _subscribers[event] if subscriber != callback
+    )
+
+
+def has_subscribers(event):
+    """Determine whether or not anything is subscribed to an event
+
+    Args:
+        event (str): Name of the event, one of EVENTS
+
+    Returns:
+        bool: True if emitting the event would call at least one callback
+    """
+    return bool(_subscribers[event])
+
+
+def emit(event, **payload):
+    """Call every callback subscribed to an event. Does nothing if there are none
+
+    Args:
+        event (str): Name of the event, one of EVENTS
+    """
+    for callback in _subscribers[event]:
+        callback(event, **payload)
@@ -0,0 +1,260 @@
+# http://netpbm.sourceforge.net/doc/pbm.html
+# http://netpbm.sourceforge.net/doc/pgm.html
+
+"""Glyph bases sliced out of PBM and PGM sprite sheets
+
+A sheet is read once per process and shared by every glyph cut from it, for as
+long as the file is unchanged. Binary sheets are memory-mapped, so a glyph only
+reads the rows it covers. Pixels are drawn where PBM pixels are 1, or where PGM
+pixels are darker than half their maximum value, following netpbm's black on
+white.
+"""
+
+import hashlib
+import mmap
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from . import hooks
+
+_BITS_TO_GRID = str.maketrans("01", ".0")
+_WHITESPACE = b" \t\n\v\f\r"
+
+
+class Image:
+    """A PBM or PGM image, read from a file"""
+
+    def __init__(self, path):
+        """Read an image's header and map its pixels
+
+        Args:
+            path (str | pathlib.Path): Path of the image
+
+        Raises:
+            ValueError: If the file is not a PBM or PGM image
+        """
+        self.path = pathlib.Path(path).resolve()
+        with open(self.path, "rb") as image_file:
+            stat = os.fstat(image_file.fileno())
+            self.version: Tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+            if not stat.st_size:
+                raise ValueError(f'"{self.path.name}" is not a PBM or PGM image')
+            # The mapping stays valid after the file is closed
+            self._data = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.digest = hashlib.blake2b(self._data, digest_size=16).hexdigest()
+
+        self.magic = bytes(self._data[:2])
+        if self.magic not in (b"P1", b"P2", b"P4", b"P5"):
+            raise ValueError(f'"{self.path.name}" is not a PBM or PGM image')
+        bitmap = self.magic in (b"P1", b"P4")
+        fields, offset = self._header(3 if bitmap else 4)
+        self.width, self.height = fields[1], fields[2]
+        self.max_value = 1 if bitmap else fields[3]
+        if self.width < 1 or self.height < 1 or not 0 < self.max_value < 65536:
+            raise ValueError(f'"{self.path.name}" has an invalid header')
+
+        if self.magic in (b"P1", b"P2"):
+            # Plain images are text, and are decoded to one grid character per pixel up front
+            values = bytes(self._data[offset:]).split()
+            if bitmap:
+                # Plain PBM pixels don't need to be separated by whitespace
+                values = list(b"".join(values))
+                pixels = bytes(ord("0") if value == ord("1") else ord(".") for value in values)
+            else:
+                pixels = bytes(
+                    ord("0") if int(value) * 2 < self.max_value else ord(".") for value in values)
+            self._pixels = pixels
+        else:
+            self._pixels = None
+            self._offset = offset
+
+        self._row_bytes = {
+            b"P1": self.width,
+            b"P2": self.width,
+            b"P4": (self.width + 7) // 8,
+            b"P5": self.width * (1 if self.max_value < 256 else 2),
+        }[self.magic]
+        pixel_bytes = self._row_bytes * self.height
+        available = len(self._pixels) if self._pixels is not None else len(self._data) - offset
+        if available < pixel_bytes:
+            raise ValueError(f'"{self.path.name}" is missing pixels')
+
+        # One grid character for every 8-bit PGM value
+        self._gray_to_grid = bytes(
+            ord("0") if value * 2 < self.max_value else ord(".") for value in range(256))
+
+    def _header(self, count):
+        """Read the whitespace-separated fields of the header, skipping comments
+
+        Args:
+            count (int): Number of fields, including the magic number
+
+        Raises:
+            ValueError: If the header ends early or a field is not a number
+
+        Returns:
+            tuple[list, int]: The fields, and the offset of the first byte of pixels
+        """
+        fields = [self.magic]
+        offset = 2
+        while len(fields) < count:
+            while offset < len(self._data) and self._data[offset] in _WHITESPACE:
+                offset += 1
+            if offset < len(self._data) and self._data[offset] == ord("#"):
+                end = self._data.find(b"\n", offset)
+                offset = len(self._data) if end == -1 else end + 1
+                continue
+            start = offset
+            while offset < len(self._data) and self._data[offset] not in _WHITESPACE + b"#":
+                offset += 1
+            try:
+                fields.append(int(self._data[start:offset]))
+            except ValueError:
+                raise ValueError(
+                    f'"{self.path.name}" has an invalid header') from None
+        # A single whitespace character separates the header from the pixels
+        return fields, offset + 1
+
+    def grid(self, x, y, width, height):
+        """Cut a grid out of the image
+
+        Args:
+            x (int): Left edge of the grid in the image
+            y (int): Top edge of the grid in the image
+            width (int): Width of the grid
+            height (int): Height of the grid
+
+        Raises:
+            ValueError: If the grid is empty or doesn't lie within the image
+
+        Returns:
+            str: The grid
+        """
+        if width < 1 or height < 1:
+            raise ValueError("Image bases must be at least 1x1")
+        if x < 0 or y < 0 or x + width > self.width or y + height > self.height:
+            raise ValueError(
+                f"Region ({x}, {y}, {width}, {height}) does not lie within "
+                f'"{self.path.name}", which is {self.width}x{self.height}'
+            )
+
+        rows = []
+        for row in range(y, y + height):
+            start = row * self._row_bytes
+            if self._pixels is not None:
+                rows.append(self._pixels[start + x: start + x + width].decode("ascii"))
+            elif self.magic == b"P4":
+                # Rows are packed 8 pixels to a byte, most significant bit first
+                first, last = start + x // 8, start + (x + width + 7) // 8
+                value = int.from_bytes(self._data[self._offset + first: self._offset + last], "big")
+                value >>= (last - first) * 8 - (x % 8) - width
+                value &= (1 << width) - 1
+                rows.append(format(value, f"0{width}b").translate(_BITS_TO_GRID))
+            elif self.max_value < 256:
+                first = self._offset + start + x
+                rows.append(self._data[first: first + width].translate(
+                    self._gray_to_grid).decode("ascii"))
+            else:
+                first = self._offset + start + 2 * x
+                samples = self._data[first: first + 2 * width]
+                rows.append("".join(
+                    "0" if int.from_bytes(samples[i: i + 2], "big") * 2 < self.max_value else "."
+                    for i in range(0, len(samples), 2)
+                ))
+        return "\n".join(rows)
+
+    def is_current(self):
+        """Determine whether or not the file is unchanged since it was read
+
+        Returns:
+            bool: True if the Image can be reused
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size) == self.version
+
+
+class ImageCache:
+    """Thread-safe, least-recently-used cache of read Images, keyed by their resolved path
+
+    Each cached Image keeps its file mapped, so only the most recently used are kept.
+    """
+
+    def __init__(self, maxsize: int = 16):
+        """Initialize new ImageCache
+
+        Args:
+            maxsize (int, optional): Most Images to keep. Defaults to 16.
+        """
+        self.maxsize = maxsize
+        self._images: "OrderedDict[pathlib.Path, Image]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._images)
+
+    def get(self, path) -> Image:
+        """Get the Image for a file, reading it only if it isn't cached or has changed
+
+        Args:
+            path (str | pathlib.Path): Path of the image
+
+        Raises:
+            OSError: If the file can't be read
+            ValueError: If the file is not a PBM or PGM image
+
+        Returns:
+            Image: The image
+        """
+        path = pathlib.Path(path).resolve()
+        with self._lock:
+            image = self._images.get(path)
+            if image is not None:
+                self._images.move_to_end(path)
+        if image is not None and image.is_current():
+            hooks.emit("cache_hit", cache=self, key=str(path))
+            return image
+        hooks.emit("cache_miss", cache=self, key=str(path))
+        image = Image(path)
+        with self._lock:
+            # Replaces the Image read before the file changed, which is unmapped once nothing uses it
+            self._images[path] = image
+            self._images.move_to_end(path)
+            while len(self._images) > self.maxsize:
+                self._images.popitem(last=False)
+        return image
+
+    def clear(self):
+        """Forget every cached Image"""
+        with self._lock:
+            self._images.clear()
+
+
+# Shared by every interpreter in the process
+image_cache = ImageCache()
+
+
+def load_image(path, cache: Optional[ImageCache] = None) -> Image:
+    """Get the Image for a file from a cache
+
+    Args:
+        path (str | pathlib.Path): Path of the image
+        cache (ImageCache, optional): Cache to reuse Images from. Defaults to the shared cache.
+
+    Raises:
+        ImportError: If the file can't be read
+        ValueError: If the file is not a PBM or PGM image
+
+    Returns:
+        Image: The image
+    """
+    cache = cache if cache is not None else image_cache
+    try:
+        return cache.get(path)
+    except OSError as e:
+        raise ImportError(f'Cannot read image "{path}": {e.strerror}') from e
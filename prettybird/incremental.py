@@ -0,0 +1,299 @@
+"""Incremental recompilation
+
+Every top-level character and function declaration is hashed, and each glyph's
+cache key covers its own declaration plus every declaration it depends on,
+transitively, through from_char bases, composed characters and function calls. Imports are hashed by
+the contents of every file they read, and every declaration after an import
+depends on it. Characters with image bases are hashed with the image's contents.
+Glyphs whose key is unchanged are loaded from a cache, on disk or
+in memory, instead of being compiled again.
+"""
+
+import hashlib
+import os
+import pathlib
+import tempfile
+from collections import OrderedDict
+from typing import Dict, List, Set, Tuple
+
+from lark.tree import Tree
+
+from . import hooks
+
+# Bump when a change to the compiler changes the glyphs it draws, invalidating every cached glyph
+CACHE_VERSION = 2
+
+_DECLARATIONS = ("import_statement", "character", "function_definition")
+
+
+def _digest(data: str) -> str:
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def declaration_hash(declaration_tree) -> str:
+    """Hash a top-level declaration. Tokens are hashed without their positions, so formatting outside the declaration doesn't change it
+
+    Args:
+        declaration_tree (lark.tree.Tree): character or function_definition tree
+
+    Returns:
+        str: Hex digest of the declaration
+    """
+    return _digest(repr(declaration_tree))
+
+
+def _references(declaration_tree) -> Tuple[List[str], List[str]]:
+    """Find the characters and functions a declaration refers to
+
+    Args:
+        declaration_tree (lark.tree.Tree): character or function_definition tree
+
+    Returns:
+        tuple[list[str], list[str]]: Identifiers of from_char bases and composed characters, and names of called functions
+    """
+    characters = [
+        tree.children[0].value
+        for data in ("from_character_base_statement", "compose_statement")
+        for tree in declaration_tree.find_data(data)
+    ]
+    functions = [
+        tree.children[0].value
+        for tree in declaration_tree.find_data("function_call_step")
+    ]
+    return characters, functions
+
+
+class DependencyGraph:
+    """Declarations of a parsed source and the edges between them
+
+    Nodes are declaration indices. A reference resolves to the most recent
+    declaration of that name before it, matching the interpreter, and a function
+    can refer to itself.
+    """
+
+    def __init__(self, parse_tree, modules=(), images=()):
+        """Build the graph for a parse tree
+
+        Args:
+            parse_tree (lark.tree.Tree): Parse tree of a whole source
+            modules (Sequence[Module], optional): Modules the source imported, in order. Defaults to ().
+            images (Sequence[Image], optional): Images the source's bases were cut from, in order. Defaults to ().
+        """
+        if parse_tree.data in _DECLARATIONS:
+            declarations = [parse_tree]
+        else:
+            declarations = [
+                child
+                for child in parse_tree.children
+                if isinstance(child, Tree) and child.data in _DECLARATIONS
+            ]
+
+        self.hashes: List[str] = []
+        self.edges: List[List[int]] = []
+        # Glyph identifier -> declaration index
+        self.characters: Dict[str, int] = {}
+
+        functions: Dict[str, int] = {}
+        imports: List[int] = []
+        modules = iter(modules)
+        images = iter(images)
+        for i, declaration in enumerate(declarations):
+            if declaration.data == "import_statement":
+                module = next(modules, None)
+                self.hashes.append(_digest(
+                    declaration_hash(declaration)
+                    + (module.fingerprint if module is not None else "")
+                ))
+                self.edges.append(list(imports))
+                imports.append(i)
+                if module is not None and any(
+                    child.data == "import_characters" for child in declaration.children[1:]
+                ):
+                    for identifier in module.symbols:
+                        self.characters[identifier] = i
+                continue
+
+            name = declaration.children[0].value
+            if declaration.data == "function_definition":
+                functions[name] = i
+
+            characters, called = _references(declaration)
+            if any(declaration.find_data("image_base_statement")):
+                image = next(images, None)
+                self.hashes.append(_digest(
+                    declaration_hash(declaration)
+                    + (image.digest if image is not None else "")
+                ))
+            else:
+                self.hashes.append(declaration_hash(declaration))
+            self.edges.append(
+                [self.characters[c] for c in characters if c in self.characters]
+                + [functions[f] for f in called if f in functions]
+                + imports
+            )
+
+            if declaration.data == "character":
+                self.characters[name] = i
+
+    def dependencies(self, node) -> Set[int]:
+        """Find every declaration a declaration depends on, directly or transitively
+
+        Args:
+            node (int): Declaration index
+
+        Returns:
+            set[int]: Declaration indices, including the node itself
+        """
+        seen = {node}
+        stack = [node]
+        while stack:
+            for dependency in self.edges[stack.pop()]:
+                if dependency not in seen:
+                    seen.add(dependency)
+                    stack.append(dependency)
+        return seen
+
+    def glyph_keys(self) -> Dict[str, str]:
+        """Get each glyph's cache key, covering its declaration and all of its dependencies
+
+        Returns:
+            dict[str, str]: Cache keys, keyed by glyph identifier
+        """
+        # The identifier tells apart the glyphs brought in by the same import
+        return {
+            identifier: _digest(
+                f"{CACHE_VERSION}:{identifier}:"
+                + ",".join(self.hashes[i] for i in sorted(self.dependencies(node)))
+            )
+            for identifier, node in self.characters.items()
+        }
+
+
+class GlyphCache:
+    """On-disk cache of compiled grids, one file per cache key"""
+
+    def __init__(self, directory):
+        """Initialize new GlyphCache
+
+        Args:
+            directory (str): Directory to keep cached glyphs in. Created if it doesn't exist
+        """
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.directory / f"{key}.grid"
+
+    def get(self, key):
+        """Get a cached grid
+
+        Args:
+            key (str): Cache key of the glyph
+
+        Returns:
+            str: The cached grid, or None if it is not cached
+        """
+        try:
+            grid = self._path(key).read_text()
+        except FileNotFoundError:
+            hooks.emit("cache_miss", cache=self, key=key)
+            return None
+        hooks.emit("cache_hit", cache=self, key=key)
+        return grid
+
+    def put(self, key, grid):
+        """Cache a grid. The file is replaced atomically, so readers never see a partial grid
+
+        Args:
+            key (str): Cache key of the glyph
+            grid (str): Compiled grid
+        """
+        handle, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w") as temp_file:
+                temp_file.write(grid)
+            os.replace(temp_name, self._path(key))
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+
+
+class MemoryGlyphCache:
+    """In-memory, least-recently-used cache of compiled grids, for processes that rebuild repeatedly such as watch mode"""
+
+    def __init__(self, maxsize: int = 4096):
+        """Initialize new MemoryGlyphCache
+
+        Args:
+            maxsize (int, optional): Most grids to keep. Defaults to 4096.
+        """
+        self.maxsize = maxsize
+        self._grids: "OrderedDict[str, str]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._grids)
+
+    def get(self, key):
+        """Get a cached grid
+
+        Args:
+            key (str): Cache key of the glyph
+
+        Returns:
+            str: The cached grid, or None if it is not cached
+        """
+        grid = self._grids.get(key)
+        if grid is not None:
+            self._grids.move_to_end(key)
+        hooks.emit("cache_miss" if grid is None else "cache_hit",
+                   cache=self, key=key)
+        return grid
+
+    def put(self, key, grid):
+        """Cache a grid, evicting the least recently used grid if the cache is full
+
+        Args:
+            key (str): Cache key of the glyph
+            grid (str): Compiled grid
+        """
+        self._grids[key] = grid
+        self._grids.move_to_end(key)
+        while len(self._grids) > self.maxsize:
+            self._grids.popitem(last=False)
+
+
+class IncrementalCompiler:
+    """Compiles the glyphs of a Font, reusing glyphs cached by earlier compiles of unchanged declarations"""
+
+    def __init__(self, cache):
+        """Initialize new IncrementalCompiler
+
+        Args:
+            cache (GlyphCache | MemoryGlyphCache): Cache to reuse glyphs from and store compiled glyphs in
+        """
+        self.cache = cache
+        self.compiled: List[str] = []
+        self.reused: List[str] = []
+
+    def render(self, symbol, key, scale=1.0):
+        """Get a compiled copy of a glyph, from the cache if its key is unchanged
+
+        Args:
+            symbol (Symbol): Glyph definition
+            key (str): Cache key of the glyph
+            scale (float, optional): Scale factor to render at. Each scale is cached separately. Defaults to 1.0.
+
+        Returns:
+            Symbol: Compiled copy of the glyph
+        """
+        if scale != 1:
+            key = _digest(f"{key}@{scale}")
+        grid = self.cache.get(key)
+        if grid is not None:
+            self.reused.append(symbol.identifier)
+            return symbol.restore(grid)
+
+        rendered = symbol.render(scale)
+        self.cache.put(key, rendered.grid)
+        self.compiled.append(symbol.identifier)
+        return rendered
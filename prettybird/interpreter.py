@@ -1,7 +1,15 @@
+import ast
+import pathlib
+
 from lark.lexer import Token
 from lark.tree import Tree
 from lark.visitors import Interpreter
 
+from . import hooks
+from .evaluate import is_resolved
+from .font import Font
+from .images import load_image
+from .limits import get_budget
 from .symbol import Symbol
 from .function import Function
 from .utils import get_empty_grid, Array
@@ -18,25 +26,75 @@ class PrettyBirdInterpreter(Interpreter):
         "!=": lambda x, y: x != y,
     }
 
-    def __init__(self):
-        """Initialize the Interpreter"""
+    def __init__(self, path=None, importing=(), module_cache=None, allow_imports=True):
+        """Initialize the Interpreter
+
+        Args:
+            path (str, optional): Path of the file being interpreted. Imports resolve relative to it. Defaults to None, resolving them relative to the working directory.
+            importing (tuple[pathlib.Path, ...], optional): Resolved paths of the files whose imports led to this file. Defaults to ().
+            module_cache (ModuleCache, optional): Cache of imported Modules. Defaults to the shared cache.
+            allow_imports (bool, optional): If False, import statements and image bases raise an ImportError. Defaults to True.
+        """
+        self.path = pathlib.Path(path).resolve() if path is not None else None
+        self.importing = (*importing, self.path) if path is not None else tuple(importing)
+        self.module_cache = module_cache
+        self.allow_imports = allow_imports
+        self.parser = None
+        # Modules imported by this file, in the order they were imported
+        self.modules = []
+        # Images that bases were cut from, in the order they were read
+        self.images = []
+
         self.symbols = {}
         self.functions = {}
         self.current_symbol = None
         self.current_function = None
+        # Instruction lists of the repeat blocks being interpreted, innermost last
+        self.blocks = []
+        self.block_buffer = ()
+
+    def interpret(self, parser, source):
+        """Parse source code and interpret the resulting tree
+
+        Args:
+            parser (lark.Lark): Parser built from the prettybird grammar
+            source (str): Source code to interpret
+
+        Returns:
+            lark.tree.Tree: Parse tree of the source code
+        """
+        hooks.emit("parse_start", interpreter=self, source=source)
+        self.parser = parser
+        parse_tree = parser.parse(source)
+        self.visit(parse_tree)
+        hooks.emit("parse_end", interpreter=self, parse_tree=parse_tree)
+        return parse_tree
+
+    def get_font(self):
+        """Get the glyphs and functions interpreted so far as an immutable Font
+
+        Returns:
+            Font: Font that can be shared and rendered from many threads
+        """
+        return Font(self.symbols, self.functions)
 
     def setup_character_declaration(self):
         """Initialize values for character declaration statements"""
         self.current_symbol = None
 
     def prepare_instruction(self, update_mode, fill_mode):
-        if self.current_symbol is not None:
+        if self.blocks:
+            self.block_buffer = (update_mode, fill_mode)
+        elif self.current_symbol is not None:
             self.current_symbol.prepare_instruction(update_mode, fill_mode)
         elif self.current_function is not None:
             self.current_function.prepare_instruction(update_mode, fill_mode)
 
     def add_instruction(self, name, data):
-        if self.current_symbol is not None:
+        if self.blocks:
+            self.blocks[-1].append((name, *self.block_buffer, data))
+            self.block_buffer = ()
+        elif self.current_symbol is not None:
             self.current_symbol.add_instruction(name, data)
         elif self.current_function is not None:
             self.current_function.add_instruction(name, data)
@@ -61,6 +119,48 @@ class PrettyBirdInterpreter(Interpreter):
                 return None
         return self.symbols[identifier]
 
+    def import_statement(self, import_tree):
+        """Bring in the functions, and optionally the characters, of another file
+
+        Args:
+            import_tree (lark.tree.Tree): Tree containing the imported path, namespace and characters flag
+
+        Raises:
+            ImportError: If imports aren't allowed, or the file can't be imported
+            NameError: If an imported character has already been defined
+        """
+        # Imported here, as modules imports this module
+        from .modules import load_module
+
+        if not self.allow_imports:
+            raise ImportError("Imports are not allowed here")
+
+        relative_path = ast.literal_eval(import_tree.children[0].value)
+        namespace, with_characters = None, False
+        for child in import_tree.children[1:]:
+            if child.data == "import_namespace":
+                namespace = child.children[0].value
+            else:
+                with_characters = True
+
+        directory = self.path.parent if self.path is not None else pathlib.Path.cwd()
+        module = load_module(
+            directory / relative_path,
+            self.parser,
+            self.importing,
+            self.module_cache,
+        )
+        self.modules.append(module)
+
+        for name, function in module.functions.items():
+            self.functions[f"{namespace}.{name}" if namespace else name] = function
+        if with_characters:
+            for identifier, symbol in module.symbols.items():
+                if identifier in self.symbols:
+                    raise NameError(
+                        f'Identifier "{identifier}" already exists')
+                self.symbols[identifier] = symbol
+
     def character(self, declaration_tree):
         """Process character declaration
 
@@ -112,35 +212,47 @@ class PrettyBirdInterpreter(Interpreter):
                 f'Character "{self.current_symbol}" already defined a base'
             )
 
-        width_token = blank_tree.children[0]
-        height_token = blank_tree.children[1]
+        width = int(blank_tree.children[0].value)
+        height = int(blank_tree.children[1].value)
 
-        self.current_symbol.grid = get_empty_grid(
-            int(width_token.value), int(height_token.value)
-        )
+        budget = get_budget()
+        if budget is not None:
+            budget.check_canvas(width, height, self.current_symbol.identifier)
+
+        self.current_symbol.grid = get_empty_grid(width, height)
 
-    def constant_base_statement(self, constant_tree, root_call=True):
+    def constant_base_statement(self, constant_tree):
         """Set a character's base to a pre-set value
 
         Args:
             constant_tree (lark.tree.Tree): Tree containing the pre-set grid information
-            root_call (bool): Whether or not this is the root call to this function (used to determine when the tree is not being read anymore)
 
         Raises:
+            SyntaxError: If the rows are not all the same width
             TypeError: If the parse tree contains an object that is neither a Token nor a Tree
         """
-        for child in constant_tree.children:
-            if type(child) == Token:
-                self.current_symbol.append_to_grid(child.value)
-            elif type(child) == Tree:
-                self.current_symbol.append_to_grid("\n")
-                self.constant_base_statement(child, False)
-            else:
-                raise TypeError(
-                    f"Unexpected type {type(child)} in constant_base_statement"
-                )
-        if root_call:
-            self.current_symbol.finish_grid()
+        # Each row's characters are joined and the grid is set once, rather than appended a character at a time.
+        # Every row but the last is followed by a tree holding the rest of the rows
+        rows = []
+        while constant_tree is not None:
+            row, rest = [], None
+            for child in constant_tree.children:
+                if type(child) == Token:
+                    row.append(child.value)
+                elif type(child) == Tree:
+                    rest = child
+                else:
+                    raise TypeError(
+                        f"Unexpected type {type(child)} in constant_base_statement"
+                    )
+            rows.append("".join(row))
+            constant_tree = rest
+
+        if any(len(row) != len(rows[0]) for row in rows):
+            raise SyntaxError(
+                f'Rows of the base of character "{self.current_symbol.identifier}" are not all the same width'
+            )
+        self.current_symbol.grid = "\n".join(rows)
 
     def from_character_base_statement(self, character_base_tree):
         """Set a character's base to another character's computed value
@@ -154,6 +266,31 @@ class PrettyBirdInterpreter(Interpreter):
             "from_char", [self.get_symbol(from_identifier)]
         )
 
+    def image_base_statement(self, image_tree):
+        """Set a character's base to a region of a PBM or PGM image
+
+        Args:
+            image_tree (lark.tree.Tree): Tree containing the image's path and the region's position and size
+
+        Raises:
+            ImportError: If reading files isn't allowed, or the image can't be read
+            ValueError: If the file is not a PBM or PGM image, or the region doesn't lie within it
+        """
+        if not self.allow_imports:
+            raise ImportError("Image bases are not allowed here")
+
+        relative_path = ast.literal_eval(image_tree.children[0].value)
+        x, y, width, height = (int(child.value) for child in image_tree.children[1:])
+
+        budget = get_budget()
+        if budget is not None:
+            budget.check_canvas(width, height, self.current_symbol.identifier)
+
+        directory = self.path.parent if self.path is not None else pathlib.Path.cwd()
+        image = load_image(directory / relative_path)
+        self.images.append(image)
+        self.current_symbol.grid = image.grid(x, y, width, height)
+
     def function_definition(self, function_def_tree):
         function_name = function_def_tree.children[0].value
         function_parameter_names = self.visit(function_def_tree.children[1])
@@ -202,7 +339,13 @@ class PrettyBirdInterpreter(Interpreter):
                     # Either "filled" or nothing
                     fill_mode = child.value
             elif type(child) == Tree:
-                if child.data not in ("function_call_step", "stop_statement"):
+                if child.data not in (
+                    "function_call_step",
+                    "stop_statement",
+                    "repeat_statement",
+                    "morphology_statement",
+                    "compose_statement",
+                ):
                     self.prepare_instruction(
                         update_mode, fill_mode is not None)
                 self.visit(child)
@@ -260,7 +403,7 @@ class PrettyBirdInterpreter(Interpreter):
     def square_step(self, square_tree):
         left_top = self._get_point(square_tree.children[0])
         side_length = self._get_num(square_tree.children[1])
-        self.current_symbol.add_instruction("square", [left_top, side_length])
+        self.add_instruction("square", [left_top, side_length])
 
     def ellipse_step(self, ellipse_tree):
         p1, p2 = None, None
@@ -311,6 +454,49 @@ class PrettyBirdInterpreter(Interpreter):
                     self.comparator_dict[stop_tree.children[1].value], left, right]
             )
 
+    def morphology_statement(self, morphology_tree):
+        operation, amount = morphology_tree.children
+        self.prepare_instruction(False, False)
+        self.add_instruction(
+            "morphology", [operation.value, 1 if amount is None else self.type(amount)])
+
+    def compose_statement(self, compose_tree):
+        """Overlay another character's glyph onto the current one
+
+        Args:
+            compose_tree (lark.tree.Tree): Tree containing the character's identifier and optional offset
+
+        Raises:
+            ValueError: If a character is composed onto itself
+        """
+        identifier, *offset = compose_tree.children
+        symbol = self.get_symbol(identifier.value)
+        if symbol is self.current_symbol:
+            raise ValueError(
+                f'Character "{identifier.value}" cannot be composed onto itself')
+        dx, dy = [self.type(child) for child in offset] if offset else (0, 0)
+        self.prepare_instruction(False, False)
+        self.add_instruction("compose", [symbol, dx, dy])
+
+    def repeat_statement(self, repeat_tree):
+        """Collect the steps of a repeat loop into a single instruction
+
+        Args:
+            repeat_tree (lark.tree.Tree): Tree containing the loop variable, bounds, optional step and steps
+        """
+        variable = repeat_tree.children[0].value
+        start = self.type(repeat_tree.children[1])
+        stop = self.type(repeat_tree.children[2])
+        step = self.type(repeat_tree.children[3]) if len(
+            repeat_tree.children) == 5 else 1.0
+
+        self.blocks.append([])
+        self.visit(repeat_tree.children[-1])
+        body = self.blocks.pop()
+
+        self.prepare_instruction(False, False)
+        self.add_instruction("repeat", [variable, start, stop, step, body])
+
     def _expr_simplify(self, to_simplify):
         if to_simplify.shape != () and len(to_simplify) > 1:
             return tuple(to_simplify)
@@ -320,11 +506,8 @@ class PrettyBirdInterpreter(Interpreter):
     def add_expr(self, add_tree):
         left = self.type(add_tree.children[0])
         right = self.type(add_tree.children[1])
-        if type(left) not in (int, float, tuple) or type(right) not in (
-            int,
-            float,
-            tuple,
-        ):
+        # Points can only be added now if none of their coordinates refer to names
+        if not (is_resolved(left) and is_resolved(right)):
             return [lambda x, y: x + y, left, right]
         out = Array(left) + Array(right)
         return self._expr_simplify(out)
@@ -397,6 +580,8 @@ class PrettyBirdInterpreter(Interpreter):
         if type(type_tree_or_token) == Tree:
             if "expr" in type_tree_or_token.data:
                 return self.visit(type_tree_or_token)
+            elif type_tree_or_token.data == "negative_int":
+                return self._get_num(type_tree_or_token)
             elif len(type_tree_or_token.children) > 1:
                 return self._get_point(type_tree_or_token)
             else:
@@ -406,9 +591,39 @@ class PrettyBirdInterpreter(Interpreter):
                 return type_tree_or_token.value
             return self._get_num(type_tree_or_token)
 
-    # TODO: draw generalized bezier curve
+    def _get_path(self, path_tree):
+        """Get the points and fill rule of a polygon or polyline
+
+        Args:
+            path_tree (lark.tree.Tree): Tree containing the path's points and optional fill rule
+
+        Returns:
+            list: The path's points, and True if it is filled with the non-zero winding rule
+        """
+        points, nonzero = [], False
+        for child in path_tree.children:
+            if type(child) == Token and child.type == "FILL_RULE":
+                nonzero = child.value == "nonzero"
+            else:
+                points.append(self._get_point(child))
+        return [points, nonzero]
+
+    def polygon_step(self, polygon_tree):
+        self.add_instruction("polygon", self._get_path(polygon_tree))
+
+    def polyline_step(self, polyline_tree):
+        self.add_instruction("polyline", self._get_path(polyline_tree))
+
+    def fill_step(self, fill_tree):
+        seed = self._get_point(fill_tree.children[0])
+        connectivity = 4
+        if len(fill_tree.children) == 2:
+            connectivity = int(fill_tree.children[1])
+            if connectivity not in (4, 8):
+                raise ValueError(
+                    f"Fills connect through 4 or 8 neighbors, not {connectivity}")
+        self.add_instruction("fill", [seed, connectivity])
+
     def bezier_step(self, bezier_tree):
-        p0 = self._get_point(bezier_tree.children[0])
-        p1 = self._get_point(bezier_tree.children[1])
-        p2 = self._get_point(bezier_tree.children[2])
-        self.add_instruction("bezier", [p0, p1, p2])
+        self.add_instruction(
+            "bezier", [self._get_point(child) for child in bezier_tree.children])
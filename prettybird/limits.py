@@ -0,0 +1,249 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from typing import Optional
+
+_active_budget: ContextVar[Optional["Budget"]] = ContextVar(
+    "prettybird_budget", default=None
+)
+
+
+def get_budget():
+    """Get the Budget enforcing resource limits in the current context
+
+    Returns:
+        Budget: Active Budget, or None if no limits are enforced
+    """
+    return _active_budget.get()
+
+
+@contextmanager
+def enforcing(limits):
+    """Enforce resource limits for the duration of the context. The font's timeout starts counting on entry
+
+    Args:
+        limits (Limits): Limits to enforce
+
+    Yields:
+        Budget: The Budget tracking resource usage against the limits
+    """
+    budget = Budget(limits)
+    token = _active_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _active_budget.reset(token)
+
+
+class ResourceLimitExceeded(RuntimeError):
+    """Raised when compiling a font or glyph exceeds one of its resource limits"""
+
+    resource = "resource"
+
+    def __init__(self, value, limit, identifier=None):
+        """Initialize new ResourceLimitExceeded
+
+        Args:
+            value: Amount of the resource that was used
+            limit: The limit that was exceeded, or None for limits imposed by Python itself
+            identifier (str, optional): Identifier of the glyph being compiled, or None for the whole font. Defaults to None.
+        """
+        subject = f'Glyph "{identifier}"' if identifier is not None else "Font"
+        if limit is None:
+            message = f"{subject} exceeded the {self.resource} limit"
+        else:
+            message = f"{subject} exceeded the {self.resource} limit of {limit} ({value})"
+        super().__init__(message)
+        self.value = value
+        self.limit = limit
+        self.identifier = identifier
+
+
+class CanvasTooLarge(ResourceLimitExceeded):
+    resource = "canvas area"
+
+
+class PixelLimitExceeded(ResourceLimitExceeded):
+    resource = "pixels written"
+
+
+class FunctionCallLimitExceeded(ResourceLimitExceeded):
+    resource = "function call"
+
+
+class FunctionDepthExceeded(ResourceLimitExceeded):
+    resource = "function depth"
+
+
+class GlyphTimeout(ResourceLimitExceeded):
+    resource = "glyph time (seconds)"
+
+
+class FontTimeout(ResourceLimitExceeded):
+    resource = "font time (seconds)"
+
+
+class Limits:
+    """Resource limits for compiling untrusted sources. None disables a limit
+
+    Limits only hold configuration, so one Limits can be shared by every compile.
+    Usage is tracked by the Budget created when the limits are enforced.
+    """
+
+    def __init__(
+        self,
+        max_canvas_area: Optional[int] = None,
+        max_pixels: Optional[int] = None,
+        max_function_calls: Optional[int] = None,
+        max_function_depth: Optional[int] = None,
+        glyph_timeout: Optional[float] = None,
+        font_timeout: Optional[float] = None,
+    ):
+        """Initialize new Limits
+
+        Args:
+            max_canvas_area (int, optional): Largest width * height of any base. Defaults to None.
+            max_pixels (int, optional): Most pixel writes per glyph, including function subspaces. Defaults to None.
+            max_function_calls (int, optional): Most function calls per glyph. Defaults to None.
+            max_function_depth (int, optional): Deepest function call nesting. Defaults to None.
+            glyph_timeout (float, optional): Most seconds spent compiling one glyph. Defaults to None.
+            font_timeout (float, optional): Most seconds spent interpreting and compiling the whole font. Defaults to None.
+        """
+        self.max_canvas_area = max_canvas_area
+        self.max_pixels = max_pixels
+        self.max_function_calls = max_function_calls
+        self.max_function_depth = max_function_depth
+        self.glyph_timeout = glyph_timeout
+        self.font_timeout = font_timeout
+
+
+class Budget:
+    """Tracks the resources used by one compile against its Limits"""
+
+    def __init__(self, limits):
+        self.limits = limits
+
+        self._start = time.perf_counter()
+        self._font_deadline = (
+            self._start + limits.font_timeout
+            if limits.font_timeout is not None
+            else None
+        )
+
+        self._identifier = None
+        self._glyph_start = 0.0
+        self._glyph_deadline = None
+        self._pixels = 0
+        self._function_calls = 0
+        self._function_depth = 0
+
+    @property
+    def idle(self):
+        """Determine whether or not the Budget is outside of any glyph
+
+        Returns:
+            bool: True if no glyph is being compiled
+        """
+        return self._identifier is None
+
+    def check_canvas(self, width, height, identifier=None):
+        """Check a base's size before it is allocated
+
+        Args:
+            width (int): Width of the base
+            height (int): Height of the base
+            identifier (str, optional): Identifier of the glyph the base belongs to. Defaults to None.
+
+        Raises:
+            CanvasTooLarge: If the base's area exceeds the limit
+        """
+        limit = self.limits.max_canvas_area
+        if limit is not None and width * height > limit:
+            raise CanvasTooLarge(width * height, limit, identifier)
+
+    def check_time(self):
+        """Check the glyph and font timeouts
+
+        Raises:
+            GlyphTimeout: If the current glyph has run out of time
+            FontTimeout: If the font has run out of time
+        """
+        now = time.perf_counter()
+        if self._font_deadline is not None and now > self._font_deadline:
+            raise FontTimeout(round(now - self._start, 3),
+                              self.limits.font_timeout)
+        if self._glyph_deadline is not None and now > self._glyph_deadline:
+            raise GlyphTimeout(
+                round(now - self._glyph_start, 3),
+                self.limits.glyph_timeout,
+                self._identifier,
+            )
+
+    def spend(self, pixels):
+        """Account for pixels written by an instruction, then check the time limits
+
+        Args:
+            pixels (int): Number of pixels the instruction wrote
+
+        Raises:
+            PixelLimitExceeded: If the current glyph has written too many pixels
+        """
+        self._pixels += pixels
+        limit = self.limits.max_pixels
+        if limit is not None and self._pixels > limit:
+            raise PixelLimitExceeded(self._pixels, limit, self._identifier)
+        self.check_time()
+
+    @contextmanager
+    def glyph(self, symbol):
+        """Track the resources used compiling a glyph
+
+        Args:
+            symbol (Symbol): Symbol being compiled
+        """
+        self.check_time()
+
+        self._identifier = symbol.identifier
+        self._glyph_start = time.perf_counter()
+        self._glyph_deadline = (
+            self._glyph_start + self.limits.glyph_timeout
+            if self.limits.glyph_timeout is not None
+            else None
+        )
+        self._pixels = 0
+        self._function_calls = 0
+        self._function_depth = 0
+        try:
+            yield
+        finally:
+            self._identifier = None
+
+    @contextmanager
+    def function(self, function_name):
+        """Track a function call
+
+        Args:
+            function_name (str): Name of the function being called
+
+        Raises:
+            FunctionCallLimitExceeded: If the current glyph has made too many function calls
+            FunctionDepthExceeded: If function calls are nested too deeply
+        """
+        self._function_calls += 1
+        limit = self.limits.max_function_calls
+        if limit is not None and self._function_calls > limit:
+            raise FunctionCallLimitExceeded(
+                self._function_calls, limit, self._identifier
+            )
+
+        self._function_depth += 1
+        try:
+            limit = self.limits.max_function_depth
+            if limit is not None and self._function_depth > limit:
+                raise FunctionDepthExceeded(
+                    self._function_depth, limit, self._identifier
+                )
+            yield
+        finally:
+            self._function_depth -= 1
@@ -0,0 +1,217 @@
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from typing import Dict, List, Optional
+
+from .limits import ResourceLimitExceeded
+
+_active_tracker: ContextVar[Optional["MemoryTracker"]] = ContextVar(
+    "prettybird_memory_tracker", default=None
+)
+
+
+def get_memory_tracker():
+    """Get the MemoryTracker accounting for allocations in the current context
+
+    Returns:
+        MemoryTracker: Active MemoryTracker, or None if memory accounting is off
+    """
+    return _active_tracker.get()
+
+
+@contextmanager
+def tracking_memory(tracker):
+    """Account for allocations with a MemoryTracker for the duration of the context. Starts tracemalloc if it isn't already tracing
+
+    Args:
+        tracker (MemoryTracker): MemoryTracker to activate
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    token = _active_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _active_tracker.reset(token)
+        if started:
+            tracemalloc.stop()
+
+
+class MemoryLimitExceeded(ResourceLimitExceeded):
+    """Raised when compiling a glyph uses more memory than its ceiling allows"""
+
+    resource = "memory (bytes)"
+
+
+class MemoryUsage:
+    """Memory statistics for a glyph or function"""
+
+    __slots__ = ("calls", "peak", "allocations", "top", "aborted")
+
+    def __init__(self):
+        self.calls = 0
+        # Largest number of bytes allocated at once, above what was allocated before the call
+        self.peak = 0
+        # Net number of memory blocks allocated (glyphs only)
+        self.allocations = 0
+        # Source lines that allocated the most memory, as (location, bytes) (glyphs only)
+        self.top: List[tuple[str, int]] = []
+        self.aborted = False
+
+
+class _Frame:
+    __slots__ = ("base", "peak")
+
+    def __init__(self):
+        self.base = tracemalloc.get_traced_memory()[0]
+        self.peak = self.base
+
+
+class MemoryTracker:
+    """Tracks peak memory per glyph and per function with tracemalloc, optionally enforcing a per-glyph ceiling
+
+    tracemalloc only keeps one peak, so it is reset on entering every glyph and
+    function, and each frame keeps the highest peak seen while it was active.
+    """
+
+    def __init__(self, limit: Optional[int] = None, top: int = 3):
+        """Initialize new MemoryTracker
+
+        Args:
+            limit (int, optional): Maximum bytes a glyph may allocate before it is aborted. Defaults to None.
+            top (int, optional): Number of largest contributors to report per glyph. Defaults to 3.
+        """
+        self.limit = limit
+        self.top = top
+        self.glyphs: Dict[str, MemoryUsage] = {}
+        self.functions: Dict[str, MemoryUsage] = {}
+
+        self._stack: List[_Frame] = []
+        self._glyph_identifier = None
+
+    @property
+    def idle(self):
+        """Determine whether or not the MemoryTracker is outside of any glyph
+
+        Returns:
+            bool: True if no glyph is being tracked
+        """
+        return not self._stack
+
+    @staticmethod
+    def _usage(table, name):
+        if name not in table:
+            table[name] = MemoryUsage()
+        return table[name]
+
+    def _enter(self):
+        if self._stack:
+            self._stack[-1].peak = max(
+                self._stack[-1].peak, tracemalloc.get_traced_memory()[1]
+            )
+        tracemalloc.reset_peak()
+        frame = _Frame()
+        self._stack.append(frame)
+        return frame
+
+    def _exit(self, frame, usage):
+        frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1].peak = max(self._stack[-1].peak, frame.peak)
+
+        usage.calls += 1
+        usage.peak = max(usage.peak, frame.peak - frame.base)
+
+    @staticmethod
+    def _snapshot():
+        # Leave out the memory used by taking snapshots
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+
+    @contextmanager
+    def glyph(self, symbol):
+        """Track the memory used compiling a glyph
+
+        Args:
+            symbol (Symbol): Symbol being compiled
+        """
+        usage = MemoryTracker._usage(self.glyphs, symbol.identifier)
+        self._glyph_identifier = symbol.identifier
+        before = MemoryTracker._snapshot()
+        frame = self._enter()
+        try:
+            yield
+        except MemoryLimitExceeded:
+            usage.aborted = True
+            raise
+        finally:
+            self._exit(frame, usage)
+            self._glyph_identifier = None
+
+            differences = MemoryTracker._snapshot().compare_to(before, "lineno")
+            usage.allocations = sum(stat.count_diff for stat in differences)
+            usage.top = [
+                (str(stat.traceback[0]), stat.size_diff)
+                for stat in sorted(
+                    differences, key=lambda stat: stat.size_diff, reverse=True
+                )[: self.top]
+                if stat.size_diff > 0
+            ]
+
+    @contextmanager
+    def function(self, function_name):
+        """Track the memory used by a function call
+
+        Args:
+            function_name (str): Name of the function being called
+        """
+        frame = self._enter()
+        try:
+            yield
+        finally:
+            self._exit(frame, MemoryTracker._usage(
+                self.functions, function_name))
+
+    def check(self):
+        """Abort the current glyph if it has allocated more memory than the limit
+
+        Raises:
+            MemoryLimitExceeded: If the current glyph exceeded the limit
+        """
+        if self.limit is None or not self._stack:
+            return
+        glyph_frame = self._stack[0]
+        peak = max(
+            [frame.peak for frame in self._stack]
+            + [tracemalloc.get_traced_memory()[1]]
+        )
+        if peak - glyph_frame.base > self.limit:
+            raise MemoryLimitExceeded(
+                peak - glyph_frame.base, self.limit, self._glyph_identifier
+            )
+
+    def report(self):
+        """Format the collected statistics, sorted by peak memory
+
+        Returns:
+            str: Human-readable report
+        """
+        out = f"{'Glyph':<24}{'peak KiB':>12}{'allocs':>10}\n"
+        for name, usage in sorted(
+            self.glyphs.items(), key=lambda item: item[1].peak, reverse=True
+        ):
+            out += f"{name:<24}{usage.peak / 1024:>12.1f}{usage.allocations:>10}"
+            out += " (aborted)\n" if usage.aborted else "\n"
+            for location, size in usage.top:
+                out += f"    {size / 1024:>10.1f} KiB  {location}\n"
+
+        out += f"\n{'Function':<24}{'calls':>8}{'peak KiB':>12}\n"
+        for name, usage in sorted(
+            self.functions.items(), key=lambda item: item[1].peak, reverse=True
+        ):
+            out += f"{name:<24}{usage.calls:>8}{usage.peak / 1024:>12.1f}\n"
+        return out
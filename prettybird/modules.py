@@ -0,0 +1,207 @@
+"""Imports between source files
+
+An imported file is interpreted on its own into a Module holding its functions
+and characters. Modules are cached in memory, keyed by a digest of their source,
+and reused by every file that imports them for as long as neither they nor any
+file they import in turn has changed. A library shared by a family of fonts, or
+imported again on every rebuild in watch mode, is parsed and interpreted once.
+"""
+
+import hashlib
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from . import hooks
+
+
+def _digest(data: str) -> str:
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def _file_digest(path) -> str:
+    # Hashed as bytes, as images are files the Module was built from too
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+class Module:
+    """The functions and characters interpreted from an imported file"""
+
+    def __init__(self, path, functions, symbols, dependencies):
+        """Initialize new Module
+
+        Args:
+            path (pathlib.Path): Resolved path of the file
+            functions (dict[str, Function]): Functions the file defines or imports
+            symbols (dict[str, Symbol]): Characters the file defines or imports
+            dependencies (tuple[tuple[pathlib.Path, str], ...]): Path and digest of the file, of every image it reads and of every file it imports, directly or transitively
+        """
+        self.path = path
+        self.functions = functions
+        self.symbols = symbols
+        self.dependencies = dependencies
+
+    @property
+    def files(self):
+        """Get every file the Module was built from
+
+        Returns:
+            list[str]: Paths of the file, of every image it reads and of every file it imports
+        """
+        return [str(path) for path, _ in self.dependencies]
+
+    @property
+    def fingerprint(self):
+        """Get a digest that changes whenever the file or any file it imports changes
+
+        Returns:
+            str: Hex digest of the Module's dependencies
+        """
+        return _digest(repr([(str(path), digest) for path, digest in self.dependencies]))
+
+    def is_current(self):
+        """Determine whether or not every file the Module was built from is unchanged
+
+        Returns:
+            bool: True if the Module can be reused
+        """
+        for path, digest in self.dependencies:
+            try:
+                if _file_digest(path) != digest:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+
+class ModuleCache:
+    """Thread-safe, least-recently-used cache of interpreted Modules, keyed by a digest of their source and location
+
+    Only the latest version of each file is kept, so editing an imported file in
+    watch mode replaces its Module rather than adding another.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        """Initialize new ModuleCache
+
+        Args:
+            maxsize (int, optional): Most Modules to keep. Defaults to 64.
+        """
+        self.maxsize = maxsize
+        self._modules: "OrderedDict[str, Module]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._modules)
+
+    @staticmethod
+    def key(path, source) -> str:
+        """Get the cache key for a file. Imports resolve relative to the file, so its directory is part of the key
+
+        Args:
+            path (pathlib.Path): Resolved path of the file
+            source (str): Source code of the file
+
+        Returns:
+            str: Hex digest of the file's directory and source
+        """
+        return _digest(f"{path.parent}\0{source}")
+
+    def get(self, key) -> Optional[Module]:
+        """Get a cached Module, if every file it was built from is unchanged
+
+        Args:
+            key (str): Cache key of the file
+
+        Returns:
+            Module: The cached Module, or None if it is not cached or is out of date
+        """
+        with self._lock:
+            module = self._modules.get(key)
+            if module is not None:
+                self._modules.move_to_end(key)
+        if module is None or not module.is_current():
+            hooks.emit("cache_miss", cache=self, key=key)
+            return None
+        hooks.emit("cache_hit", cache=self, key=key)
+        return module
+
+    def put(self, key, module: Module):
+        """Cache a Module, replacing any other version of the same file and evicting the least recently used
+        Module if the cache is full
+
+        Args:
+            key (str): Cache key of the file
+            module (Module): Module interpreted from the file
+        """
+        with self._lock:
+            for stale in [k for k, cached in self._modules.items() if cached.path == module.path and k != key]:
+                del self._modules[stale]
+            self._modules[key] = module
+            self._modules.move_to_end(key)
+            while len(self._modules) > self.maxsize:
+                self._modules.popitem(last=False)
+
+    def clear(self):
+        """Forget every cached Module"""
+        with self._lock:
+            self._modules.clear()
+
+
+# Shared by every interpreter in the process
+module_cache = ModuleCache()
+
+
+def load_module(path, parser=None, importing: Tuple[pathlib.Path, ...] = (), cache: Optional[ModuleCache] = None) -> Module:
+    """Get the Module for a file, interpreting it only if it isn't cached
+
+    Args:
+        path (str | pathlib.Path): Path of the file
+        parser (lark.Lark, optional): Parser for the grammar. Defaults to the shared parser.
+        importing (tuple[pathlib.Path, ...], optional): Resolved paths of the files whose imports led here, outermost first. Defaults to ().
+        cache (ModuleCache, optional): Cache to reuse Modules from. Defaults to the shared cache.
+
+    Raises:
+        ImportError: If the file imports itself, directly or through other files, or can't be read
+
+    Returns:
+        Module: The file's functions and characters
+    """
+    # Imported here, as both import this module
+    from .api import get_parser
+    from .interpreter import PrettyBirdInterpreter
+
+    path = pathlib.Path(path).resolve()
+    if path in importing:
+        cycle = [*importing[importing.index(path):], path]
+        raise ImportError(
+            f"Circular import: {' -> '.join(p.name for p in cycle)}")
+
+    try:
+        source = path.read_text()
+    except OSError as e:
+        raise ImportError(f'Cannot import "{path}": {e.strerror}') from e
+
+    cache = cache if cache is not None else module_cache
+    key = ModuleCache.key(path, source)
+    module = cache.get(key)
+    if module is not None:
+        return module
+
+    interpreter = PrettyBirdInterpreter(path, importing=importing, module_cache=cache)
+    interpreter.interpret(parser if parser is not None else get_parser(), source)
+
+    dependencies = {path: _file_digest(path)}
+    for image in interpreter.images:
+        dependencies[image.path] = image.digest
+    for imported in interpreter.modules:
+        dependencies.update(imported.dependencies)
+    module = Module(
+        path,
+        dict(interpreter.functions),
+        dict(interpreter.symbols),
+        tuple(dependencies.items()),
+    )
+    cache.put(key, module)
+    return module
@@ -0,0 +1,123 @@
+"""Synthetic weights for compiled glyphs
+
+Glyphs are processed as packed rows, one integer per row with the leftmost
+pixel in the most significant bit, so each pass over a glyph is a handful of
+shifts, ORs and ANDs per row regardless of its width. Pixels outside the grid
+count as empty.
+"""
+
+from typing import Callable, Dict, List
+
+
+def _mask(width) -> int:
+    return (1 << width) - 1
+
+
+def dilate(rows: List[int], width: int, amount: int = 1) -> List[int]:
+    """Grow every drawn region by a number of pixels in all eight directions
+
+    Args:
+        rows (list[int]): Packed rows of the glyph
+        width (int): Width of the glyph in pixels
+        amount (int, optional): Pixels to grow by. Defaults to 1.
+
+    Returns:
+        list[int]: Packed rows of the dilated glyph
+    """
+    mask = _mask(width)
+    for _ in range(amount):
+        # Grow along each row, then across neighboring rows
+        spread = [(row | row << 1 | row >> 1) & mask for row in rows]
+        rows = [
+            spread[y]
+            | (spread[y - 1] if y > 0 else 0)
+            | (spread[y + 1] if y + 1 < len(rows) else 0)
+            for y in range(len(rows))
+        ]
+    return rows
+
+
+def erode(rows: List[int], width: int, amount: int = 1) -> List[int]:
+    """Shrink every drawn region by a number of pixels in all eight directions
+
+    Args:
+        rows (list[int]): Packed rows of the glyph
+        width (int): Width of the glyph in pixels
+        amount (int, optional): Pixels to shrink by. Defaults to 1.
+
+    Returns:
+        list[int]: Packed rows of the eroded glyph
+    """
+    for _ in range(amount):
+        # A pixel survives if its whole neighborhood is drawn. Outside the grid is empty
+        shrunk = [row & row << 1 & row >> 1 for row in rows]
+        rows = [
+            shrunk[y]
+            & (shrunk[y - 1] if y > 0 else 0)
+            & (shrunk[y + 1] if y + 1 < len(rows) else 0)
+            for y in range(len(rows))
+        ]
+    return rows
+
+
+def embolden(rows: List[int], width: int, amount: int = 1) -> List[int]:
+    """Thicken vertical strokes by extending every row to the right, keeping heights unchanged
+
+    Args:
+        rows (list[int]): Packed rows of the glyph
+        width (int): Width of the glyph in pixels
+        amount (int, optional): Pixels to thicken by. Defaults to 1.
+
+    Returns:
+        list[int]: Packed rows of the emboldened glyph
+    """
+    emboldened = list(rows)
+    for shift in range(1, amount + 1):
+        emboldened = [row | original >> shift for row,
+                      original in zip(emboldened, rows)]
+    return emboldened
+
+
+def hollow(rows: List[int], width: int, amount: int = 1) -> List[int]:
+    """Keep only the edges of every drawn region, clearing the inside
+
+    Args:
+        rows (list[int]): Packed rows of the glyph
+        width (int): Width of the glyph in pixels
+        amount (int, optional): Thickness of the edges kept, in pixels. Defaults to 1.
+
+    Returns:
+        list[int]: Packed rows of the hollowed glyph
+    """
+    return [row & ~inner for row, inner in zip(rows, erode(rows, width, amount))]
+
+
+OPERATIONS: Dict[str, Callable[[List[int], int, int], List[int]]] = {
+    "dilate": dilate,
+    "erode": erode,
+    "embolden": embolden,
+    "hollow": hollow,
+}
+
+
+def apply(symbol, operation: str, amount: int = 1):
+    """Apply a weight operation to a compiled Symbol's grid
+
+    Args:
+        symbol (Symbol): Compiled Symbol to modify
+        operation (str): Name of the operation, one of OPERATIONS
+        amount (int, optional): Pixels to apply the operation by. Defaults to 1.
+
+    Raises:
+        ValueError: If the operation does not exist or the amount is negative
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(
+            f'Unknown weight operation "{operation}", expected one of {list(OPERATIONS)}')
+    if amount < 0:
+        raise ValueError(
+            f"Weight operations apply by at least 0 pixels, not {amount}")
+    # Past the larger side of the grid, more passes change nothing, so huge amounts cost no more than that
+    amount = min(amount, max(symbol.width, symbol.height))
+    symbol.set_packed_rows(OPERATIONS[operation](
+        symbol.packed_rows(), symbol.width, amount))
@@ -1,14 +1,141 @@
 import argparse
+import asyncio
 import pathlib
-
-from lark import Lark
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
 from . import PrettyBirdInterpreter
-from .formats import Format, BDF, SVG
+from .api import get_parser
+from .incremental import (
+    DependencyGraph,
+    GlyphCache,
+    IncrementalCompiler,
+    MemoryGlyphCache,
+)
+from .limits import FontTimeout, Limits, ResourceLimitExceeded, enforcing
+from .memory import MemoryTracker, tracking_memory
+from .morphology import OPERATIONS, apply as apply_morphology
+from .profiling import Profiler, profiling
+from .server import CompileServer
+from .symbol import sharing_components
+from .watch import watch
+from .formats import Format, BDF, SVG, Atlas, GlyphStore
 
+from contextlib import nullcontext
 from typing import Type
 
 
+def add_limit_arguments(parser):
+    """Add the resource limit options to an argument parser
+
+    Args:
+        parser (argparse.ArgumentParser): Parser to add the options to
+    """
+    parser.add_argument(
+        "--max-canvas-area",
+        default=None,
+        help="Reject glyphs whose base is larger than this many pixels",
+        type=int,
+    )
+    parser.add_argument(
+        "--max-pixels",
+        default=None,
+        help="Skip glyphs that write more than this many pixels while compiling",
+        type=int,
+    )
+    parser.add_argument(
+        "--max-function-calls",
+        default=None,
+        help="Skip glyphs that make more than this many function calls",
+        type=int,
+    )
+    parser.add_argument(
+        "--max-function-depth",
+        default=None,
+        help="Skip glyphs that nest function calls deeper than this",
+        type=int,
+    )
+    parser.add_argument(
+        "--glyph-timeout",
+        default=None,
+        help="Skip glyphs that take more than this many seconds to compile",
+        type=float,
+    )
+    parser.add_argument(
+        "--timeout",
+        default=None,
+        help="Abort if the font takes more than this many seconds to compile",
+        type=float,
+    )
+
+
+def get_limits(args):
+    """Build resource limits from parsed arguments
+
+    Args:
+        args (argparse.Namespace): Parsed arguments object
+
+    Returns:
+        Limits: Limits selected by the resource limit options
+    """
+    return Limits(
+        max_canvas_area=args.max_canvas_area,
+        max_pixels=args.max_pixels,
+        max_function_calls=args.max_function_calls,
+        max_function_depth=args.max_function_depth,
+        glyph_timeout=args.glyph_timeout,
+        font_timeout=args.timeout,
+    )
+
+
+def pixel_sizes(value):
+    """Parse a comma-separated list of pixel sizes
+
+    Args:
+        value (str): Argument value, such as "8,12,16"
+
+    Raises:
+        argparse.ArgumentTypeError: If a size is not a positive integer
+
+    Returns:
+        list[int]: The sizes, in the order given
+    """
+    try:
+        sizes = [int(size) for size in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'"{value}" is not a comma-separated list of pixel sizes') from None
+    if any(size < 1 for size in sizes):
+        raise argparse.ArgumentTypeError("Pixel sizes must be at least 1")
+    return sizes
+
+
+def weight_operation(value):
+    """Parse a weight operation and the pixels to apply it by
+
+    Args:
+        value (str): Argument value, such as "dilate" or "embolden:2"
+
+    Raises:
+        argparse.ArgumentTypeError: If the operation does not exist or the pixels are not a non-negative integer
+
+    Returns:
+        tuple[str, int]: Name of the operation and the pixels to apply it by
+    """
+    operation, _, amount = value.partition(":")
+    if operation not in OPERATIONS:
+        raise argparse.ArgumentTypeError(
+            f'Unknown weight operation "{operation}", expected one of {list(OPERATIONS)}')
+    try:
+        amount = int(amount) if amount else 1
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'"{amount}" is not a number of pixels') from None
+    if amount < 0:
+        raise argparse.ArgumentTypeError("Weight operations apply by at least 0 pixels")
+    return operation, amount
+
+
 def get_args():
     """Parse command line arguments
 
@@ -29,9 +156,28 @@ def get_args():
         "--format",
         "-f",
         default="TTF",
-        help="Format to convert to. Supported: [BDF, SVG, TTF]",
+        help="Format to convert to. Supported: [ATLAS, BDF, STORE, SVG, TTF]",
         type=str,
     )
+    parser.add_argument(
+        "--bit-depth",
+        default=1,
+        choices=[1, 8],
+        help="Bits per pixel of ATLAS images (1 for PBM, 8 for PGM)",
+        type=int,
+    )
+    parser.add_argument(
+        "--sdf-spread",
+        default=0,
+        help="Store signed distance fields spreading this many pixels from each edge in ATLAS images",
+        type=int,
+    )
+    parser.add_argument(
+        "--sdf-scale",
+        default=None,
+        help="Output pixels per glyph pixel of signed distance fields",
+        type=int,
+    )
     parser.add_argument(
         "--font-name",
         "-n",
@@ -45,6 +191,64 @@ def get_args():
         action="store_true",
         help="Print compiled glyph IR to stdout",
     )
+    parser.add_argument(
+        "--weight",
+        default=[],
+        action="append",
+        help="Derive a weight from the compiled glyphs with OPERATION[:PIXELS], one of [dilate, erode, embolden, hollow]. Can be repeated to apply several in order",
+        type=weight_operation,
+    )
+    parser.add_argument(
+        "--sizes",
+        default=None,
+        help="Render a strike at each of these comma-separated pixel sizes, writing <font name>-<size>.bdf for each",
+        type=pixel_sizes,
+    )
+    parser.add_argument(
+        "--design-size",
+        default=None,
+        help="Pixel size the glyphs are designed at, which --sizes scale from. Defaults to the height of the tallest base",
+        type=int,
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        default=None,
+        help="Most strikes to render at once. Defaults to one per size",
+        type=int,
+    )
+    parser.add_argument(
+        "--watch",
+        "-w",
+        default=False,
+        action="store_true",
+        help="Rebuild whenever the input file changes, recompiling only the glyphs affected by the change",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Cache compiled glyphs in this directory, and only recompile glyphs whose declarations or dependencies changed",
+        type=str,
+    )
+    parser.add_argument(
+        "--profile",
+        default=False,
+        action="store_true",
+        help="Report time, pixels written and calls per glyph, instruction and function. Writes a flamegraph-compatible <font name>.profile.folded",
+    )
+    parser.add_argument(
+        "--memory-report",
+        default=False,
+        action="store_true",
+        help="Report peak memory, allocations and the largest contributors per glyph and function",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        default=None,
+        help="Skip glyphs that allocate more than this many MiB while compiling",
+        type=float,
+    )
+    add_limit_arguments(parser)
 
     return parser.parse_args()
 
@@ -57,10 +261,97 @@ def get_format(format_name: str) -> Type[Format]:
         return SVG
     elif format_name == "TTF":
         return SVG
+    elif format_name == "ATLAS":
+        return Atlas
+    elif format_name == "STORE":
+        return GlyphStore
     raise NotImplementedError(f"Font format {format_name} is not supported")
 
 
+def get_serve_args(argv):
+    """Parse command line arguments of the serve command
+
+    Args:
+        argv (list[str]): Arguments following "serve"
+
+    Returns:
+        argparse.Namespace: Parsed arguments object
+    """
+    parser = argparse.ArgumentParser(
+        prog="prettybird serve",
+        description="Serve compiled glyphs and fonts over HTTP, keeping the parser and caches warm",
+    )
+
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address to listen on",
+        type=str,
+    )
+    parser.add_argument(
+        "--port",
+        "-p",
+        default=8080,
+        help="Port to listen on",
+        type=int,
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="Listen on this Unix socket instead of a TCP port",
+        type=str,
+    )
+    parser.add_argument(
+        "--workers",
+        default=4,
+        help="Most requests to compile at once",
+        type=int,
+    )
+    parser.add_argument(
+        "--cache-size",
+        default=64,
+        help="Most parsed fonts to keep cached",
+        type=int,
+    )
+    parser.add_argument(
+        "--max-body",
+        default=1 << 20,
+        help="Largest accepted source, in bytes",
+        type=int,
+    )
+    add_limit_arguments(parser)
+    # Requests come from the network, so they are limited unless asked otherwise
+    parser.set_defaults(timeout=10.0, max_canvas_area=1 << 20, max_pixels=1 << 24)
+
+    return parser.parse_args(argv)
+
+
+def serve(argv):
+    """Run the compile server until interrupted
+
+    Args:
+        argv (list[str]): Arguments following "serve"
+    """
+    args = get_serve_args(argv)
+    server = CompileServer(
+        limits=get_limits(args),
+        cache_size=args.cache_size,
+        workers=args.workers,
+        max_body=args.max_body,
+    )
+    where = args.socket if args.socket else f"http://{args.host}:{args.port}"
+    print(f"Serving on {where}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        serve(sys.argv[2:])
+        return
+
     # Get command-line arguments
     args = get_args()
 
@@ -68,21 +359,132 @@ def main():
         args.font_name = pathlib.Path(args.input_file).stem
     args.format = args.format.lower()
 
-    if not args.bitmap and args.format == "bdf":
+    if args.profile and not args.bitmap:
+        raise RuntimeError(
+            "The '--bitmap' option must be used to profile compilation")
+    if (args.memory_report or args.memory_limit) and not args.bitmap:
+        raise RuntimeError(
+            "The '--bitmap' option must be used with '--memory-report' or '--memory-limit'")
+    if args.weight and not args.bitmap:
+        raise RuntimeError(
+            "The '--bitmap' option must be used to derive weights")
+    if args.cache_dir and not args.bitmap:
+        raise RuntimeError(
+            "The '--bitmap' option must be used to cache compiled glyphs")
+
+    if args.sdf_scale is not None and not args.sdf_spread:
+        raise RuntimeError(
+            "The '--sdf-spread' option must be used to scale signed distance fields")
+
+    if args.sizes and args.format != "bdf":
+        raise RuntimeError(
+            "The '--sizes' option can only be used to render BDF files")
+    if args.sizes and args.profile:
+        raise RuntimeError(
+            "The '--sizes' option can't be combined with profiling")
+    if args.sizes and (args.memory_report or args.memory_limit):
+        raise RuntimeError(
+            "The '--sizes' option can't be combined with '--memory-report' or '--memory-limit'")
+
+    format_class = get_format(args.format)
+    if not args.bitmap and format_class.bitmap_only:
         raise RuntimeError(
-            "The '--bitmap' option must be used to render BDF files")
+            f"The '--bitmap' option must be used to render {args.format.upper()} files"
+        )
+
+    glyph_cache = None
+    if args.cache_dir:
+        glyph_cache = GlyphCache(args.cache_dir)
+    elif args.watch and args.bitmap:
+        glyph_cache = MemoryGlyphCache()
+
+    if args.watch:
+        watch([args.input_file], lambda: build(
+            args, format_class, glyph_cache))
+        return
+
+    try:
+        build(args, format_class, glyph_cache)
+    except ResourceLimitExceeded as e:
+        exit(f"{type(e).__name__}: {e}")
+
 
+def build(args, format_class, glyph_cache=None):
+    """Compile the input file and write the output font
+
+    Args:
+        args (argparse.Namespace): Parsed arguments object
+        format_class (Type[Format]): Format to write
+        glyph_cache (GlyphCache | MemoryGlyphCache, optional): Cache of compiled glyphs to reuse. Defaults to None.
+
+    Raises:
+        ResourceLimitExceeded: If the whole font exceeded a resource limit
+
+    Returns:
+        list[str]: Files that were read, including every imported file and image
+    """
     # Parse the grammar file
-    parser = Lark(open(pathlib.Path(__file__).parent / "grammar.lark"))
+    parser = get_parser()
 
     # Setup Interpreter
-    interpreter = PrettyBirdInterpreter()
+    interpreter = PrettyBirdInterpreter(args.input_file)
+
+    with enforcing(get_limits(args)):
+        symbols = compile_symbols(args, parser, interpreter, glyph_cache)
 
+    read_files = [args.input_file] + sorted(
+        {path for module in interpreter.modules for path in module.files}
+        | {str(image.path) for image in interpreter.images})
+
+    if args.sizes:
+        for size, strike in symbols.items():
+            font = BDF(args.font_name, "0.1", point_size=size,
+                       filename=f"{args.font_name}-{size}.bdf")
+            font.add_symbols(strike)
+            font.compile(bitmap=True)
+        return read_files
+
+    """
+    font = BDF(
+        filename=f"{args.font_name}.bdf",
+        version="0.1",
+        font_name=args.font_name,
+        point_size=16,
+        bounding_box=(6, 8),
+        properties=[("FONT_ASCENT", 14), ("FONT_DESCENT", 2)],
+    )
+    """
+    format_options = {}
+    if format_class is Atlas:
+        format_options["bit_depth"] = 8 if args.sdf_spread else args.bit_depth
+        format_options["sdf_spread"] = args.sdf_spread
+        format_options["sdf_scale"] = args.sdf_scale if args.sdf_scale is not None else 1
+
+    font = format_class(args.font_name, "0.1", **format_options)
+    font.add_symbols(symbols)
+    font.compile(to_ttf=args.format == "ttf", bitmap=args.bitmap)
+
+    return read_files
+
+
+def compile_symbols(args, parser, interpreter, glyph_cache=None):
+    """Interpret the input file and, with '--bitmap', compile its glyphs. Glyphs that exceed a resource limit are skipped
+
+    Args:
+        args (argparse.Namespace): Parsed arguments object
+        parser (Lark): Parser for the grammar
+        interpreter (PrettyBirdInterpreter): Interpreter to build the glyphs with
+        glyph_cache (GlyphCache | MemoryGlyphCache, optional): Cache of compiled glyphs to reuse. Defaults to None.
+
+    Raises:
+        ResourceLimitExceeded: If the whole font exceeded a resource limit
+
+    Returns:
+        list[Symbol] | dict[int, list[Symbol]]: Symbols to write to the font, or with '--sizes', the symbols of each strike keyed by pixel size
+    """
     with open(args.input_file, "r") as input_file:
-        # Parse the source file into a parse_tree
-        parse_tree = parser.parse(input_file.read())
-        # Pass the AST through the Interpreter
-        interpreter.visit(parse_tree)
+        # Parse the source file and pass the AST through the Interpreter
+        parse_tree = interpreter.interpret(parser, input_file.read())
         """
         # Need some way to separate language compile errors (shouldn't show backtrace) with compile*R* errors (should show backtrace)
         try:
@@ -92,25 +494,113 @@ def main():
             exit(1)
         """
 
+    font = interpreter.get_font()
+    symbols = list(font)
     if args.bitmap:
-        for symbol in interpreter.symbols.values():
-            symbol.compile()
-            if args.stdout:
-                print(symbol)
+        profiler = Profiler() if args.profile else None
+        memory = None
+        if args.memory_report or args.memory_limit:
+            memory = MemoryTracker(
+                int(args.memory_limit * 1024 * 1024) if args.memory_limit else None
+            )
+
+        incremental, glyph_keys = None, None
+        if glyph_cache is not None:
+            incremental = IncrementalCompiler(glyph_cache)
+            glyph_keys = DependencyGraph(
+                parse_tree, interpreter.modules, interpreter.images).glyph_keys()
+
+        if args.sizes:
+            symbols = render_strikes(
+                args, font, symbols, incremental, glyph_keys)
+        else:
+            with profiling(profiler), tracking_memory(memory) if memory else nullcontext():
+                symbols = render_symbols(
+                    args, symbols, incremental, glyph_keys)
+
+        if incremental is not None:
+            print(
+                f"Compiled {len(incremental.compiled)} glyphs, reused {len(incremental.reused)}",
+                file=sys.stderr,
+            )
+        if profiler is not None:
+            print(profiler.table(), end="")
+            profiler.write_folded(f"{args.font_name}.profile.folded")
+        if memory is not None and args.memory_report:
+            print(memory.report(), end="")
+
+    return symbols
+
 
+def render_symbols(args, symbols, incremental=None, glyph_keys=None, scale=1.0):
+    """Compile glyphs and derive any '--weight', skipping glyphs that exceed a resource limit
+
+    Args:
+        args (argparse.Namespace): Parsed arguments object
+        symbols (list[Symbol]): Glyph definitions
+        incremental (IncrementalCompiler, optional): Compiler to reuse cached glyphs with. Defaults to None.
+        glyph_keys (dict[str, str], optional): Cache keys of the glyphs, required with an IncrementalCompiler. Defaults to None.
+        scale (float, optional): Scale factor to render at. Defaults to 1.0.
+
+    Raises:
+        FontTimeout: If the whole font ran out of time
+
+    Returns:
+        list[Symbol]: Compiled copies of the glyphs
     """
-    font = BDF(
-        filename=f"{args.font_name}.bdf",
-        version="0.1",
-        font_name=args.font_name,
-        point_size=16,
-        bounding_box=(6, 8),
-        properties=[("FONT_ASCENT", 14), ("FONT_DESCENT", 2)],
-    )
+    compiled_symbols = []
+    # Glyphs copied or composed by several others are only compiled once
+    with sharing_components():
+        for symbol in symbols:
+            try:
+                if incremental is not None:
+                    compiled_symbol = incremental.render(
+                        symbol, glyph_keys[symbol.identifier], scale)
+                else:
+                    compiled_symbol = symbol.render(scale)
+            except FontTimeout:
+                raise
+            except ResourceLimitExceeded as e:
+                print(f"Skipping glyph: {e}", file=sys.stderr)
+                continue
+            # Weights are derived after the cache, so one cache serves every weight
+            for operation, amount in args.weight:
+                apply_morphology(compiled_symbol, operation, amount)
+            compiled_symbols.append(compiled_symbol)
+            if args.stdout:
+                print(compiled_symbol)
+    return compiled_symbols
+
+
+def render_strikes(args, font, symbols, incremental=None, glyph_keys=None):
+    """Render a strike at each of the '--sizes' in parallel. Each strike is rendered under its own resource Budget
+
+    Args:
+        args (argparse.Namespace): Parsed arguments object
+        font (Font): Parsed font, shared by every strike
+        symbols (list[Symbol]): Glyph definitions
+        incremental (IncrementalCompiler, optional): Compiler to reuse cached glyphs with. Defaults to None.
+        glyph_keys (dict[str, str], optional): Cache keys of the glyphs, required with an IncrementalCompiler. Defaults to None.
+
+    Raises:
+        ValueError: If no design size is given and no glyph has a base to measure it from
+        FontTimeout: If a strike ran out of time
+
+    Returns:
+        dict[int, list[Symbol]]: Compiled copies of the glyphs, keyed by pixel size
     """
-    font = get_format(args.format)(args.font_name, "0.1")
-    font.add_symbols(list(interpreter.symbols.values()))
-    font.compile(to_ttf=args.format == "ttf", bitmap=args.bitmap)
+    design_size = args.design_size or font.design_size
+    if not design_size:
+        raise ValueError(
+            "Can't scale glyphs without a design size, as none of them have a base")
+    limits = get_limits(args)
+
+    def render_strike(size):
+        with enforcing(limits):
+            return render_symbols(args, symbols, incremental, glyph_keys, size / design_size)
+
+    with ThreadPoolExecutor(max_workers=args.jobs or len(args.sizes)) as executor:
+        return dict(zip(args.sizes, executor.map(render_strike, args.sizes)))
 
 
 if __name__ == "__main__":
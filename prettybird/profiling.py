@@ -0,0 +1,206 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from typing import Dict, List, Optional
+
+_active_profiler: ContextVar[Optional["Profiler"]] = ContextVar(
+    "prettybird_profiler", default=None
+)
+
+
+def get_profiler():
+    """Get the Profiler collecting statistics for the current context
+
+    Returns:
+        Profiler: Active Profiler, or None if profiling is off
+    """
+    return _active_profiler.get()
+
+
+@contextmanager
+def profiling(profiler):
+    """Collect statistics with a Profiler for the duration of the context
+
+    Args:
+        profiler (Profiler): Profiler to activate
+    """
+    token = _active_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profiler.reset(token)
+
+
+class Stats:
+    """Aggregated statistics for a glyph, instruction type or function"""
+
+    __slots__ = ("calls", "time", "self_time", "pixels", "steps", "max_depth")
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.0
+        self.self_time = 0.0
+        self.pixels = 0
+        self.steps = 0
+        self.max_depth = 0
+
+
+class _Frame:
+    __slots__ = ("kind", "name", "start", "child_time", "pixels")
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.start = time.perf_counter()
+        self.child_time = 0.0
+        self.pixels = 0
+
+
+class Profiler:
+    """Collects wall time, pixels written and call counts per glyph, per instruction type and per function
+
+    Time and pixels are cumulative, including everything called from within a
+    glyph, instruction or function. Recursive calls only count towards the
+    cumulative totals once, at the outermost call, and the deepest recursion is
+    reported as the depth.
+    """
+
+    def __init__(self):
+        self.glyphs: Dict[str, Stats] = {}
+        self.instructions: Dict[str, Stats] = {}
+        self.functions: Dict[str, Stats] = {}
+        # Self time, keyed by collapsed stack, for flamegraph tooling
+        self.folded: Dict[str, float] = {}
+
+        self._stack: List[_Frame] = []
+        self._depths: Dict[tuple, int] = {}
+        self._glyph_stats: Optional[Stats] = None
+
+    @property
+    def idle(self):
+        """Determine whether or not the Profiler is outside of any glyph
+
+        Returns:
+            bool: True if no glyph is being profiled
+        """
+        return not self._stack
+
+    @staticmethod
+    def _stats(table, name):
+        if name not in table:
+            table[name] = Stats()
+        return table[name]
+
+    def _enter(self, kind, name, stats):
+        frame = _Frame(kind, name)
+        self._stack.append(frame)
+
+        depth = self._depths.get((kind, name), 0) + 1
+        self._depths[(kind, name)] = depth
+        stats.max_depth = max(stats.max_depth, depth)
+        return frame
+
+    def _exit(self, frame, stats):
+        elapsed = time.perf_counter() - frame.start
+        self._stack.pop()
+
+        depth = self._depths[(frame.kind, frame.name)]
+        self._depths[(frame.kind, frame.name)] = depth - 1
+
+        stats.calls += 1
+        stats.self_time += elapsed - frame.child_time
+        # Nested calls are already included in the outermost call's totals
+        if depth == 1:
+            stats.time += elapsed
+            stats.pixels += frame.pixels
+
+        stack = ";".join(f.name for f in self._stack + [frame])
+        self.folded[stack] = self.folded.get(
+            stack, 0.0) + elapsed - frame.child_time
+
+        if self._stack:
+            self._stack[-1].child_time += elapsed
+            self._stack[-1].pixels += frame.pixels
+        if self._glyph_stats is not None and frame.kind != "glyph":
+            self._glyph_stats.steps += 1
+
+    @contextmanager
+    def glyph(self, symbol):
+        """Profile the compilation of a glyph
+
+        Args:
+            symbol (Symbol): Symbol being compiled
+        """
+        self._glyph_stats = Profiler._stats(self.glyphs, symbol.identifier)
+        frame = self._enter("glyph", symbol.identifier, self._glyph_stats)
+        try:
+            yield
+        finally:
+            self._exit(frame, self._glyph_stats)
+            self._glyph_stats = None
+
+    @contextmanager
+    def instruction(self, symbol, instruction_name):
+        """Profile an instruction applied to a Symbol's grid
+
+        Args:
+            symbol (Symbol): Symbol the instruction is drawn onto
+            instruction_name (str): Name of instruction type
+        """
+        stats = Profiler._stats(self.instructions, instruction_name)
+        frame = self._enter("instruction", instruction_name, stats)
+        pixels_before = symbol.pixels_written
+        try:
+            yield
+        finally:
+            frame.pixels += symbol.pixels_written - pixels_before
+            self._exit(frame, stats)
+
+    @contextmanager
+    def function(self, function_name):
+        """Profile a function call
+
+        Args:
+            function_name (str): Name of the function being called
+        """
+        stats = Profiler._stats(self.functions, function_name)
+        frame = self._enter("function", function_name, stats)
+        try:
+            yield
+        finally:
+            self._exit(frame, stats)
+
+    def table(self):
+        """Format the collected statistics as tables sorted by cumulative time
+
+        Returns:
+            str: Human-readable report
+        """
+        out = ""
+        for title, table in (
+            ("Glyph", self.glyphs),
+            ("Instruction", self.instructions),
+            ("Function", self.functions),
+        ):
+            out += f"{title:<24}{'calls':>8}{'cumul ms':>12}{'self ms':>12}{'pixels':>10}{'steps':>8}{'depth':>8}\n"
+            for name, stats in sorted(
+                table.items(), key=lambda item: item[1].time, reverse=True
+            ):
+                out += (
+                    f"{name:<24}{stats.calls:>8}{stats.time * 1000:>12.3f}"
+                    f"{stats.self_time * 1000:>12.3f}{stats.pixels:>10}"
+                    f"{stats.steps:>8}{stats.max_depth:>8}\n"
+                )
+            out += "\n"
+        return out
+
+    def write_folded(self, filename):
+        """Write self time per call stack in the collapsed format read by flamegraph tools
+
+        Args:
+            filename (str): File to write to
+        """
+        with open(filename, "w") as folded_file:
+            for stack, seconds in sorted(self.folded.items()):
+                folded_file.write(f"{stack} {round(seconds * 1e6)}\n")
@@ -0,0 +1,317 @@
+"""Persistent compile server for editor previews
+
+Keeps the parser, parsed fonts and their compiled glyphs warm between requests.
+Sources are POSTed as the request body over HTTP/1.1, on localhost or on a Unix
+socket:
+
+    POST /glyphs[?encoding=<int>]  -> JSON {encoding: {identifier, width, height, rows}}
+    POST /bdf[?font_name=<name>]   -> BDF font bytes
+    POST /svg                      -> JSON {identifier: SVG document}
+
+Each request is compiled on a worker thread under its own resource Budget.
+"""
+
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from lark.exceptions import LarkError
+
+from . import hooks
+from .api import compile_source
+from .font import Font
+from .limits import Limits, ResourceLimitExceeded, enforcing
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+}
+
+
+class FontCache:
+    """Least-recently-used cache of parsed Fonts, keyed by a digest of their source"""
+
+    def __init__(self, maxsize: int = 64):
+        """Initialize new FontCache
+
+        Args:
+            maxsize (int, optional): Most Fonts to keep. Defaults to 64.
+        """
+        self.maxsize = maxsize
+        self._fonts: "OrderedDict[str, Font]" = OrderedDict()
+
+    @staticmethod
+    def key(source: str) -> str:
+        """Get the cache key for a source
+
+        Args:
+            source (str): Source code
+
+        Returns:
+            str: Hex digest of the source
+        """
+        return hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+
+    def __len__(self):
+        return len(self._fonts)
+
+    def get(self, key) -> Optional[Font]:
+        """Get a cached Font, marking it as recently used
+
+        Args:
+            key (str): Cache key of the Font's source
+
+        Returns:
+            Font: The cached Font, or None if it is not cached
+        """
+        font = self._fonts.get(key)
+        if font is None:
+            hooks.emit("cache_miss", cache=self, key=key)
+            return None
+        self._fonts.move_to_end(key)
+        hooks.emit("cache_hit", cache=self, key=key)
+        return font
+
+    def put(self, key, font: Font):
+        """Cache a Font, evicting the least recently used Font if the cache is full
+
+        Args:
+            key (str): Cache key of the Font's source
+            font (Font): Font to cache
+        """
+        self._fonts[key] = font
+        self._fonts.move_to_end(key)
+        while len(self._fonts) > self.maxsize:
+            self._fonts.popitem(last=False)
+
+
+class CompileServer:
+    """asyncio server compiling prettybird sources on request"""
+
+    def __init__(
+        self,
+        limits: Optional[Limits] = None,
+        cache_size: int = 64,
+        workers: int = 4,
+        max_body: int = 1 << 20,
+    ):
+        """Initialize new CompileServer
+
+        Args:
+            limits (Limits, optional): Resource limits enforced on every request. Defaults to no limits.
+            cache_size (int, optional): Most parsed Fonts to keep warm. Defaults to 64.
+            workers (int, optional): Most requests compiled at once. Defaults to 4.
+            max_body (int, optional): Largest accepted source, in bytes. Defaults to 1 MiB.
+        """
+        self.limits = limits if limits is not None else Limits()
+        self.cache = FontCache(cache_size)
+        self.workers = workers
+        self.max_body = max_body
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="prettybird")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _font(self, source):
+        """Get the Font for a source, from the cache if possible. Only called from the event loop
+
+        Args:
+            source (str): Source code
+
+        Returns:
+            tuple[str, Font]: Cache key and the cached Font, or None if it has to be compiled
+        """
+        key = FontCache.key(source)
+        return key, self.cache.get(key)
+
+    def _compile(self, route, query, source, font):
+        """Compile a request on a worker thread, under its own Budget
+
+        Args:
+            route (str): Requested path
+            query (dict[str, list[str]]): Parsed query string
+            source (str): Source code
+            font (Font): Cached Font for the source, or None to parse it
+
+        Returns:
+            tuple[Font, str, bytes]: The Font, and the response's content type and body
+        """
+        with enforcing(self.limits):
+            if font is None:
+                # Sources arrive without a location, and cached Fonts wouldn't notice imported files or images changing
+                font = compile_source(source, allow_imports=False)
+
+            if route == "/glyphs":
+                if "encoding" in query:
+                    glyphs = [font.glyph(int(query["encoding"][0]))]
+                else:
+                    glyphs = font.glyphs()
+                body = {
+                    str(glyph.encoding): {
+                        "identifier": glyph.identifier,
+                        "width": glyph.width,
+                        "height": glyph.height,
+                        "rows": glyph.grid.splitlines(),
+                    }
+                    for glyph in glyphs
+                }
+                return font, "application/json", json.dumps(body).encode()
+            elif route == "/bdf":
+                font_name = query.get("font_name", ["prettybird"])[0]
+                return font, "application/x-font-bdf", font.to_bdf_bytes(font_name)
+            else:
+                body = json.dumps(font.to_svg_strings()).encode()
+                return font, "application/json", body
+
+    async def respond(self, method, target, body):
+        """Handle a request
+
+        Args:
+            method (str): HTTP method
+            target (str): Request target, including any query string
+            body (bytes): Request body
+
+        Returns:
+            tuple[int, str, bytes]: Status code, content type and body of the response
+        """
+        url = urlsplit(target)
+        if url.path not in ("/glyphs", "/bdf", "/svg"):
+            return _error(404, f'No such route "{url.path}"')
+        if method != "POST":
+            return _error(405, "Send sources with POST")
+
+        try:
+            source = body.decode()
+        except UnicodeDecodeError:
+            return _error(400, "Sources must be UTF-8")
+
+        key, font = self._font(source)
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            try:
+                font, content_type, response = await loop.run_in_executor(
+                    self._executor,
+                    self._compile,
+                    url.path,
+                    parse_qs(url.query),
+                    source,
+                    font,
+                )
+            except ResourceLimitExceeded as e:
+                return _error(422, str(e), type(e).__name__)
+            except KeyError as e:
+                return _error(404, f"No glyph with encoding {e}")
+            except (
+                ArithmeticError,
+                ImportError,
+                LarkError,
+                NameError,
+                SyntaxError,
+                TypeError,
+                ValueError,
+            ) as e:
+                return _error(400, str(e), type(e).__name__)
+            except Exception as e:
+                return _error(500, "Failed to compile the source", type(e).__name__)
+        self.cache.put(key, font)
+        return 200, content_type, response
+
+    async def handle(self, reader, writer):
+        """Serve one HTTP connection. Every connection is answered, and closed after one response
+
+        Args:
+            reader (asyncio.StreamReader): Connection's reader
+            writer (asyncio.StreamWriter): Connection's writer
+        """
+        try:
+            try:
+                status, content_type, body = await self._read_request(reader)
+            except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                status, content_type, body = _error(400, "Malformed request")
+            except Exception as e:
+                status, content_type, body = _error(
+                    500, "Failed to handle the request", type(e).__name__)
+
+            writer.write(
+                (
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode()
+                + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            # The client went away before it could be answered
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+
+        content_length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                content_length = int(value)
+
+        if content_length > self.max_body:
+            return _error(413, f"Sources are limited to {self.max_body} bytes")
+        body = await reader.readexactly(content_length)
+        return await self.respond(method, target, body)
+
+    async def start(self, host="127.0.0.1", port=8080, socket_path=None):
+        """Start listening. Binds to localhost by default
+
+        Args:
+            host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on, or 0 for any free port. Defaults to 8080.
+            socket_path (str, optional): Listen on this Unix socket instead of TCP. Defaults to None.
+
+        Returns:
+            asyncio.base_events.Server: The listening server
+        """
+        self._semaphore = asyncio.Semaphore(self.workers)
+        if socket_path is not None:
+            return await asyncio.start_unix_server(self.handle, path=socket_path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve_forever(self, host="127.0.0.1", port=8080, socket_path=None):
+        """Listen and serve requests until cancelled
+
+        Args:
+            host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on. Defaults to 8080.
+            socket_path (str, optional): Listen on this Unix socket instead of TCP. Defaults to None.
+        """
+        server = await self.start(host, port, socket_path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _error(status, message, kind=None):
+    body = {"error": message}
+    if kind is not None:
+        body["type"] = kind
+    return status, "application/json", json.dumps(body).encode()
@@ -1,10 +1,71 @@
+import hashlib
 import math
-from typing import List
-
-from .utils import arange
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import Dict, List, Optional
+
+from . import hooks
+from .evaluate import is_resolved, reduce_instruction
+from .limits import FunctionDepthExceeded, get_budget
+from .memory import get_memory_tracker
+from .morphology import apply as apply_morphology
+from .profiling import get_profiler
+from .utils import arange, flatten, scale_grid, split_at_extrema
+
+# Translates grid characters into binary digits and back
+_GRID_TO_BITS = str.maketrans("0.", "10")
+_BITS_TO_GRID = str.maketrans("10", "0.")
+# Steps of a long instruction between checks of the resource limits
+_BUDGET_CHECK_INTERVAL = 1024
+
+_shared_components: ContextVar[Optional[Dict]] = ContextVar(
+    "prettybird_components", default=None
+)
+
+
+@contextmanager
+def sharing_components():
+    """Compile each Symbol copied by from_char or compose once per scale, for every glyph compiled in the context.
+    Contexts nest, sharing the outermost one's components
+
+    Yields:
+        dict: Compiled components, keyed by the Symbol and scale they were compiled from
+    """
+    components = _shared_components.get()
+    if components is not None:
+        yield components
+        return
+    components = {}
+    token = _shared_components.set(components)
+    try:
+        yield components
+    finally:
+        _shared_components.reset(token)
+
+
+def _overlay(grid, other):
+    """Combine two grids of the same size, drawing every pixel drawn in either
+
+    Args:
+        grid (str): Grid
+        other (str): Grid to draw over it
+
+    Returns:
+        str: The combined grid
+    """
+    # "0" sorts after ".", and both grids share their newlines
+    return "".join(map(max, grid, other))
 
 
 class Symbol:
+    """A glyph definition: its base and the instructions drawn onto it
+
+    compile() draws the instructions onto the Symbol itself. render() draws them
+    onto a copy instead, leaving the definition untouched, so one parsed Symbol
+    can be rendered from many threads at once.
+    """
+
     def __init__(self, identifier, encoding):
         """Initiailze new Symbol
 
@@ -17,9 +78,23 @@ class Symbol:
         self._width = 0
         self._height = 0
         self._grid = ""
+        self._base_grid = ""
         self._instruction_buffer = ()
         self._instructions = []
         self._stop_flag = False
+        self._pixels_written = 0
+        # Pixels already accounted for by the Budget
+        self._pixels_spent = 0
+        # Budget of the instruction being applied, checked partway through long instructions
+        self._budget = None
+        self._budget_countdown = _BUDGET_CHECK_INTERVAL
+        self._compiled = False
+        # Scale factor the Symbol is rendered at, to draw other pixel sizes from the same design
+        self._scale = 1.0
+        # What x and y coordinates in design units are multiplied by when drawing at that scale
+        self._axis_scale = (1.0, 1.0)
+        # Grid of what the calling glyphs have drawn, which fills in a function's subspace stop at
+        self._fill_boundary = None
 
     @property
     def identifier(self):
@@ -47,6 +122,15 @@ class Symbol:
     def height(self):
         return self._height
 
+    @property
+    def pixels_written(self):
+        """Get the number of pixels instructions have written to the grid
+
+        Returns:
+            int: Number of pixel writes
+        """
+        return self._pixels_written
+
     @property
     def dimensions(self):
         """Get dimensions of Symbol
@@ -71,6 +155,8 @@ class Symbol:
             new_grid (str): New grid string
         """
         self._grid = new_grid
+        if not self._parsed_base:
+            self._base_grid = new_grid
 
         grid_split = new_grid.splitlines()
         self._width = len(grid_split[0])
@@ -88,30 +174,35 @@ class Symbol:
 
     grid = property(get_grid, set_grid)
 
-    def _init_grid_from_symbol(self, draw_mode, fill_mode, inputs):
-        self.set_grid(inputs[0].get_grid())
-
-    def append_to_grid(self, new_char):
-        """Append a character to the grid
+    def _compiled_source(self, source):
+        """Get a compiled Symbol to copy pixels from, at this Symbol's scale
 
         Args:
-            new_char (str): Character to append
+            source (Symbol): Symbol to copy pixels from
 
-        Raises:
-            RuntimeError: If the base has already been completed
+        Returns:
+            Symbol: The source itself if it has been compiled at this scale, otherwise a compiled copy of it
         """
-        if self._parsed_base:
-            raise RuntimeError(
-                "Tried to update base, but base has already been defined"
-            )
-        self._grid += new_char
-        if new_char == "\n":
-            self._height += 1
-            self._width = len(self._grid.splitlines()[0])
+        if source._compiled and self._scale == 1:
+            return source
+
+        components = _shared_components.get()
+        key = (source, self._scale)
+        if components is not None and key in components:
+            return components[key]
+
+        # Draw the source onto a copy rather than relying on it having been compiled first
+        compiled = source._execution_copy(self._scale)
+        compiled._apply_instructions(
+            get_profiler(), get_memory_tracker(), get_budget())
+        if components is not None:
+            components[key] = compiled
+        return compiled
 
-    def finish_grid(self):
-        self._height += 1
-        self._parsed_base = True
+    def _init_grid_from_symbol(self, draw_mode, fill_mode, inputs):
+        source = self._compiled_source(inputs[0])
+        self.set_grid(source.get_grid())
+        self._axis_scale = source._axis_scale
 
     def _point_within_grid(self, point: tuple[int, int]):
         """Determine whether or not a point lies within the grid
@@ -152,6 +243,7 @@ class Symbol:
                 point,
             )
         converted_index = self.point_to_index(point)
+        self._pixels_written += 1
         self._grid = (
             self._grid[:converted_index]
             + new_character
@@ -210,19 +302,203 @@ class Symbol:
     def compile(self):
         """Apply all instructions to grid
 
+        Raises:
+            NameError: If an instruction was not recognized
+            ResourceLimitExceeded: If compiling exceeded one of the enforced resource limits
+        """
+        hooks.emit("glyph_compile_start", symbol=self)
+
+        profiler = get_profiler()
+        memory = get_memory_tracker()
+        budget = get_budget()
+        with ExitStack() as stack:
+            stack.enter_context(sharing_components())
+            if profiler is not None and profiler.idle:
+                stack.enter_context(profiler.glyph(self))
+            if memory is not None and memory.idle:
+                stack.enter_context(memory.glyph(self))
+            if budget is not None and budget.idle:
+                stack.enter_context(budget.glyph(self))
+            try:
+                self._apply_instructions(profiler, memory, budget)
+            except RecursionError:
+                raise FunctionDepthExceeded(None, None, self.identifier) from None
+        self._compiled = True
+
+        hooks.emit("glyph_compile_end", symbol=self)
+
+    def _execution_copy(self, scale=1.0):
+        """Copy the Symbol's definition, without anything drawn by its instructions
+
+        Args:
+            scale (float, optional): Scale factor to draw the copy at. Defaults to 1.0.
+
+        Raises:
+            CanvasTooLarge: If the scaled base is larger than the enforced limit
+
+        Returns:
+            Symbol: New Symbol sharing this Symbol's identifier, encoding, base and instructions
+        """
+        copy = Symbol(self._identifier, self._encoding)
+        copy._instructions = self._instructions
+        copy._scale = scale
+        if self._base_grid and scale == 1:
+            copy.set_grid(self._base_grid)
+        elif self._base_grid:
+            base_rows = self._base_grid.split("\n")
+            budget = get_budget()
+            if budget is not None:
+                # Scaled bases are checked before they are allocated, like the bases they are scaled from
+                budget.check_canvas(
+                    max(1, round(len(base_rows[0]) * scale)),
+                    max(1, round(len(base_rows) * scale)),
+                    self._identifier,
+                )
+            copy.set_grid(scale_grid(self._base_grid, scale))
+            copy._axis_scale = (
+                _axis_scale(len(base_rows[0]), copy._width, scale),
+                _axis_scale(len(base_rows), copy._height, scale),
+            )
+        return copy
+
+    def restore(self, grid):
+        """Get a compiled copy of the Symbol from a grid compiled earlier, without compiling it again
+
+        Args:
+            grid (str): Grid previously produced by compiling this Symbol
+
+        Returns:
+            Symbol: Compiled copy of the Symbol
+        """
+        restored = self._execution_copy()
+        restored.set_grid(grid)
+        restored._compiled = True
+        return restored
+
+    def render(self, scale=1.0):
+        """Compile a copy of the Symbol. The Symbol itself is never modified
+
+        Args:
+            scale (float, optional): Scale factor to render at. The base is resized and every coordinate and length
+                drawn is scaled, while lines stay one pixel wide. Defaults to 1.0.
+
+        Raises:
+            NameError: If an instruction was not recognized
+            ResourceLimitExceeded: If compiling exceeded one of the enforced resource limits
+
+        Returns:
+            Symbol: Compiled copy of the Symbol
+        """
+        rendered = self._execution_copy(scale)
+        rendered.compile()
+        return rendered
+
+    def _apply_instructions(self, profiler=None, memory=None, budget=None):
+        """Apply all instructions to grid, optionally recording statistics for each one
+
+        Args:
+            profiler (Profiler, optional): Profiler to record statistics with. Defaults to None.
+            memory (MemoryTracker, optional): MemoryTracker to check the glyph's memory ceiling with. Defaults to None.
+            budget (Budget, optional): Budget to check the glyph's resource limits with. Defaults to None.
+
         Raises:
             NameError: If an instruction was not recognized
         """
         for instruction in self._instructions:
             if self._stop_flag:
                 break
+            self._apply_instruction(instruction, profiler, memory, budget)
 
-            instruction_name, draw_mode, fill_mode, inputs = instruction
-            if instruction_name not in INSTRUCTIONS_MAP:
-                raise NameError(
-                    f'Received bad instruction "{instruction_name}"')
+    def _apply_instruction(self, instruction, profiler=None, memory=None, budget=None):
+        """Apply one instruction to grid
+
+        Args:
+            instruction (tuple): Instruction as (name, draw mode, fill mode, arguments)
+            profiler (Profiler, optional): Profiler to record statistics with. Defaults to None.
+            memory (MemoryTracker, optional): MemoryTracker to check the glyph's memory ceiling with. Defaults to None.
+            budget (Budget, optional): Budget to check the glyph's resource limits with. Defaults to None.
+
+        Raises:
+            NameError: If the instruction was not recognized
+        """
+        instruction_name, draw_mode, fill_mode, inputs = instruction
+        if instruction_name not in INSTRUCTIONS_MAP:
+            raise NameError(
+                f'Received bad instruction "{instruction_name}"')
+        if self._scale != 1 and instruction_name in _SCALED_INPUTS:
+            inputs = _SCALED_INPUTS[instruction_name](inputs, self._axis_scale)
+        self._budget = budget
+        if profiler is None:
             INSTRUCTIONS_MAP[instruction_name](
                 self, draw_mode, fill_mode, inputs)
+        else:
+            with profiler.instruction(self, instruction_name):
+                INSTRUCTIONS_MAP[instruction_name](
+                    self, draw_mode, fill_mode, inputs)
+        if memory is not None:
+            memory.check()
+        if budget is not None:
+            # Instructions nested in a repeat have already spent their own pixels
+            budget.spend(self._pixels_written - self._pixels_spent)
+            self._pixels_spent = self._pixels_written
+
+    def _check_budget(self):
+        """Check the resource limits every so many steps of an instruction, so a single long instruction can be stopped
+
+        Raises:
+            ResourceLimitExceeded: If compiling exceeded one of the enforced resource limits
+        """
+        self._budget_countdown -= 1
+        if self._budget_countdown > 0:
+            return
+        self._budget_countdown = _BUDGET_CHECK_INTERVAL
+        if self._budget is not None:
+            self._budget.spend(self._pixels_written - self._pixels_spent)
+            self._pixels_spent = self._pixels_written
+
+    def repeat(self, _draw_mode, _fill_mode, inputs):
+        """Run a block of instructions once per value of a loop variable, directly on the grid
+
+        Args:
+            _draw_mode (str): Unused, each instruction in the block has its own draw mode
+            _fill_mode (bool): Unused, each instruction in the block has its own fill mode
+            inputs (list): The loop variable's name, its first value, its last value, the step between values and the block of instructions
+
+        Raises:
+            NameError: If a bound of the loop refers to an undefined name
+            ValueError: If the step is zero, or too small to change the loop variable
+        """
+        variable, start, stop, step, body = inputs
+        for bound in (start, stop, step):
+            if not is_resolved(bound):
+                raise NameError(
+                    f'Bounds of repeat loop over "{variable}" refer to undefined names')
+        start, stop, step = float(start), float(stop), float(step)
+        if step == 0:
+            raise ValueError(
+                f'Repeat loop over "{variable}" has a step of zero')
+        if start + step == start:
+            raise ValueError(
+                f'Repeat loop over "{variable}" has a step too small to change {start}')
+
+        memory = get_memory_tracker()
+        budget = get_budget()
+
+        # Rounding keeps float error from dropping the last value, as in "from 0 to 0.3 step 0.1"
+        iterations = math.floor(round((stop - start) / step, 9)) + 1
+        for index in range(max(iterations, 0)):
+            if budget is not None:
+                # Loops whose bodies draw nothing never spend any pixels
+                budget.check_time()
+            value = round(start + index * step, 9)
+            bindings = {variable: int(value)
+                        if value.is_integer() else value}
+            for instruction in body:
+                if self._stop_flag:
+                    return
+                self._apply_instruction(
+                    reduce_instruction(instruction, bindings), None, memory, budget
+                )
 
     def stop(self, _draw_mode, _fill_mode, inputs):
         if len(inputs) == 0:
@@ -233,8 +509,9 @@ class Symbol:
 
     def point(self, draw_mode, fill_mode, inputs: list[tuple[int, int]]):
         draw_char = self.get_draw_char(draw_mode)
-        if self._point_within_grid(inputs[0]):
-            self._replace_in_grid(draw_char, inputs[0])
+        point = (int(inputs[0][0]), int(inputs[0][1]))
+        if self._point_within_grid(point):
+            self._replace_in_grid(draw_char, point)
 
     def vector(self, draw_mode, fill_mode, inputs: list[tuple[int, int]]):
         """Draw a vector onto the grid using Bresenham's Line Generation algorithm
@@ -265,6 +542,7 @@ class Symbol:
         y = 0
 
         for x in arange(0, dx + 1, 1):
+            self._check_budget()
             point = (int(x1 + x * xx + y * yx), int(y1 + x * xy + y * yy))
             if self._point_within_grid(point):
                 self._replace_in_grid(draw_char, point)
@@ -315,6 +593,7 @@ class Symbol:
         self._plot_circle_points(center, (dx, dy), draw_char)
 
         while dy >= dx:
+            self._check_budget()
             dx += 1
 
             if decision_parameter > 0:
@@ -329,6 +608,10 @@ class Symbol:
             # https://stackoverflow.com/a/24453110/11085206
             radius_squared = radius * radius
             for dy in range(-int(radius), int(radius) + 1):
+                self._check_budget()
+                if not 0 <= int(dy + center[1]) < self._height:
+                    # The row is off the grid
+                    continue
                 dx = (int)(math.sqrt(radius_squared - dy * dy) + 0.5)
                 self.vector(
                     draw_mode,
@@ -365,8 +648,218 @@ class Symbol:
                 left_point, right_point = (left_x, y), (right_x, y)
                 self.vector(draw_mode, fill_mode, [left_point, right_point])
 
+    def _fill_span(self, draw_char, y, x_start, x_end):
+        """Replace a run of characters in one row of the grid at once, clipped to the grid
+
+        Args:
+            draw_char (str): Replacement character
+            y (int): Row of the run
+            x_start (int): Column of the first character in the run
+            x_end (int): Column of the last character in the run
+        """
+        x_start, x_end = max(x_start, 0), min(x_end, self._width - 1)
+        if y < 0 or y >= self._height or x_start > x_end:
+            return
+        start = self.point_to_index((x_start, y))
+        length = x_end - x_start + 1
+        self._pixels_written += length
+        self._grid = self._grid[:start] + draw_char * \
+            length + self._grid[start + length:]
+
+    def _scanline_fill(self, draw_char, points, nonzero):
+        """Fill the interior of a closed path using an active edge table
+
+        Pixel centers lie on integer coordinates. Each edge spans the rows from its
+        top vertex up to but not including its bottom vertex, so a scanline through a
+        vertex crosses each pair of edges meeting there the right number of times.
+
+        Args:
+            draw_char (str): Character to fill with
+            points (list[tuple[int, int]]): Vertices of the path, which is closed from the last back to the first
+            nonzero (bool): True to fill with the non-zero winding rule, otherwise the even-odd rule
+        """
+        # Edge table, sorted by first row: [first row, last row (exclusive), top x, top y, dx/dy, winding]
+        edges = []
+        for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]):
+            if y0 == y1:
+                # Horizontal edges don't cross any scanline
+                continue
+            winding = 1 if y1 > y0 else -1
+            if y0 > y1:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            edges.append([math.ceil(y0), math.ceil(y1),
+                         x0, y0, (x1 - x0) / (y1 - y0), winding])
+        if not edges:
+            return
+        edges.sort(key=lambda edge: edge[0])
+
+        active = []
+        next_edge = 0
+        y = max(edges[0][0], 0)
+        last_row = min(max(edge[1] for edge in edges), self._height)
+        while y < last_row:
+            self._check_budget()
+            while next_edge < len(edges) and edges[next_edge][0] <= y:
+                active.append(edges[next_edge])
+                next_edge += 1
+            active = [edge for edge in active if edge[1] > y]
+
+            crossings = sorted(
+                (x0 + (y - y0) * slope, winding)
+                for _, _, x0, y0, slope, winding in active
+            )
+            winding_number = 0
+            for i, (x, winding) in enumerate(crossings[:-1]):
+                winding_number += winding if nonzero else 1
+                inside = winding_number != 0 if nonzero else winding_number % 2 == 1
+                if inside:
+                    self._fill_span(draw_char, y, math.ceil(x),
+                                    math.floor(crossings[i + 1][0]))
+            y += 1
+
+    def polyline(self, draw_mode, fill_mode, inputs):
+        """Draw an open path onto the grid
+
+        Args:
+            draw_mode (str): One of ["draw", "erase"] describing the behavior of the instruction
+            fill_mode (bool): True if the instruction will be filled, false if it will only be an outline
+            inputs (list): The path's points, and True to fill with the non-zero winding rule instead of even-odd
+        """
+        points, nonzero = [tuple(point) for point in inputs[0]], inputs[1]
+        if fill_mode:
+            self._scanline_fill(self.get_draw_char(draw_mode), points, nonzero)
+        for start, end in zip(points, points[1:]):
+            self.vector(draw_mode, False, [start, end])
+
+    def polygon(self, draw_mode, fill_mode, inputs):
+        """Draw a closed path onto the grid
+
+        Args:
+            draw_mode (str): One of ["draw", "erase"] describing the behavior of the instruction
+            fill_mode (bool): True if the instruction will be filled, false if it will only be an outline
+            inputs (list): The polygon's vertices, and True to fill with the non-zero winding rule instead of even-odd
+        """
+        points = list(inputs[0])
+        self.polyline(draw_mode, fill_mode, [points + points[:1], inputs[1]])
+
+    def fill(self, draw_mode, _fill_mode, inputs):
+        """Fill the region connected to a point using a span stack. Each step fills a whole run of a row, then
+        pushes one seed for every run of the region touching it in the rows above and below
+
+        Drawing fills the empty region around the point and erasing clears the drawn region around it
+
+        Args:
+            draw_mode (str): One of ["draw", "erase"] describing the behavior of the instruction
+            _fill_mode (bool): Unused, a fill always fills
+            inputs (list): The point to fill from, and 4 or 8 for the neighbors the region connects through
+        """
+        seed, connectivity = (int(inputs[0][0]), int(inputs[0][1])), inputs[1]
+        if not self._point_within_grid(seed):
+            return
+
+        rows = [bytearray(row, "ascii") for row in self._grid.split("\n")]
+        replacement = ord(self.get_draw_char(draw_mode))
+        region = rows
+        if self._fill_boundary is not None and replacement == ord("0"):
+            # The calling glyphs' pixels bound the region, but aren't copied into the subspace
+            region = [bytearray(row, "ascii")
+                      for row in _overlay(self._grid, self._fill_boundary).split("\n")]
+        target = region[seed[1]][seed[0]]
+        if target == replacement:
+            return
+
+        # Runs reach diagonally into the neighboring rows when connecting through 8 neighbors
+        reach = 1 if connectivity == 8 else 0
+        stack = [seed]
+        while stack:
+            self._check_budget()
+            x, y = stack.pop()
+            row = region[y]
+            if row[x] != target:
+                continue
+
+            left, right = x, x
+            while left > 0 and row[left - 1] == target:
+                left -= 1
+            while right < self._width - 1 and row[right + 1] == target:
+                right += 1
+            row[left: right + 1] = bytes([replacement]) * (right - left + 1)
+            if region is not rows:
+                rows[y][left: right + 1] = row[left: right + 1]
+            self._pixels_written += right - left + 1
+
+            for neighbor_y in (y - 1, y + 1):
+                if neighbor_y < 0 or neighbor_y >= self._height:
+                    continue
+                neighbor_row = region[neighbor_y]
+                in_run = False
+                for neighbor_x in range(max(left - reach, 0), min(right + reach, self._width - 1) + 1):
+                    if neighbor_row[neighbor_x] == target:
+                        if not in_run:
+                            stack.append((neighbor_x, neighbor_y))
+                        in_run = True
+                    else:
+                        in_run = False
+
+        self._grid = "\n".join(row.decode("ascii") for row in rows)
+
+    def morphology(self, _draw_mode, _fill_mode, inputs):
+        """Change the weight of everything drawn so far
+
+        Args:
+            _draw_mode (str): Unused, the operation decides what is drawn and erased
+            _fill_mode (bool): Unused
+            inputs (list): Name of the operation and the number of pixels to apply it by
+        """
+        operation, amount = inputs
+        apply_morphology(self, operation, int(amount))
+
+    def compose(self, _draw_mode, _fill_mode, inputs):
+        """Overlay another Symbol's compiled grid, ORing it into the grid one packed row at a time
+
+        Args:
+            _draw_mode (str): Unused, the other Symbol's pixels are always drawn
+            _fill_mode (bool): Unused
+            inputs (list): Symbol to overlay, and how far right and down to move it
+        """
+        source = self._compiled_source(inputs[0])
+        dx, dy = (round(float(offset)) for offset in inputs[1:])
+
+        # Pixel x of the source is bit (source width - 1 - x), and lands on bit (width - 1 - x - dx)
+        shift = self._width - source._width - dx
+        mask = (1 << self._width) - 1
+        rows = self.packed_rows()
+        for y, row in enumerate(source.packed_rows()):
+            if 0 <= y + dy < self._height:
+                rows[y + dy] |= (row << shift if shift >= 0 else row >> -shift) & mask
+        self.set_packed_rows(rows)
+
     def bezier(self, draw_mode, _, inputs: list[tuple[int, int]]):
-        """Draw a bezier curve onto the grid
+        """Draw a bezier curve of any degree onto the grid
+
+        Quadratic curves on whole pixels that never turn around in x or y are stepped
+        with integer arithmetic. Every other curve is split wherever it turns around,
+        and each piece is flattened into vectors
+
+        Args:
+            draw_mode (str): One of ["draw", "erase"] describing the behavior of the instruction
+            fill_mode (bool): True if the instruction will be filled, false if it will only be an outline
+            inputs (list): The bezier curve's start and end points, followed by its control points
+        """
+        start, end, *controls = [tuple(point) for point in inputs]
+        if len(controls) == 1 and _is_monotonic_quadratic(start, end, controls[0]):
+            # Every coordinate is whole, so the points convert to int exactly
+            self._quadratic_bezier(
+                draw_mode, _, [(int(x), int(y)) for x, y in (start, end, controls[0])])
+            return
+
+        for piece in split_at_extrema([start, *controls, end]):
+            points = [(round(x), round(y)) for x, y in flatten(piece)]
+            for segment_start, segment_end in zip(points, points[1:]):
+                self.vector(draw_mode, _, [segment_start, segment_end])
+
+    def _quadratic_bezier(self, draw_mode, _, inputs: list[tuple[int, int]]):
+        """Draw a quadratic bezier curve that doesn't turn around in x or y onto the grid
 
         Args:
             draw_mode (str): One of ["draw", "erase"] describing the behavior of the instruction
@@ -380,8 +873,6 @@ class Symbol:
         sx, sy = x2 - x1, y2 - y1
         xx, yy = x0 - x1, y0 - y1
         cur = xx * sy - yy * sx
-        assert xx * sx <= 0
-        assert yy * sy <= 0
         if xx**2 + yy**2 < sx**2 + sy**2:
             x2 = x0
             x0 = sx + x1
@@ -409,6 +900,7 @@ class Symbol:
             yy += yy
             err = dx + dy + xy
             while True:
+                self._check_budget()
                 self.point(draw_mode, _, [(int(x0), int(y0))])
                 if x0 == x2 and y0 == y2:
                     break
@@ -442,6 +934,7 @@ class Symbol:
             h, k = x0 + a / 2, y0 + b / 2
             for x in arange(x0, x1 + 1, 1):
                 for y in arange(y0, y1 + 1, 1):
+                    self._check_budget()
                     if (((x - h) ** 2) / (a * a / 4)) + (
                         ((y - k) ** 2) / (b * b / 4)
                     ) <= 1:
@@ -469,6 +962,7 @@ class Symbol:
 
         do_while = True
         while do_while or x0 <= x1:
+            self._check_budget()
             do_while = False
             for point in [(x1, y0), (x0, y0), (x0, y1), (x1, y1)]:
                 if self._point_within_grid(point):
@@ -487,6 +981,7 @@ class Symbol:
                 err += dx
 
         while y0 - y1 < b:
+            self._check_budget()
             for point in [(x0 - 1, y0), (x1 + 1, y0), (x0 - 1, y1), (x1 + 1, y1)]:
                 if self._point_within_grid(point):
                     self._replace_in_grid(
@@ -504,26 +999,104 @@ class Symbol:
     def function_call(self, _draw_mode, _fill_mode, inputs):
         function = inputs[0]
         function_inputs = inputs[1]
-        try:
-            function_subspace = function.compile(
-                self.width, self.height, function_inputs
-            )
-        except RecursionError:
-            exit("recursion error")
+        boundary = self._grid
+        if self._fill_boundary is not None:
+            # Fills in nested calls stop at every calling glyph's pixels
+            boundary = _overlay(boundary, self._fill_boundary)
+        function_subspace = function.compile(
+            self.width, self.height, function_inputs, self._scale, self._axis_scale, boundary)
         self._logical_or_bitmap(function_subspace)
 
+    @property
+    def bitmap(self):
+        """Get the grid as rows of pixels
+
+        Returns:
+            list[list[bool]]: Rows of the grid, True where a pixel is drawn
+        """
+        return [[pixel != "." for pixel in row] for row in self._grid.splitlines()]
+
+    @property
+    def base_size(self):
+        """Get the dimensions of the Symbol's base in design units, following from_char bases to the Symbol they copy
+
+        Returns:
+            tuple[int, int]: Width and height of the base, or (0, 0) if it has not been parsed
+        """
+        symbol = self
+        while not symbol._base_grid and symbol._instructions and symbol._instructions[0][0] == "from_char":
+            symbol = symbol._instructions[0][3][0]
+        if not symbol._base_grid:
+            return (0, 0)
+        rows = symbol._base_grid.split("\n")
+        return (len(rows[0]), len(rows))
+
+    def packed_rows(self):
+        """Get the grid as a list of integers, one per row. The leftmost pixel of a row is its most significant bit
+
+        Returns:
+            list[int]: Packed rows of the grid
+        """
+        return [int(row.translate(_GRID_TO_BITS), 2) for row in self._grid.splitlines()]
+
+    def set_packed_rows(self, rows):
+        """Replace the grid with packed rows, keeping its dimensions
+
+        Args:
+            rows (list[int]): One integer per row. The leftmost pixel of a row is its most significant bit
+        """
+        changed = sum(bin(old ^ new).count("1")
+                      for old, new in zip(self.packed_rows(), rows))
+        self._pixels_written += changed
+        self._grid = "\n".join(
+            format(row, f"0{self._width}b").translate(_BITS_TO_GRID) for row in rows)
+
+    def raster_key(self):
+        """Get a digest identifying the Symbol's grid. Symbols with identical grids (including dimensions) share a key
+
+        Returns:
+            str: Hex digest of the grid
+        """
+        return hashlib.blake2b(self._grid.encode(), digest_size=16).hexdigest()
+
+    def outline_source(self):
+        """Get the Symbol whose outline this Symbol reproduces, following from_char bases without any extra steps
+
+        Returns:
+            Symbol: The Symbol this one was copied from, or itself if it has its own steps
+        """
+        symbol = self
+        while len(symbol._instructions) == 1 and symbol._instructions[0][0] == "from_char":
+            symbol = symbol._instructions[0][3][0]
+        return symbol
+
+    def ink_bounds(self):
+        """Get the smallest box containing every drawn pixel, found from the packed rows
+
+        Returns:
+            tuple[int, int, int, int]: Left, top, width and height of the box, or None if nothing is drawn
+        """
+        rows = self.packed_rows()
+        inked = [y for y, row in enumerate(rows) if row]
+        if not inked:
+            return None
+        columns = 0
+        for row in rows:
+            columns |= row
+        # The leftmost pixel is the most significant bit, and the rightmost drawn pixel is the lowest set bit
+        left = self._width - columns.bit_length()
+        right = self._width - (columns & -columns).bit_length()
+        return (left, inked[0], right - left + 1, inked[-1] - inked[0] + 1)
+
     def grid_hex_repr(self):
-        out = ""
-        bitstring = self.grid.replace("0", "1").replace(".", "0")
-        for line in bitstring.split("\n"):
-            bits_by_8 = [int(line[i: i + 8], 2)
-                         for i in range(0, len(line), 8)]
-            outline = ""
-            for bitline in bits_by_8:
-                outline += f"{bitline:02x}".upper()
-            outline = outline.ljust(int(self.width / 4), "0")
-            out += outline + "\n"
-        return out
+        """Get the grid as BDF bitmap rows, each padded on the right to a whole number of bytes
+
+        Returns:
+            str: One line of hex digits per row
+        """
+        padding = -self._width % 8
+        digits = (self._width + padding) // 4
+        return "".join(f"{row << padding:0{digits}X}\n" for row in self.packed_rows())
 
     def __repr__(self):
         """Get string representation of object
@@ -553,7 +1126,78 @@ class Symbol:
         return out
 
 
-INSTRUCTIONS_MAP = {
+def _is_monotonic_quadratic(start, end, control):
+    """Determine whether or not a quadratic bezier curve lies on whole pixels and never turns around in x or y
+
+    Args:
+        start (tuple[int, int]): Start of the curve
+        end (tuple[int, int]): End of the curve
+        control (tuple[int, int]): Control point of the curve
+
+    Returns:
+        bool: True if the curve can be stepped with integer arithmetic
+    """
+    if not all(float(coordinate).is_integer() for point in (start, end, control) for coordinate in point):
+        return False
+    return all(
+        (start[axis] - control[axis]) * (end[axis] - control[axis]) <= 0
+        for axis in (0, 1)
+    )
+
+
+def _axis_scale(design_length, scaled_length, scale):
+    """Get what coordinates along one axis are multiplied by, so the first and last pixels of the design land on
+    the first and last pixels of the scaled grid and glyphs keep touching their edges
+
+    Args:
+        design_length (int): Pixels along the axis in the design
+        scaled_length (int): Pixels along the axis in the scaled grid
+        scale (float): Scale factor of the grid
+
+    Returns:
+        float: Scale factor for coordinates along the axis
+    """
+    if design_length < 2:
+        return scale
+    return (scaled_length - 1) / (design_length - 1)
+
+
+def _scale_point(point, axis_scale):
+    return tuple(round(float(coordinate) * factor) for coordinate, factor in zip(point, axis_scale))
+
+
+def _scale_points(points, axis_scale):
+    return [_scale_point(point, axis_scale) for point in points]
+
+
+def _scale_length(length, axis_scale):
+    # A run of pixels spans (length - 1) pixel steps between its first and last pixel
+    return max(1, round((float(length) - 1) * axis_scale[0]) + 1)
+
+
+# Scales the coordinates and lengths in each drawing instruction's inputs
+_SCALED_INPUTS = MappingProxyType({
+    "point": lambda inputs, axis_scale: _scale_points(inputs, axis_scale),
+    "vector": lambda inputs, axis_scale: _scale_points(inputs, axis_scale),
+    "circle": lambda inputs, axis_scale: [
+        _scale_point(inputs[0], axis_scale),
+        round(float(inputs[1]) * axis_scale[0]),
+    ],
+    "square": lambda inputs, axis_scale: [
+        _scale_point(inputs[0], axis_scale),
+        _scale_length(inputs[1], axis_scale),
+    ],
+    "ellipse": lambda inputs, axis_scale: _scale_points(inputs, axis_scale),
+    "bezier": lambda inputs, axis_scale: _scale_points(inputs, axis_scale),
+    "polygon": lambda inputs, axis_scale: [_scale_points(inputs[0], axis_scale), inputs[1]],
+    "polyline": lambda inputs, axis_scale: [_scale_points(inputs[0], axis_scale), inputs[1]],
+    "fill": lambda inputs, axis_scale: [_scale_point(inputs[0], axis_scale), inputs[1]],
+    "compose": lambda inputs, axis_scale: [inputs[0], *_scale_point(inputs[1:], axis_scale)],
+})
+
+
+# Read-only, so it can be shared by every thread compiling glyphs
+INSTRUCTIONS_MAP = MappingProxyType({
     "point": Symbol.point,
     "vector": Symbol.vector,
     "circle": Symbol.circle,
@@ -563,4 +1207,10 @@ INSTRUCTIONS_MAP = {
     "function_call": Symbol.function_call,
     "bezier": Symbol.bezier,
     "stop": Symbol.stop,
-}
+    "repeat": Symbol.repeat,
+    "polygon": Symbol.polygon,
+    "polyline": Symbol.polyline,
+    "fill": Symbol.fill,
+    "morphology": Symbol.morphology,
+    "compose": Symbol.compose,
+})
@@ -1,4 +1,14 @@
-from .string_utils import get_empty_grid
+from .string_utils import get_empty_grid, scale_grid
 from .array import Array, arange
+from .distance import signed_distance_field
+from .bezier import flatten, split_at_extrema
 
-__all__ = ["Array", "arange", "get_empty_grid"]
+__all__ = [
+    "Array",
+    "arange",
+    "flatten",
+    "get_empty_grid",
+    "scale_grid",
+    "signed_distance_field",
+    "split_at_extrema",
+]
@@ -0,0 +1,132 @@
+import math
+
+# Furthest a flattened curve may stray from the true curve, in pixels
+TOLERANCE = 0.25
+# Subdivisions after which a piece is flattened regardless, bounding the work done on degenerate curves
+MAX_DEPTH = 16
+
+
+def split(points, t):
+    """Split a bezier curve in two using de Casteljau's algorithm
+
+    Args:
+        points (list[tuple[float, float]]): Start point, control points and end point of the curve
+        t (float): Parameter to split at, between 0 and 1
+
+    Returns:
+        tuple[list, list]: Points of the curve before t, and of the curve after t
+    """
+    left, right = [points[0]], [points[-1]]
+    while len(points) > 1:
+        points = [
+            (x0 + (x1 - x0) * t, y0 + (y1 - y0) * t)
+            for (x0, y0), (x1, y1) in zip(points, points[1:])
+        ]
+        left.append(points[0])
+        right.append(points[-1])
+    return left, right[::-1]
+
+
+def _roots(coefficients):
+    """Find where a polynomial in Bernstein form changes sign between 0 and 1
+
+    Args:
+        coefficients (list[float]): Bernstein coefficients of the polynomial
+
+    Returns:
+        list[float]: Parameters of the roots, in increasing order
+    """
+
+    def value(t):
+        values = list(coefficients)
+        while len(values) > 1:
+            values = [a + (b - a) * t for a, b in zip(values, values[1:])]
+        return values[0]
+
+    samples = 8 * len(coefficients)
+    roots = []
+    low, low_value = 0.0, value(0.0)
+    for i in range(1, samples + 1):
+        high = i / samples
+        high_value = value(high)
+        if low_value * high_value < 0:
+            a, b = low, high
+            for _ in range(40):
+                middle = (a + b) / 2
+                if (value(middle) < 0) == (low_value < 0):
+                    a = middle
+                else:
+                    b = middle
+            roots.append((a + b) / 2)
+        elif high_value == 0 and 0 < high < 1:
+            roots.append(high)
+        low, low_value = high, high_value
+    return roots
+
+
+def split_at_extrema(points):
+    """Split a bezier curve wherever it turns around in x or in y, so every piece is monotonic in both
+
+    Args:
+        points (list[tuple[float, float]]): Start point, control points and end point of the curve
+
+    Returns:
+        list[list[tuple[float, float]]]: The pieces, in order along the curve
+    """
+    parameters = sorted(
+        {
+            t
+            for axis in (0, 1)
+            for t in _roots([b[axis] - a[axis] for a, b in zip(points, points[1:])])
+        }
+    )
+
+    pieces = []
+    previous = 0.0
+    for t in parameters:
+        # Rescale the parameter onto what is left of the curve
+        piece, points = split(points, (t - previous) / (1 - previous))
+        pieces.append(piece)
+        previous = t
+    pieces.append(points)
+    return pieces
+
+
+def _flatness(points):
+    """Get how far a curve's control points lie from the line between its ends, which bounds how far the curve does
+
+    Args:
+        points (list[tuple[float, float]]): Start point, control points and end point of the curve
+
+    Returns:
+        float: Largest distance from a control point to the line
+    """
+    (x0, y0), (x1, y1) = points[0], points[-1]
+    dx, dy = x1 - x0, y1 - y0
+    length = math.hypot(dx, dy)
+    if length < 1e-9:
+        return max(math.hypot(x - x0, y - y0) for x, y in points)
+    return max(abs((x - x0) * dy - (y - y0) * dx) for x, y in points) / length
+
+
+def flatten(points, tolerance=TOLERANCE):
+    """Approximate a bezier curve with straight segments by subdividing it until each piece is flat enough
+
+    Args:
+        points (list[tuple[float, float]]): Start point, control points and end point of the curve
+        tolerance (float, optional): Furthest the segments may stray from the curve. Defaults to TOLERANCE.
+
+    Returns:
+        list[tuple[float, float]]: Ends of the segments, from the start of the curve to its end
+    """
+    flattened = [points[0]]
+    stack = [(points, 0)]
+    while stack:
+        piece, depth = stack.pop()
+        if depth >= MAX_DEPTH or _flatness(piece) <= tolerance:
+            flattened.append(piece[-1])
+            continue
+        left, right = split(piece, 0.5)
+        stack.append((right, depth + 1))
+        stack.append((left, depth + 1))
+    return flattened
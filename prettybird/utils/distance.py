@@ -0,0 +1,105 @@
+import math
+
+# Stand-in for an infinite squared distance
+INF = 1e20
+
+
+def distance_transform_1d(f):
+    """Compute the 1D squared Euclidean distance transform of a sampled function
+
+    Ref:
+        Felzenszwalb & Huttenlocher, "Distance Transforms of Sampled Functions", 2012
+
+    Args:
+        f (list[float]): Sampled function, 0 at feature points and INF elsewhere
+
+    Returns:
+        list[float]: Squared distance from each sample to the nearest feature point
+    """
+    n = len(f)
+    d = [0.0] * n
+    # Locations of the parabolas in the lower envelope
+    v = [0] * n
+    # Boundaries between the parabolas in the lower envelope
+    z = [0.0] * (n + 1)
+    k = 0
+    z[0], z[1] = -INF, INF
+
+    for q in range(1, n):
+        s = ((f[q] + q * q) - (f[v[k]] + v[k] * v[k])) / (2 * q - 2 * v[k])
+        while s <= z[k]:
+            k -= 1
+            s = ((f[q] + q * q) - (f[v[k]] + v[k] * v[k])) / \
+                (2 * q - 2 * v[k])
+        k += 1
+        v[k] = q
+        z[k], z[k + 1] = s, INF
+
+    k = 0
+    for q in range(n):
+        while z[k + 1] < q:
+            k += 1
+        d[q] = (q - v[k]) ** 2 + f[v[k]]
+    return d
+
+
+def distance_transform_2d(features, width, height):
+    """Compute the squared Euclidean distance from every pixel to the nearest feature pixel in linear time
+
+    Args:
+        features (list[bool]): Row-major pixels, True for feature pixels
+        width (int): Width of the image
+        height (int): Height of the image
+
+    Returns:
+        list[float]: Row-major squared distances
+    """
+    out = [0.0 if feature else INF for feature in features]
+
+    for x in range(width):
+        out[x::width] = distance_transform_1d(out[x::width])
+    for y in range(height):
+        out[y * width: (y + 1) * width] = distance_transform_1d(
+            out[y * width: (y + 1) * width]
+        )
+    return out
+
+
+def signed_distance_field(grid_rows, spread, scale=1):
+    """Compute an 8-bit signed distance field from a compiled glyph grid
+
+    Args:
+        grid_rows (list[str]): Rows of a compiled grid, "0" for ink and "." for background
+        spread (int): Distance, in output pixels, covered by the field on either side of the edge. The field is padded by this much on every side
+        scale (int, optional): Output pixels per grid pixel. Defaults to 1.
+
+    Returns:
+        tuple[int, int, bytes]: Width, height and row-major values of the field. 128 lies on the glyph's edge, larger values are inside
+    """
+    if spread < 1 or scale < 1:
+        raise ValueError("Distance field spread and scale must be at least 1")
+
+    width = len(grid_rows[0]) * scale + 2 * spread
+    height = len(grid_rows) * scale + 2 * spread
+
+    ink = [False] * (width * height)
+    for y, row in enumerate(grid_rows):
+        upscaled_row = [pixel == "0" for pixel in row for _ in range(scale)]
+        for i in range(scale):
+            start = (spread + y * scale + i) * width + spread
+            ink[start: start + len(upscaled_row)] = upscaled_row
+
+    to_ink = distance_transform_2d(ink, width, height)
+    to_background = distance_transform_2d(
+        [not pixel for pixel in ink], width, height)
+
+    values = bytearray(width * height)
+    for i in range(width * height):
+        # Distances are measured between pixel centers, so the edge lies half a pixel away
+        if ink[i]:
+            distance = 0.5 - math.sqrt(to_background[i])
+        else:
+            distance = math.sqrt(to_ink[i]) - 0.5
+        value = 128 - distance * 127 / spread
+        values[i] = int(min(255, max(0, round(value))))
+    return width, height, bytes(values)
@@ -12,3 +12,26 @@ def get_empty_grid(width, height):
         raise ValueError("Empty grid dimensions must be at least 1x1")
 
     return (("." * width + "\n") * height).strip()
+
+
+def scale_grid(grid, scale):
+    """Resize a grid by a scale factor, sampling the nearest pixel of the original grid
+
+    Args:
+        grid (str): Grid to resize
+        scale (float): Scale factor
+
+    Returns:
+        str: Resized grid, at least 1x1
+    """
+    rows = grid.split("\n")
+    height, width = len(rows), len(rows[0])
+    scaled_width = max(1, round(width * scale))
+    scaled_height = max(1, round(height * scale))
+    columns = [min(int((x + 0.5) / scale), width - 1)
+               for x in range(scaled_width)]
+    return "\n".join(
+        "".join(rows[min(int((y + 0.5) / scale), height - 1)][x]
+                for x in columns)
+        for y in range(scaled_height)
+    )
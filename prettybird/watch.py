@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+def _stamp(path) -> Optional[Tuple[int, int]]:
+    """Get what identifies a version of a file
+
+    Args:
+        path (str): Path of the file
+
+    Returns:
+        tuple[int, int]: Modification time in nanoseconds and size, or None if the file doesn't exist
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class Watcher:
+    """Polls files for changes, waiting for bursts of saves to settle"""
+
+    def __init__(self, paths: Iterable[str] = (), interval: float = 0.1, debounce: float = 0.2):
+        """Initialize new Watcher
+
+        Args:
+            paths (Iterable[str], optional): Files to watch. Defaults to none.
+            interval (float, optional): Seconds between polls. Defaults to 0.1.
+            debounce (float, optional): Seconds the files must stay unchanged before a change is reported. Defaults to 0.2.
+        """
+        self.interval = interval
+        self.debounce = debounce
+        self._stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.watch(paths)
+
+    def watch(self, paths: Iterable[str]):
+        """Replace the watched files. Files that were already watched keep the version last seen, so changes made during a rebuild aren't missed
+
+        Args:
+            paths (Iterable[str]): Files to watch
+        """
+        self._stamps = {
+            path: self._stamps[path] if path in self._stamps else _stamp(path)
+            for path in paths
+        }
+
+    def _refresh(self):
+        self._stamps = {path: _stamp(path) for path in self._stamps}
+
+    def _changed(self):
+        return [path for path, stamp in self._stamps.items() if _stamp(path) != stamp]
+
+    def wait(self):
+        """Block until a watched file changes and then stays unchanged for the debounce period
+
+        Returns:
+            list[str]: Files that changed
+        """
+        while not self._changed():
+            time.sleep(self.interval)
+
+        changed = set()
+        while True:
+            changed.update(self._changed())
+            self._refresh()
+            time.sleep(self.debounce)
+            if not self._changed():
+                return sorted(changed)
+
+
+def watch(paths: Iterable[str], rebuild: Callable[[], Optional[Iterable[str]]], watcher: Optional[Watcher] = None):
+    """Rebuild whenever a file changes, until interrupted. Errors are reported and the next change is waited for
+
+    Args:
+        paths (Iterable[str]): Files to watch before the first build
+        rebuild (Callable): Builds the output, returning the files it read, which are watched from then on, or None to keep watching the same files
+        watcher (Watcher, optional): Watcher to poll with. Defaults to a new Watcher.
+    """
+    watcher = watcher if watcher is not None else Watcher()
+    watcher.watch(paths)
+
+    changed = list(paths)
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                read_paths = rebuild()
+            except Exception as e:
+                print(f"{type(e).__name__}: {e}", file=sys.stderr)
+            else:
+                print(
+                    f"Rebuilt {', '.join(changed)} in {(time.perf_counter() - start) * 1000:.1f} ms",
+                    file=sys.stderr,
+                )
+                if read_paths is not None:
+                    watcher.watch(read_paths)
+            changed = watcher.wait()
+    except KeyboardInterrupt:
+        pass
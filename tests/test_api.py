@@ -0,0 +1,50 @@
+from prettybird import compile_source
+
+API_PBD = r"""
+char a {
+    base {
+        blank(4, 3)
+    }
+
+    steps {
+        draw vector((0, 1), (3, 1))
+    }
+}
+
+char b encoding=98 {
+    base {
+        from_char(a)
+    }
+
+    steps {
+    }
+}
+"""
+
+
+def test_compile_source(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    font = compile_source(API_PBD)
+
+    assert font.glyph(ord("a")).bitmap == [
+        [False, False, False, False],
+        [True, True, True, True],
+        [False, False, False, False],
+    ]
+    assert font.glyph(98).grid == font.glyph(97).grid
+    # Glyphs are compiled once and cached
+    assert font.glyph(97) is font.glyph(97)
+
+    bdf = font.to_bdf_bytes(font_name="api")
+    assert bdf.startswith(b"STARTFONT 0.1\nFONT api\n")
+    assert b"STARTCHAR b\nENCODING 98\n" in bdf
+    # Bitmaps are trimmed to the ink, and rows narrower than a byte are aligned to its left
+    assert b"BBX 4 1 0 1\nBITMAP\nF0\nENDCHAR" in bdf
+    assert bdf.count(b"ENDCHAR") == 2
+
+    svgs = font.to_svg_strings()
+    assert set(svgs) == {"a", "b"}
+    assert svgs["a"] == svgs["b"]
+    assert svgs["a"].count("<rect") == 4
+
+    assert not list(tmp_path.iterdir())
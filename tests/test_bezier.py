@@ -0,0 +1,58 @@
+import math
+
+from prettybird.utils.bezier import TOLERANCE, flatten, split, split_at_extrema
+
+
+def point_on(points, t):
+    n = len(points) - 1
+    return tuple(
+        sum(math.comb(n, i) * (1 - t) ** (n - i) * t ** i * p[axis]
+            for i, p in enumerate(points))
+        for axis in (0, 1)
+    )
+
+
+def test_split():
+    cubic = [(0, 0), (3, 9), (7, -4), (10, 5)]
+    left, right = split(cubic, 0.3)
+    assert left[0] == cubic[0] and right[-1] == cubic[-1]
+    for t in (0, 0.25, 0.5, 1):
+        assert all(math.isclose(a, b, abs_tol=1e-9)
+                   for a, b in zip(point_on(left, t), point_on(cubic, 0.3 * t)))
+        assert all(math.isclose(a, b, abs_tol=1e-9)
+                   for a, b in zip(point_on(right, t), point_on(cubic, 0.3 + 0.7 * t)))
+
+
+def test_split_at_extrema():
+    # S-shaped cubic turning around once in x and not at all in y
+    cubic = [(1, 1), (14, 0), (-3, 11), (10, 10)]
+    pieces = split_at_extrema(cubic)
+    assert pieces[0][0] == cubic[0] and pieces[-1][-1] == cubic[-1]
+    for piece in pieces:
+        for axis in (0, 1):
+            deltas = [b[axis] - a[axis] for a, b in zip(piece, piece[1:])]
+            assert all(d >= -1e-6 for d in deltas) or all(d <= 1e-6 for d in deltas)
+
+    # Monotonic curves are left whole
+    assert split_at_extrema([(0, 0), (1, 2), (3, 3)]) == [[(0, 0), (1, 2), (3, 3)]]
+
+
+def distance_to_segment(point, start, end):
+    (px, py), (ax, ay), (bx, by) = point, start, end
+    length_squared = (bx - ax) ** 2 + (by - ay) ** 2
+    t = 0 if length_squared == 0 else max(
+        0, min(1, ((px - ax) * (bx - ax) + (py - ay) * (by - ay)) / length_squared))
+    return math.dist(point, (ax + (bx - ax) * t, ay + (by - ay) * t))
+
+
+def test_flatten():
+    quartic = [(0, 5), (0, 0), (4, -2), (8, 0), (8, 5)]
+    points = flatten(quartic)
+    assert points[0] == quartic[0] and points[-1] == quartic[-1]
+    # Every point of the curve stays within the tolerance of the segments
+    for i in range(101):
+        point = point_on(quartic, i / 100)
+        assert min(
+            distance_to_segment(point, start, end)
+            for start, end in zip(points, points[1:])
+        ) <= TOLERANCE
@@ -0,0 +1,33 @@
+import itertools
+import math
+
+from prettybird.utils.distance import INF, distance_transform_2d, signed_distance_field
+
+
+def test_distance_transform():
+    width, height = 7, 5
+    features = [False] * (width * height)
+    for x, y in [(1, 1), (5, 3), (6, 0)]:
+        features[y * width + x] = True
+
+    achieved = distance_transform_2d(features, width, height)
+    for x, y in itertools.product(range(width), range(height)):
+        expected = min(
+            (x - fx) ** 2 + (y - fy) ** 2
+            for fx, fy in itertools.product(range(width), range(height))
+            if features[fy * width + fx]
+        )
+        assert math.isclose(achieved[y * width + x], expected)
+
+
+def test_distance_transform_without_features():
+    assert all(d >= INF for d in distance_transform_2d([False] * 4, 2, 2))
+
+
+def test_signed_distance_field():
+    width, height, values = signed_distance_field([".0.", "000", ".0."], 2)
+    assert (width, height) == (7, 7)
+    center = values[3 * width + 3]
+    corner = values[0]
+    assert center > 128 > corner
+    assert values[3 * width + 2] > values[3 * width + 1] > values[3 * width]
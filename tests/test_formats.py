@@ -0,0 +1,292 @@
+import io
+import json
+import pathlib
+import warnings
+
+import pytest
+import svgwrite  # type: ignore
+from lark import Lark
+from prettybird.interpreter import PrettyBirdInterpreter
+from prettybird.formats import BDF, SVG, Atlas, GlyphStore, GlyphStoreReader
+
+FORMATS_PBD = r"""
+char a {
+    base {
+        blank(4, 3)
+    }
+
+    steps {
+        draw vector((0, 0), (3, 0))
+        draw vector((1, 2), (1, 2))
+    }
+}
+
+char b {
+    base {
+        blank(3, 5)
+    }
+
+    steps {
+        draw vector((2, 0), (2, 4))
+    }
+}
+"""
+
+
+def compile_symbols(input_pbd):
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    parse_tree = parser.parse(input_pbd)
+    interpreter.visit(parse_tree)
+    symbols = list(interpreter.symbols.values())
+    for symbol in symbols:
+        symbol.compile()
+    return symbols
+
+
+def test_atlas(tmp_path):
+    symbols = compile_symbols(FORMATS_PBD)
+    atlas = Atlas("test", "0.1", bit_depth=8,
+                  filename=str(tmp_path / "test.pgm"))
+    atlas.add_symbols(symbols)
+    atlas.compile(bitmap=True)
+
+    metrics = json.load(open(tmp_path / "test.json"))
+    image = open(tmp_path / "test.pgm", "rb").read()
+    header = f"P5\n{metrics['width']} {metrics['height']}\n255\n".encode()
+    assert image.startswith(header)
+    pixels = image[len(header):]
+
+    for glyph, symbol in zip(metrics["glyphs"], symbols):
+        assert glyph["encoding"] == ord(symbol.identifier)
+        achieved = ""
+        for y in range(glyph["y"], glyph["y"] + glyph["h"]):
+            start = y * metrics["width"] + glyph["x"]
+            achieved += "".join("0" if p else "." for p in pixels[start: start + glyph["w"]])
+            achieved += "\n"
+        assert achieved.strip() == str(symbol)
+
+    index = open(tmp_path / "test.idx", "rb").read()
+    magic, _, bit_depth, count, width, height, _, _ = Atlas.INDEX_HEADER.unpack_from(
+        index)
+    assert (magic, bit_depth, count) == (Atlas.INDEX_MAGIC, 8, 2)
+    assert (width, height) == (metrics["width"], metrics["height"])
+    first = Atlas.INDEX_RECORD.unpack_from(index, Atlas.INDEX_HEADER.size)
+    assert first == (ord("a"), metrics["glyphs"][0]["x"],
+                     metrics["glyphs"][0]["y"], 4, 3, 4)
+
+
+def test_distance_field_atlas(tmp_path):
+    symbols = compile_symbols(FORMATS_PBD)
+    atlas = Atlas("test", "0.1", bit_depth=8, sdf_spread=2, sdf_scale=2,
+                  filename=str(tmp_path / "test.pgm"))
+    atlas.add_symbols(symbols)
+    atlas.compile(bitmap=True)
+
+    metrics = json.load(open(tmp_path / "test.json"))
+    assert (metrics["sdf_spread"], metrics["sdf_scale"]) == (2, 2)
+    first = metrics["glyphs"][0]
+    assert (first["w"], first["h"], first["advance"]) == (12, 10, 8)
+
+
+def test_glyph_store(tmp_path):
+    symbols = compile_symbols(FORMATS_PBD)
+    store = GlyphStore("test", "0.1", filename=str(tmp_path / "test.pbgs"))
+    store.add_symbols(symbols)
+    store.compile(bitmap=True)
+
+    with GlyphStoreReader(str(tmp_path / "test.pbgs")) as reader:
+        assert list(reader.encodings()) == [ord("a"), ord("b")]
+        assert ord("c") not in reader
+        assert reader.dimensions(ord("a")) == (4, 3)
+
+        bitmap = reader[ord("a")]
+        assert bytes(bitmap) == bytes([0b11110000, 0, 0b01000000])
+        bitmap.release()
+
+        bitmap = reader[ord("b")]
+        assert bytes(bitmap) == bytes([0b00100000] * 5)
+        bitmap.release()
+
+
+def test_deduplication(tmp_path):
+    symbols = compile_symbols(FORMATS_PBD + r"""
+char c {
+    base {
+        from_char(b)
+    }
+
+    steps {}
+}
+""")
+    atlas = Atlas("test", "0.1", filename=str(tmp_path / "test.pbm"))
+    atlas.add_symbols(symbols)
+    atlas.compile(bitmap=True)
+    glyphs = json.load(open(tmp_path / "test.json"))["glyphs"]
+    assert len(atlas.groups) == 2
+    assert (glyphs[1]["x"], glyphs[1]["y"]) == (glyphs[2]["x"], glyphs[2]["y"])
+
+    store = GlyphStore("test", "0.1", filename=str(tmp_path / "test.pbgs"))
+    store.add_symbols(symbols)
+    store.compile(bitmap=True)
+    with GlyphStoreReader(str(tmp_path / "test.pbgs")) as reader:
+        assert reader._record(1)[3:] == reader._record(2)[3:]
+
+
+def test_outline_erase_layers():
+    symbol = compile_symbols(r"""
+char e {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        draw filled circle((4, 4), 3)
+        erase filled circle((4, 4), 1)
+        erase vector((0, 4), (7, 4))
+        draw vector((0, 0), (7, 0))
+        erase vector((0, 0), (0, 7))
+    }
+}
+""")[0]
+    svg_drawing = svgwrite.Drawing("e.svg")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        SVG.draw_outline_on_svg(symbol, svg_drawing)
+    assert len(caught) == 1
+
+    masks = svg_drawing.defs.elements
+    assert [len(mask.elements) for mask in masks] == [3, 2]
+    assert svg_drawing.tostring().count("mask=") == 2
+    # The group masked by the second erase run holds the group masked by the first
+    outer = svg_drawing.tostring().index('mask="url(#4_erase)"')
+    assert svg_drawing.tostring().index('mask="url(#1_erase)"') > outer
+
+
+def test_outline_polygon_path():
+    symbol = compile_symbols(r"""
+char p {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        draw filled polygon((0, 0), (7, 0), (0, 7), nonzero)
+        draw polyline((0, 7), (7, 7), (7, 0))
+    }
+}
+""")[0]
+    svg_drawing = svgwrite.Drawing("p.svg")
+    SVG.draw_outline_on_svg(symbol, svg_drawing)
+
+    paths = svg_drawing.elements[-1].elements
+    assert [path.get_xml().get("d") for path in paths] == [
+        "M 0.0 0.0 L 112.0 0.0 L 0.0 112.0 Z",
+        "M 0.0 112.0 L 112.0 112.0 L 112.0 0.0",
+    ]
+    assert paths[0]["fill-rule"] == "nonzero"
+    assert paths[1]["fill"] == "none"
+
+
+def test_outline_bezier_path():
+    symbol = compile_symbols(r"""
+char c {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        draw bezier((0, 7), (7, 7), (3, 0))
+        draw bezier((0, 0), (7, 0), (0, 7), (7, 7))
+        draw bezier((0, 0), (7, 7), (0, 7), (3, 3), (7, 0))
+    }
+}
+""")[0]
+    svg_drawing = svgwrite.Drawing("c.svg")
+    SVG.draw_outline_on_svg(symbol, svg_drawing)
+
+    paths = [path.get_xml().get("d") for path in svg_drawing.elements[-1].elements]
+    assert paths[0] == "M 0.0 112.0 Q 48.0 0.0 112.0 112.0"
+    assert paths[1] == "M 0.0 0.0 C 0.0 112.0 112.0 112.0 112.0 0.0"
+    # Quartic curves are flattened into lines ending at the curve's end
+    assert paths[2].startswith("M 0.0 0.0 L ")
+    assert paths[2].endswith(" 112.0 112.0")
+
+
+def test_outline_compose_reference():
+    symbols = compile_symbols(r"""
+char e {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        draw vector((0, 4), (7, 4))
+        erase point((0, 4))
+    }
+}
+
+char f {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        compose(e, 1, 2)
+        erase point((0, 0))
+    }
+}
+""")
+    svg_drawing = svgwrite.Drawing("f.svg")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        SVG.draw_outline_on_svg(symbols[1], svg_drawing)
+
+    # The composed glyph's outline is moved into place, and its erase mask keeps a distinct id
+    reference = svg_drawing.tostring()
+    assert 'transform="translate(16.0 32.0)"' in reference
+    assert [mask["id"] for mask in svg_drawing.defs.elements] == ["0_1_erase", "1_erase"]
+
+
+def test_bdf_metrics():
+    symbols = compile_symbols(r"""
+char g {
+    base {
+        blank(12, 6)
+    }
+
+    steps {
+        draw vector((2, 1), (10, 1))
+        draw vector((2, 1), (2, 3))
+    }
+}
+
+char space encoding=32 {
+    base {
+        blank(4, 6)
+    }
+
+    steps {}
+}
+""")
+    assert symbols[0].ink_bounds() == (2, 1, 9, 3)
+    assert symbols[1].ink_bounds() is None
+
+    font = BDF("metrics", "0.1")
+    font.add_symbols(symbols)
+    stream = io.StringIO()
+    font.write(stream)
+    bdf = stream.getvalue()
+
+    assert "FONTBOUNDINGBOX 9 3 2 2\n" in bdf
+    assert "FONT_ASCENT 5\nFONT_DESCENT 0\n" in bdf
+    # Only the rows and columns with ink are stored, offset from the bottom left of the grid
+    assert "DWIDTH 12 0\nBBX 9 3 2 2\nBITMAP\nFF80\n8000\n8000\nENDCHAR" in bdf
+    assert "DWIDTH 4 0\nBBX 0 0 0 0\nBITMAP\nENDCHAR" in bdf
+
+    # A bounding box given as just a width and height is placed at the origin
+    font = BDF("metrics", "0.1", bounding_box=(6, 8))
+    assert font.bounding_box == (6, 8, 0, 0)
+    with pytest.raises(ValueError):
+        BDF("metrics", "0.1", bounding_box=(6, 8, 0))
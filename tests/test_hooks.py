@@ -0,0 +1,62 @@
+import pathlib
+
+import pytest
+from lark import Lark
+from prettybird import hooks
+from prettybird.interpreter import PrettyBirdInterpreter
+from prettybird.formats import GlyphStore
+
+
+def test_hooks(tmp_path):
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    input_pbd = r"""
+define dot(p) {
+    draw vector(p, p)
+}
+
+char a {
+    base {
+        blank(4, 4)
+    }
+
+    steps {
+        dot((1, 1))
+    }
+}
+    """
+    events = []
+
+    def record(event, **payload):
+        events.append(event)
+
+    for event in hooks.EVENTS:
+        hooks.subscribe(event, record)
+    try:
+        interpreter.interpret(parser, input_pbd)
+        symbols = list(interpreter.symbols.values())
+        for symbol in symbols:
+            symbol.compile()
+        store = GlyphStore("test", "0.1", filename=str(tmp_path / "test.pbgs"))
+        store.add_symbols(symbols)
+        store.compile(bitmap=True)
+    finally:
+        for event in hooks.EVENTS:
+            hooks.unsubscribe(event, record)
+
+    assert events == [
+        "parse_start",
+        "parse_end",
+        "glyph_compile_start",
+        "function_enter",
+        "function_exit",
+        "glyph_compile_end",
+        "format_write",
+    ]
+    assert not any(hooks.has_subscribers(event) for event in hooks.EVENTS)
+
+
+def test_unknown_hook():
+    with pytest.raises(ValueError):
+        hooks.subscribe("glyph_compiled", print)
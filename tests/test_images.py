@@ -0,0 +1,133 @@
+import pytest
+from prettybird import compile_source
+from prettybird.api import get_parser
+from prettybird.images import Image, ImageCache
+from prettybird.incremental import DependencyGraph
+from prettybird.interpreter import PrettyBirdInterpreter
+
+# Two 5x3 glyphs side by side, with a column between them
+SHEET = [
+    "0.0...00.00",
+    "000...0..0.",
+    "0.0...00.00",
+]
+
+FONT_PBD = r"""
+char h {
+    base {
+        from_image("sheet.pbm", 0, 0, 3, 3)
+    }
+
+    steps {
+        draw point((1, 0))
+    }
+}
+
+char e {
+    base {
+        from_image("sheet.pgm", 6, 0, 5, 3)
+    }
+
+    steps {}
+}
+
+char o {
+    base {
+        0.0,
+        ...,
+        0.0
+    }
+
+    steps {}
+}
+"""
+
+
+def write_sheets(directory, rows=SHEET):
+    width, height = len(rows[0]), len(rows)
+    # Binary PBM, with a comment in the header and rows padded to a byte boundary
+    row_bytes = (width + 7) // 8
+    pbm = bytearray(f"P4\n# sprites\n{width} {height}\n".encode())
+    for row in rows:
+        bits = row.replace("0", "1").replace(".", "0").ljust(row_bytes * 8, "0")
+        pbm += int(bits, 2).to_bytes(row_bytes, "big")
+    (directory / "sheet.pbm").write_bytes(bytes(pbm))
+    # Binary PGM, black on white
+    pgm = f"P5 {width} {height} 255\n".encode() + bytes(
+        0 if pixel == "0" else 255 for row in rows for pixel in row)
+    (directory / "sheet.pgm").write_bytes(pgm)
+    # Plain PBM, without whitespace between pixels
+    plain = f"P1\n{width} {height}\n" + "\n".join(
+        row.replace("0", "1").replace(".", "0") for row in rows)
+    (directory / "plain.pbm").write_text(plain)
+    (directory / "font.pbd").write_text(FONT_PBD)
+    return directory / "font.pbd"
+
+
+def test_image_formats(tmp_path):
+    write_sheets(tmp_path)
+    for name in ("sheet.pbm", "sheet.pgm", "plain.pbm"):
+        image = Image(tmp_path / name)
+        assert (image.width, image.height) == (11, 3)
+        assert image.grid(0, 0, 11, 3) == "\n".join(SHEET)
+        # Regions that straddle byte boundaries
+        assert image.grid(6, 1, 5, 2) == "0..0.\n00.00"
+
+    with pytest.raises(ValueError):
+        Image(tmp_path / "sheet.pbm").grid(8, 0, 5, 3)
+    with pytest.raises(ValueError):
+        Image(tmp_path / "font.pbd")
+
+
+def test_image_base(tmp_path):
+    path = write_sheets(tmp_path)
+    font = compile_source(path.read_text(), path)
+    assert font.render("h").grid == "000\n000\n0.0"
+    assert font.render("e").grid == "00.00\n0..0.\n00.00"
+    assert font.render("o").grid == "0.0\n...\n0.0"
+
+    with pytest.raises(ImportError):
+        compile_source(path.read_text(), path, allow_imports=False)
+
+    with pytest.raises(SyntaxError):
+        compile_source("char o { base { 0.0, .. } steps {} }")
+
+
+def test_image_cache(tmp_path):
+    write_sheets(tmp_path)
+    cache = ImageCache()
+    image = cache.get(tmp_path / "sheet.pbm")
+    assert cache.get(tmp_path / "sheet.pbm") is image
+
+    # A changed sheet is read again
+    write_sheets(tmp_path, [row[::-1] for row in SHEET])
+    changed = cache.get(tmp_path / "sheet.pbm")
+    assert changed is not image
+    assert changed.grid(0, 0, 3, 3) == "00.\n.0.\n00."
+    assert len(cache) == 1
+
+    # Only the most recently used sheets stay mapped
+    bounded = ImageCache(maxsize=1)
+    bounded.get(tmp_path / "sheet.pbm")
+    pgm = bounded.get(tmp_path / "sheet.pgm")
+    assert len(bounded) == 1
+    assert bounded.get(tmp_path / "sheet.pgm") is pgm
+
+
+def test_image_glyph_keys(tmp_path):
+    path = write_sheets(tmp_path)
+
+    def glyph_keys():
+        interpreter = PrettyBirdInterpreter(path)
+        parse_tree = interpreter.interpret(get_parser(), path.read_text())
+        return DependencyGraph(parse_tree, interpreter.modules, interpreter.images).glyph_keys()
+
+    keys = glyph_keys()
+    # Only glyphs cut from the changed sheet are recompiled
+    pgm = bytearray((tmp_path / "sheet.pgm").read_bytes())
+    pgm[-1] = 255
+    (tmp_path / "sheet.pgm").write_bytes(bytes(pgm))
+    changed = glyph_keys()
+    assert changed["h"] == keys["h"]
+    assert changed["o"] == keys["o"]
+    assert changed["e"] != keys["e"]
@@ -0,0 +1,126 @@
+import pytest
+from prettybird import compile_source, hooks
+from prettybird.api import get_parser
+from prettybird.incremental import DependencyGraph
+from prettybird.interpreter import PrettyBirdInterpreter
+from prettybird.modules import ModuleCache, load_module
+
+COMMON_PBD = r"""
+define stem(x) {
+    draw vector((x, 0), (x, 3))
+}
+
+char i {
+    base {
+        blank(3, 4)
+    }
+
+    steps {
+        stem(1)
+    }
+}
+"""
+
+FONT_PBD = r"""
+import "common.pbd" as common with characters
+import "common.pbd"
+
+char l {
+    base {
+        blank(4, 4)
+    }
+
+    steps {
+        common.stem(0)
+        stem(3)
+    }
+}
+
+char j {
+    base {
+        from_char(i)
+    }
+
+    steps {
+        draw point((0, 3))
+    }
+}
+"""
+
+
+def write_sources(directory):
+    (directory / "common.pbd").write_text(COMMON_PBD)
+    (directory / "font.pbd").write_text(FONT_PBD)
+    return directory / "font.pbd"
+
+
+def test_import(tmp_path):
+    path = write_sources(tmp_path)
+    font = compile_source(path.read_text(), path)
+
+    assert [symbol.identifier for symbol in font] == ["i", "l", "j"]
+    assert font.render("l").grid == "0..0\n0..0\n0..0\n0..0"
+    assert font.render("j").grid == ".0.\n.0.\n.0.\n00."
+
+    # Without "with characters", only functions are imported
+    source = FONT_PBD.replace(" with characters", "").replace("from_char(i)", "blank(3, 4)")
+    font = compile_source(source, path)
+    assert [symbol.identifier for symbol in font] == ["l", "j"]
+
+    with pytest.raises(NameError):
+        compile_source(FONT_PBD.replace("import \"common.pbd\"\n", ""), path)
+
+
+def test_import_errors(tmp_path):
+    (tmp_path / "a.pbd").write_text('import "b.pbd"\n')
+    (tmp_path / "b.pbd").write_text('import "a.pbd"\n')
+    with pytest.raises(ImportError, match="a.pbd -> b.pbd -> a.pbd"):
+        load_module(tmp_path / "a.pbd", cache=ModuleCache())
+
+    with pytest.raises(ImportError):
+        compile_source('import "missing.pbd"\n', tmp_path / "font.pbd")
+
+    path = write_sources(tmp_path)
+    with pytest.raises(ImportError):
+        compile_source(path.read_text(), path, allow_imports=False)
+
+
+def test_module_cache(tmp_path):
+    path = write_sources(tmp_path)
+    cache = ModuleCache()
+    parses = []
+
+    def count(event, interpreter, source):
+        parses.append(interpreter.path)
+
+    def compile_font():
+        interpreter = PrettyBirdInterpreter(path, module_cache=cache)
+        parse_tree = interpreter.interpret(get_parser(), path.read_text())
+        return interpreter, DependencyGraph(parse_tree, interpreter.modules).glyph_keys()
+
+    hooks.subscribe("parse_start", count)
+    try:
+        first, keys = compile_font()
+        assert first.modules[0] is first.modules[1]
+        second, same_keys = compile_font()
+        # The imported file was interpreted once, for the first font only
+        assert parses == [path, tmp_path / "common.pbd", path]
+        assert second.modules[0] is first.modules[0]
+        assert same_keys == keys
+
+        # Changing the imported file invalidates the Module and every glyph after the import
+        (tmp_path / "common.pbd").write_text(COMMON_PBD.replace("(x, 3)", "(x, 2)"))
+        third, changed_keys = compile_font()
+        assert third.modules[0] is not first.modules[0]
+        assert all(changed_keys[identifier] != keys[identifier] for identifier in keys)
+        assert third.modules[0].files == [str(tmp_path / "common.pbd")]
+        # Only the latest version of the imported file is kept
+        assert len(cache) == 1
+    finally:
+        hooks.unsubscribe("parse_start", count)
+
+    bounded = ModuleCache(maxsize=1)
+    (tmp_path / "other.pbd").write_text(COMMON_PBD)
+    load_module(tmp_path / "common.pbd", cache=bounded)
+    load_module(tmp_path / "other.pbd", cache=bounded)
+    assert len(bounded) == 1
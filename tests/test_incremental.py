@@ -0,0 +1,93 @@
+import pathlib
+
+from lark import Lark
+from prettybird.incremental import DependencyGraph, GlyphCache, IncrementalCompiler, MemoryGlyphCache
+from prettybird.interpreter import PrettyBirdInterpreter
+
+INCREMENTAL_PBD = r"""
+define dot(p) {
+    draw vector(p, p)
+}
+
+define dots(p) {
+    dot(p)
+    dot(p + (1, 1))
+}
+
+char a {
+    base {
+        blank(4, 4)
+    }
+
+    steps {
+        dots((0, 0))
+    }
+}
+
+char b {
+    base {
+        from_char(a)
+    }
+
+    steps {
+        draw vector((3, 0), (3, 3))
+    }
+}
+
+char c {
+    base {
+        blank(4, 4)
+    }
+
+    steps {
+        draw vector((0, 3), (3, 3))
+    }
+}
+"""
+
+
+def compile_incrementally(input_pbd, cache_dir):
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    parse_tree = interpreter.interpret(parser, input_pbd)
+    keys = DependencyGraph(parse_tree).glyph_keys()
+
+    incremental = IncrementalCompiler(GlyphCache(cache_dir))
+    grids = {
+        symbol.identifier: incremental.render(
+            symbol, keys[symbol.identifier]).grid
+        for symbol in interpreter.get_font()
+    }
+    return incremental, grids
+
+
+def test_incremental(tmp_path):
+    incremental, grids = compile_incrementally(INCREMENTAL_PBD, tmp_path)
+    assert incremental.compiled == ["a", "b", "c"]
+
+    # Reformatting changes nothing
+    incremental, cached_grids = compile_incrementally(
+        INCREMENTAL_PBD.replace("    ", "\t"), tmp_path)
+    assert incremental.reused == ["a", "b", "c"]
+    assert cached_grids == grids
+
+    # Changing a function recompiles every glyph that calls it, even through another glyph
+    edited = INCREMENTAL_PBD.replace("draw vector(p, p)", "draw vector(p, p + (1, 0))")
+    incremental, edited_grids = compile_incrementally(edited, tmp_path)
+    assert incremental.compiled == ["a", "b"]
+    assert incremental.reused == ["c"]
+    assert edited_grids["a"] != grids["a"]
+    assert edited_grids["b"].startswith("00.0")
+
+
+def test_memory_glyph_cache():
+    cache = MemoryGlyphCache(maxsize=2)
+    cache.put("a", "0.")
+    cache.put("b", ".0")
+    assert cache.get("a") == "0."
+    # The least recently used grid is evicted
+    cache.put("c", "00")
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "0."
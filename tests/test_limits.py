@@ -0,0 +1,159 @@
+import pathlib
+
+import pytest
+from lark import Lark
+from prettybird.interpreter import PrettyBirdInterpreter
+from prettybird.limits import (
+    CanvasTooLarge,
+    FunctionCallLimitExceeded,
+    FunctionDepthExceeded,
+    GlyphTimeout,
+    Limits,
+    PixelLimitExceeded,
+    enforcing,
+)
+
+LIMITS_PBD = r"""
+define dot(p) {
+    draw vector(p, p)
+}
+
+define forever(p) {
+    forever(p)
+}
+
+char a {
+    base {
+        blank(16, 16)
+    }
+
+    steps {
+        draw filled circle((8, 8), 6)
+        dot((1, 1))
+        dot((2, 2))
+    }
+}
+
+char b {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        forever((1, 1))
+    }
+}
+"""
+
+
+def interpret(input_pbd):
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    interpreter.visit(parser.parse(input_pbd))
+    return interpreter.symbols
+
+
+def test_limits():
+    with enforcing(Limits(max_canvas_area=100)):
+        with pytest.raises(CanvasTooLarge) as e:
+            interpret(LIMITS_PBD)
+    assert e.value.identifier == "a"
+    assert e.value.value == 256
+
+    symbols = interpret(LIMITS_PBD)
+    with enforcing(Limits(max_pixels=10)):
+        with pytest.raises(PixelLimitExceeded):
+            symbols["a"].compile()
+
+    symbols = interpret(LIMITS_PBD)
+    with enforcing(Limits(max_function_calls=1)):
+        with pytest.raises(FunctionCallLimitExceeded):
+            symbols["a"].compile()
+
+    with enforcing(Limits(max_function_depth=50)) as budget:
+        with pytest.raises(FunctionDepthExceeded) as e:
+            symbols["b"].compile()
+        assert budget.idle
+    assert e.value.identifier == "b"
+    assert e.value.limit == 50
+
+    # Without limits, unbounded recursion still raises instead of exiting
+    with pytest.raises(FunctionDepthExceeded):
+        symbols["b"].compile()
+
+
+def test_long_instruction():
+    symbols = interpret(r"""
+char c {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        draw filled circle((4, 4), 3000)
+    }
+}
+
+char e {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        draw filled ellipse((0, 0), (3000, 3000))
+    }
+}
+
+char v {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        draw vector((0, 0), (1000000, 0))
+    }
+}
+""")
+    with enforcing(Limits(glyph_timeout=0.5)):
+        # Rows of a filled circle off the grid are skipped
+        symbols["c"].compile()
+        # One instruction that would take far longer than the timeout is stopped partway through
+        with pytest.raises(GlyphTimeout) as e:
+            symbols["e"].compile()
+    assert e.value.value < 2
+
+    with enforcing(Limits(max_pixels=4)):
+        with pytest.raises(PixelLimitExceeded):
+            symbols["v"].compile()
+
+
+def test_long_repeat():
+    symbols = interpret(r"""
+char r {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        repeat i from 0 to 100000000 {
+        }
+    }
+}
+
+char s {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        repeat i from 0 to 1 step 0.000001 {
+        }
+    }
+}
+""")
+    # Loops that draw nothing are still stopped by the timeout
+    for identifier in ("r", "s"):
+        with enforcing(Limits(glyph_timeout=0.2)):
+            with pytest.raises(GlyphTimeout):
+                symbols[identifier].compile()
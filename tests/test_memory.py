@@ -0,0 +1,57 @@
+import pathlib
+import tracemalloc
+
+import pytest
+from lark import Lark
+from prettybird.interpreter import PrettyBirdInterpreter
+from prettybird.memory import MemoryLimitExceeded, MemoryTracker, tracking_memory
+
+MEMORY_PBD = r"""
+define dot(p) {
+    draw vector(p, p)
+}
+
+char a {
+    base {
+        blank(16, 16)
+    }
+
+    steps {
+        draw filled circle((8, 8), 6)
+        dot((1, 1))
+    }
+}
+"""
+
+
+def interpret(input_pbd):
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    interpreter.visit(parser.parse(input_pbd))
+    return interpreter.symbols["a"]
+
+
+def test_memory_report():
+    symbol = interpret(MEMORY_PBD)
+    tracker = MemoryTracker()
+    with tracking_memory(tracker):
+        symbol.compile()
+    assert not tracemalloc.is_tracing()
+
+    assert tracker.glyphs["a"].calls == 1
+    assert tracker.glyphs["a"].peak > 0
+    assert not tracker.glyphs["a"].aborted
+    assert tracker.functions["dot"].calls == 1
+    assert "dot" in tracker.report()
+
+
+def test_memory_limit():
+    symbol = interpret(MEMORY_PBD)
+    tracker = MemoryTracker(limit=1)
+    with tracking_memory(tracker):
+        with pytest.raises(MemoryLimitExceeded) as e:
+            symbol.compile()
+    assert e.value.identifier == "a"
+    assert tracker.glyphs["a"].aborted
+    assert tracker.idle
@@ -0,0 +1,76 @@
+import pytest
+from prettybird import compile_source
+from prettybird.morphology import apply, dilate, embolden, erode, hollow
+
+# 6x5 glyph with a 4x3 block in its middle
+BLOCK = [0b000000, 0b011110, 0b011110, 0b011110, 0b000000]
+
+MORPHOLOGY_PBD = r"""
+define outlined_square(p, size) {
+    draw filled square(p, size)
+    hollow(1)
+}
+
+char l {
+    base {
+        blank(6, 5)
+    }
+
+    steps {
+        draw vector((1, 0), (1, 4))
+        draw vector((1, 4), (4, 4))
+        embolden()
+    }
+}
+
+char o {
+    base {
+        blank(6, 5)
+    }
+
+    steps {
+        outlined_square((1, 1), 4)
+        dilate(0)
+    }
+}
+"""
+
+
+def test_operations():
+    assert dilate(BLOCK, 6) == [0b111111] * 5
+    assert dilate([0b000000, 0b001000, 0b000000], 6, 2) == [0b111110] * 3
+    assert erode(BLOCK, 6) == [0, 0, 0b001100, 0, 0]
+    # Closing a convex block gives it back
+    assert erode(dilate(BLOCK, 6), 6) == BLOCK
+    assert embolden([0b100001, 0b010000], 6, 2) == [0b111001, 0b011100]
+    assert hollow(BLOCK, 6) == [0, 0b011110, 0b010010, 0b011110, 0]
+    assert hollow(BLOCK, 6, 0) == [0] * 5
+
+
+def test_morphology_step():
+    font = compile_source(MORPHOLOGY_PBD)
+
+    assert font.render("l").grid == """.00...
+.00...
+.00...
+.00...
+.00000"""
+    assert font.render("o").grid == """......
+.0000.
+.0..0.
+.0..0.
+.0000."""
+
+
+def test_apply():
+    glyph = compile_source(MORPHOLOGY_PBD).render("o")
+    written = glyph.pixels_written
+    apply(glyph, "dilate", 1)
+    assert glyph.grid == "\n".join(["000000"] * 5)
+    # Only pixels that changed count as written
+    assert glyph.pixels_written == written + 18
+
+    with pytest.raises(ValueError):
+        apply(glyph, "thicken", 1)
+    with pytest.raises(ValueError):
+        apply(glyph, "erode", -1)
@@ -176,3 +176,345 @@ char a {
         print(str(symbol))
     achieved = "".join(compiled_symbols)
     assert expected == achieved
+
+
+def test_polygon():
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    input_pbd = r"""
+char t {
+    base {
+        blank(9, 9)
+    }
+
+    steps {
+        draw filled polygon((4, 0), (8, 8), (0, 8))
+    }
+}
+
+char e {
+    base {
+        blank(11, 11)
+    }
+
+    steps {
+        draw filled polygon((5, 0), (8, 10), (0, 4), (10, 4), (2, 10))
+    }
+}
+
+char n {
+    base {
+        blank(11, 11)
+    }
+
+    steps {
+        draw filled polygon((5, 0), (8, 10), (0, 4), (10, 4), (2, 10), nonzero)
+    }
+}
+
+char l {
+    base {
+        blank(6, 6)
+    }
+
+    steps {
+        draw filled square((0, 0), 6)
+        erase filled polygon((1, 1), (4, 1), (4, 4), (1, 4))
+        erase polyline((0, 0), (5, 0), (5, 5))
+    }
+}
+"""
+    parse_tree = parser.parse(input_pbd)
+    interpreter.visit(parse_tree)
+    expected = {
+        "t": """....0....
+....00...
+...000...
+...0000..
+..00000..
+..000000.
+.0000000.
+.00000000
+000000000""",
+        # The even-odd rule leaves the center of a self-intersecting star empty
+        "e": """.....0.....
+.....0.....
+....000....
+....000....
+00000000000
+.0000..000.
+...0...00..
+...00.00...
+...00000...
+..000..00..
+..0.....0..""",
+        "n": """.....0.....
+.....0.....
+....000....
+....000....
+00000000000
+.000000000.
+...000000..
+...00000...
+...00000...
+..000..00..
+..0.....0..""",
+        "l": """......
+0.....
+0.....
+0.....
+0.....
+00000.""",
+    }
+    for identifier, symbol in interpreter.symbols.items():
+        symbol.compile()
+        print(str(symbol))
+        assert expected[identifier] == str(symbol)
+
+
+def test_fill():
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    input_pbd = r"""
+char o {
+    base {
+        blank(9, 9)
+    }
+
+    steps {
+        draw circle((4, 4), 4)
+        draw vector((1, 4), (7, 4))
+        draw fill((4, 2))
+    }
+}
+
+char d {
+    base {
+        blank(6, 4)
+    }
+
+    steps {
+        draw vector((0, 3), (3, 0))
+        draw fill((0, 0), 4)
+    }
+}
+
+char e {
+    base {
+        blank(6, 4)
+    }
+
+    steps {
+        draw vector((0, 3), (3, 0))
+        draw fill((0, 0), 8)
+        erase vector((0, 2), (5, 2))
+        erase fill((0, 0))
+    }
+}
+
+define counter(p) {
+    draw fill(p)
+}
+
+char q {
+    base {
+        blank(9, 9)
+    }
+
+    steps {
+        draw circle((4, 4), 4)
+        draw vector((1, 4), (7, 4))
+        counter((4, 2))
+    }
+}
+"""
+    parse_tree = parser.parse(input_pbd)
+    interpreter.visit(parse_tree)
+    expected = {
+        # Only the counter above the bar is filled
+        "o": """...000...
+..00000..
+.0000000.
+000000000
+000000000
+0.......0
+.0.....0.
+..0...0..
+...000...""",
+        # Through 4 neighbors, the fill stops at the diagonal
+        "d": """0000..
+000...
+00....
+0.....""",
+        # Through 8 neighbors, the fill leaks across the diagonal. Erasing
+        # clears the drawn region above the gap but not the row below it
+        "e": """......
+......
+......
+000000""",
+    }
+    # Fills in functions stop at what the calling glyph has drawn
+    expected["q"] = expected["o"]
+    for identifier, symbol in interpreter.symbols.items():
+        symbol.compile()
+        print(str(symbol))
+        assert expected[identifier] == str(symbol)
+    # The calling glyph's pixels bound the fill without being written again
+    assert interpreter.symbols["q"]._pixels_written == interpreter.symbols["o"]._pixels_written
+
+
+def test_higher_order_bezier_curves():
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    input_pbd = r"""
+char q {
+    base {
+        blank(9, 6)
+    }
+
+    steps {
+        draw bezier((0, 5), (8, 5), (4, -5))
+    }
+}
+
+char h {
+    base {
+        blank(9, 6)
+    }
+
+    steps {
+        draw bezier((0, 5), (8, 5), (0, 0), (4, -2), (8, 0))
+    }
+}
+"""
+    parse_tree = parser.parse(input_pbd)
+    interpreter.visit(parse_tree)
+    expected = {
+        # Turns around in y, so it is split at its peak
+        "q": """...000...
+..0...0..
+..0....0.
+.0.....0.
+.0......0
+0.......0""",
+        # Quartic
+        "h": """..0000...
+.0....00.
+.0......0
+0.......0
+0.......0
+0.......0""",
+    }
+    for identifier, symbol in interpreter.symbols.items():
+        symbol.compile()
+        print(str(symbol))
+        assert expected[identifier] == str(symbol)
+
+
+def test_compose():
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    input_pbd = r"""
+char e {
+    base {
+        blank(5, 5)
+    }
+
+    steps {
+        draw vector((0, 2), (4, 2))
+        draw vector((0, 0), (0, 4))
+    }
+}
+
+char acute encoding=180 {
+    base {
+        blank(3, 2)
+    }
+
+    steps {
+        draw vector((0, 1), (2, 0))
+    }
+}
+
+define accented(dx) {
+    compose(acute, dx, 0)
+}
+
+char eacute encoding=233 {
+    base {
+        blank(5, 7)
+    }
+
+    steps {
+        compose(e, 0, 2)
+        accented(1)
+    }
+}
+
+char c {
+    base {
+        blank(5, 5)
+    }
+
+    steps {
+        compose(e, -2, 1)
+        compose(acute)
+    }
+}
+"""
+    parse_tree = parser.parse(input_pbd)
+    interpreter.visit(parse_tree)
+    expected = {
+        "e": """0....
+0....
+00000
+0....
+0....""",
+        "acute": """.00
+0..""",
+        "eacute": """..00.
+.0...
+0....
+0....
+00000
+0....
+0....""",
+        # Pixels moved off the grid are dropped
+        "c": """.00..
+0....
+.....
+000..
+.....""",
+    }
+    for identifier, symbol in interpreter.symbols.items():
+        symbol.compile()
+        print(str(symbol))
+        assert expected[identifier] == str(symbol)
+
+
+def test_compose_shares_components(monkeypatch):
+    from prettybird import compile_source
+    from prettybird.symbol import Symbol
+
+    # Each character composes the one before it twice
+    source = "char a0 encoding=1 { base { blank(16, 2) } steps { draw point((0, 0)) } }\n" + "".join(
+        f"char a{i} encoding={i + 1} {{ base {{ blank(16, 2) }} steps {{ compose(a{i - 1}) compose(a{i - 1}, 1, 0) }} }}\n"
+        for i in range(1, 16)
+    )
+    font = compile_source(source)
+
+    copies = []
+    execution_copy = Symbol._execution_copy
+    monkeypatch.setattr(Symbol, "_execution_copy",
+                        lambda self, *args: copies.append(self) or execution_copy(self, *args))
+
+    # Every component is compiled once, rather than once for every path to it
+    assert font.render("a15").grid == "0" * 16 + "\n" + "." * 16
+    assert len(copies) == 16
+    copies.clear()
+    font.render_all()
+    assert len(copies) == 16 + 15
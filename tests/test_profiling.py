@@ -0,0 +1,46 @@
+import pathlib
+
+from lark import Lark
+from prettybird.interpreter import PrettyBirdInterpreter
+from prettybird.profiling import Profiler, get_profiler, profiling
+
+
+def test_profile():
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    input_pbd = r"""
+define draw_steps(start_point, iterations) {
+    stop if iterations <= 0
+    draw vector(start_point, start_point + (1, 0))
+    draw_steps(start_point + (1, 1), iterations - 1)
+}
+
+char a {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        draw vector((0, 7), (7, 7))
+        draw_steps((0, 0), 3)
+    }
+}
+    """
+    parse_tree = parser.parse(input_pbd)
+    interpreter.visit(parse_tree)
+
+    profiler = Profiler()
+    with profiling(profiler):
+        for symbol in interpreter.symbols.values():
+            symbol.compile()
+    assert get_profiler() is None
+
+    assert profiler.glyphs["a"].calls == 1
+    assert profiler.functions["draw_steps"].calls == 4
+    assert profiler.functions["draw_steps"].max_depth == 4
+    assert profiler.instructions["vector"].calls == 4
+    assert profiler.instructions["vector"].pixels == 8 + 3 * 2
+    assert profiler.glyphs["a"].time >= profiler.functions["draw_steps"].time
+    assert "a;function_call;draw_steps;function_call;draw_steps;vector" in profiler.folded
+    assert "draw_steps" in profiler.table()
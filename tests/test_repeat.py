@@ -0,0 +1,114 @@
+import pathlib
+
+import pytest
+from lark import Lark
+from prettybird.interpreter import PrettyBirdInterpreter
+
+REPEAT_PBD = r"""
+define draw_steps(start_point, iterations) {
+    stop if iterations <= 0
+    draw vector(start_point, start_point + (5, 0))
+    draw vector(start_point + (5, 0), start_point + (5, 5))
+    draw_steps(start_point + (5, 5), iterations - 1)
+}
+
+define hatch(p, n) {
+    repeat k from 0 to n step 2 {
+        draw vector(p + (k, 0), p + (k, 2))
+    }
+}
+
+char r {
+    base {
+        blank(15, 15)
+    }
+
+    steps {
+        draw_steps((1, 1), 13)
+    }
+}
+
+char l {
+    base {
+        blank(15, 15)
+    }
+
+    steps {
+        repeat n from 0 to 12 {
+            draw vector((1, 1) + (n * 5, n * 5), (6, 1) + (n * 5, n * 5))
+            draw vector((6, 1) + (n * 5, n * 5), (6, 6) + (n * 5, n * 5))
+        }
+    }
+}
+
+char g {
+    base {
+        blank(8, 8)
+    }
+
+    steps {
+        repeat i from 0 to 7 step 2 {
+            draw point((i, 0))
+            repeat j from 1 to 2 {
+                draw point((i + 1, j + i / 2))
+            }
+        }
+        hatch((0, 5), 6)
+        draw square((6, 6), 2)
+    }
+}
+
+char s {
+    base {
+        blank(8, 1)
+    }
+
+    steps {
+        repeat i from 7 to 0 step -1 {
+            stop if i < 4
+            draw point((i, 0))
+        }
+    }
+}
+"""
+
+
+def interpret(input_pbd):
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    interpreter.visit(parser.parse(input_pbd))
+    return interpreter.get_font()
+
+
+def test_repeat():
+    font = interpret(REPEAT_PBD)
+
+    # A loop draws the same glyph as the recursion it replaces
+    assert font.render("l").grid == font.render("r").grid
+
+    assert font.render("g").grid == """0.0.0.0.
+.0......
+.0.0....
+...0.0..
+.....0.0
+0.0.0.00
+0.0.0.00
+0.0.0.00"""
+
+    assert font.render("s").grid == "....0000"
+
+
+def test_repeat_errors():
+    font = interpret(REPEAT_PBD.replace("step -1", "step 0"))
+    with pytest.raises(ValueError):
+        font.render("s")
+
+    # A step lost to float precision would never finish
+    font = interpret(REPEAT_PBD.replace("from 7 to", "from 100000000000000000000 to"))
+    with pytest.raises(ValueError):
+        font.render("s")
+
+    font = interpret(REPEAT_PBD.replace("draw point((i, 0))", "draw point((x, 0))"))
+    with pytest.raises(NameError):
+        font.render("g")
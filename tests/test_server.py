@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+from prettybird import hooks
+from prettybird.limits import Limits
+from prettybird.prettybird import get_limits, get_serve_args
+from prettybird.server import CompileServer
+
+SERVER_PBD = r"""
+char a {
+    base {
+        blank(4, 3)
+    }
+
+    steps {
+        draw vector((0, 1), (3, 1))
+    }
+}
+
+char b {
+    base {
+        blank(64, 64)
+    }
+
+    steps {
+    }
+}
+"""
+
+
+async def request(port, method, target, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), body
+
+
+async def exercise_server(server):
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        source = SERVER_PBD.encode()
+        status, body = await request(port, "POST", "/glyphs?encoding=97", source)
+        assert status == 200
+        assert json.loads(body)["97"]["rows"] == ["....", "0000", "...."]
+
+        status, body = await request(port, "POST", "/bdf?font_name=served", source)
+        assert status == 200
+        assert body.startswith(b"STARTFONT 0.1\nFONT served\n")
+
+        status, body = await request(port, "POST", "/glyphs", b"char {")
+        assert status == 400
+
+        # Errors raised while evaluating the source are answered too
+        for step in ("draw point((1/0, 1))", "draw point((9^9^9^9, 1))"):
+            status, body = await request(
+                port, "POST", "/glyphs", SERVER_PBD.replace("steps {\n    }", f"steps {{ {step} }}").encode())
+            assert status == 400
+            assert json.loads(body)["type"] in ("ZeroDivisionError", "OverflowError")
+
+        status, body = await request(port, "POST", "/glyphs", SERVER_PBD.replace("64", "65").encode())
+        assert status == 422
+        assert json.loads(body)["type"] == "CanvasTooLarge"
+
+        status, _ = await request(port, "GET", "/glyphs")
+        assert status == 405
+        status, _ = await request(port, "POST", "/nowhere", source)
+        assert status == 404
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        server.close()
+
+
+def test_server():
+    events = []
+
+    def on_cache(event, **_):
+        events.append(event)
+
+    hooks.subscribe("cache_hit", on_cache)
+    hooks.subscribe("cache_miss", on_cache)
+    try:
+        server = CompileServer(limits=Limits(max_canvas_area=64 * 64))
+        asyncio.run(exercise_server(server))
+    finally:
+        hooks.unsubscribe("cache_hit", on_cache)
+        hooks.unsubscribe("cache_miss", on_cache)
+
+    # The second request reuses the font parsed by the first
+    assert events[:2] == ["cache_miss", "cache_hit"]
+    assert len(server.cache) == 1
+
+
+def test_serve_default_limits():
+    limits = get_limits(get_serve_args([]))
+    assert limits.font_timeout == 10.0
+    # Huge bases are rejected before they are allocated
+    assert limits.max_canvas_area < 100000 * 100000
+    assert limits.max_pixels is not None
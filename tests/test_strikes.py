@@ -0,0 +1,113 @@
+import argparse
+
+import pytest
+from prettybird import compile_source
+from prettybird.incremental import IncrementalCompiler, MemoryGlyphCache
+from prettybird.limits import CanvasTooLarge, Limits, enforcing
+from prettybird.prettybird import render_strikes
+from prettybird.utils import scale_grid
+
+STRIKES_PBD = r"""
+define bar(y) {
+    draw vector((0, y), (3, y))
+}
+
+char l {
+    base {
+        blank(4, 4)
+    }
+
+    steps {
+        draw vector((0, 0), (0, 3))
+        bar(3)
+    }
+}
+
+char k {
+    base {
+        0.,
+        .0
+    }
+
+    steps {
+    }
+}
+
+char m {
+    base {
+        from_char(l)
+    }
+
+    steps {
+        draw filled square((2, 0), 2)
+    }
+}
+"""
+
+
+def test_scale_grid():
+    assert scale_grid("0.\n.0", 2) == "00..\n00..\n..00\n..00"
+    assert scale_grid("00..\n00..\n..00\n..00", 0.5) == "0.\n.0"
+    assert scale_grid("0", 0.1) == "0"
+
+
+def test_strike():
+    font = compile_source(STRIKES_PBD)
+    assert font.design_size == 4
+
+    # The design size renders exactly as without scaling
+    assert [glyph.grid for glyph in font.strike(4)] == [
+        glyph.grid for glyph in font.render_all()]
+
+    l, k, m = font.strike(8)
+    # Coordinates and lengths scale, including inside functions, while lines stay one pixel wide
+    assert l.grid == """0.......
+0.......
+0.......
+0.......
+0.......
+0.......
+0.......
+00000000"""
+    # Constant bases are resized
+    assert k.grid == "00..\n00..\n..00\n..00"
+    # from_char bases are rendered at the same scale
+    assert m.grid == """0....000
+0....000
+0....000
+0.......
+0.......
+0.......
+0.......
+00000000"""
+
+    # Definitions are untouched
+    assert font["l"].grid == "....\n....\n....\n...."
+
+    # Scaled bases are held to the same canvas limit as the bases they are scaled from
+    with enforcing(Limits(max_canvas_area=100)):
+        with pytest.raises(CanvasTooLarge):
+            font.strike(4000)
+
+    with pytest.raises(ValueError):
+        compile_source("define f(p) { draw point(p) }").strike(8)
+
+
+def test_strike_cache():
+    font = compile_source(STRIKES_PBD)
+    incremental = IncrementalCompiler(MemoryGlyphCache())
+    small = incremental.render(font["l"], "key")
+    large = incremental.render(font["l"], "key", 2)
+    assert (small.width, large.width) == (4, 8)
+    assert incremental.render(font["l"], "key", 2).grid == large.grid
+    assert incremental.compiled == ["l", "l"] and incremental.reused == ["l"]
+
+
+def test_render_strikes_without_design_size():
+    args = argparse.Namespace(
+        design_size=None, sizes=[8, 16], jobs=None, max_canvas_area=None, max_pixels=None,
+        max_function_calls=None, max_function_depth=None, glyph_timeout=None, timeout=None)
+    font = compile_source("define f(p) { draw point(p) }")
+    # Reported like Font.strike, rather than dividing by zero
+    with pytest.raises(ValueError, match="design size"):
+        render_strikes(args, font, [])
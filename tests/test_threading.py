@@ -0,0 +1,66 @@
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+
+from lark import Lark
+from prettybird.interpreter import PrettyBirdInterpreter
+
+THREADING_PBD = r"""
+define steps(p, n) {
+    stop if n <= 0
+    draw vector(p, p + (2, 0))
+    steps(p + (2, 2), n - 1)
+}
+
+char a {
+    base {
+        blank(12, 12)
+    }
+
+    steps {
+        draw circle((6, 6), 4)
+        steps((0, 0), 5)
+    }
+}
+
+char b {
+    base {
+        from_char(a)
+    }
+
+    steps {
+        erase vector((0, 6), (11, 6))
+    }
+}
+
+char c {
+    base {
+        blank(12, 12)
+    }
+
+    steps {
+        steps((1, 3), 4)
+    }
+}
+"""
+
+
+def test_threaded_render():
+    parser = Lark(open(pathlib.Path(__file__).parents[1] /
+                       "prettybird" / "grammar.lark", encoding="utf-8"))
+    interpreter = PrettyBirdInterpreter()
+    interpreter.visit(parser.parse(THREADING_PBD))
+    font = interpreter.get_font()
+    bases = {symbol.identifier: symbol.grid for symbol in font}
+
+    expected = {symbol.identifier: symbol.grid for symbol in font.render_all()}
+    assert expected["a"] != bases["a"]
+    assert expected["b"] != expected["a"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(lambda i: font.render("abc"[i % 3]), range(96)))
+
+    for i, rendered in enumerate(results):
+        assert rendered.grid == expected["abc"[i % 3]]
+    # Rendering never draws onto the definitions
+    assert {symbol.identifier: symbol.grid for symbol in font} == bases
@@ -0,0 +1,27 @@
+import os
+import threading
+import time
+
+from prettybird.watch import Watcher
+
+
+def test_watcher(tmp_path):
+    source = tmp_path / "font.pbd"
+    source.write_text("one")
+    watcher = Watcher([str(source)], interval=0.01, debounce=0.05)
+
+    def save_burst():
+        for i in range(3):
+            time.sleep(0.01)
+            source.write_text("two" * (i + 1))
+            # Filesystems with coarse timestamps still see the size change
+            os.utime(source, ns=(i + 10**9, i + 10**9))
+
+    saver = threading.Thread(target=save_burst)
+    saver.start()
+    assert watcher.wait() == [str(source)]
+    saver.join()
+
+    # The burst was reported once, after it settled
+    assert source.read_text() == "twotwotwo"
+    assert watcher._changed() == []